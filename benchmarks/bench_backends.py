@@ -0,0 +1,87 @@
+"""Accuracy parity and latency/throughput of the classifier backends.
+
+Every backend is compared against eager torch fp32 on the fixture corpus
+(label agreement and max absolute probability difference), then timed at
+several batch sizes.
+
+    python -m benchmarks.bench_backends --backends torch,torch-int8,onnx,onnx-int8
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.fixture_server import FIXTURES
+from src.api.backends import load_backend, softmax
+
+
+def load_texts():
+    with open(os.path.join(FIXTURES, "news_corpus.json"), encoding="utf-8") as f:
+        return [doc["text"] for doc in json.load(f)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="upasanapandey/news-classifier")
+    parser.add_argument("--backends", default="torch,torch-int8,onnx,onnx-int8")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time budget per backend and batch size")
+    parser.add_argument("--threads", type=int, default=1, help="intra-op threads, to compare per core")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    texts = load_texts()
+    names = args.backends.split(",")
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    reference = None
+    results = {}
+    for name in names:
+        kwargs = {"threads": args.threads} if name.startswith("onnx") else {}
+        backend = load_backend(name, args.model, **kwargs)
+        probs = softmax(backend.logits(texts))
+        if reference is None:
+            reference = probs if name == "torch" else softmax(load_backend("torch", args.model).logits(texts))
+
+        entry = {
+            "label_agreement": float(np.mean(probs.argmax(-1) == reference.argmax(-1))),
+            "max_abs_prob_diff": float(np.abs(probs - reference).max()),
+            "batches": {},
+        }
+        for bs in batch_sizes:
+            batch = (texts * (bs // len(texts) + 1))[:bs]
+            backend.logits(batch)  # warm up
+            latencies = []
+            deadline = time.perf_counter() + args.seconds
+            while time.perf_counter() < deadline or len(latencies) < 3:
+                started = time.perf_counter()
+                backend.logits(batch)
+                latencies.append(time.perf_counter() - started)
+            lat = np.array(latencies) * 1000.0
+            entry["batches"][str(bs)] = {
+                "p50_ms": round(float(np.percentile(lat, 50)), 2),
+                "p95_ms": round(float(np.percentile(lat, 95)), 2),
+                "texts_per_second": round(bs * 1000.0 / float(lat.mean()), 1),
+            }
+        results[name] = entry
+        print(name, json.dumps(entry))
+
+    base = results.get("torch")
+    if base:
+        for name, entry in results.items():
+            for bs, stats in entry["batches"].items():
+                stats["speedup_vs_torch"] = round(stats["texts_per_second"] / base["batches"][bs]["texts_per_second"], 2)
+
+    report = {"model": args.model, "threads": args.threads, "backends": results}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Equivalence check and timing for the clean_html engines.
+
+Every engine's output is compared with the original BeautifulSoup
+implementation over benchmarks/fixtures/feed_html.json; the script exits
+non-zero on any mismatch.
+
+    python -m benchmarks.bench_clean_html --repeat 200
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixture_server import FIXTURES
+from src.api.clean_text import ENGINES, clean_html
+
+
+def reference(raw_html):
+    # clean_html as it was before the fast path and engines
+    clean = BeautifulSoup(raw_html, "html.parser").get_text()
+    clean = re.sub(r'\s+', ' ', clean)
+    return clean.strip()
+
+
+def load_corpus():
+    with open(os.path.join(FIXTURES, "feed_html.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    expected = [reference(s) for s in corpus]
+
+    mismatches = 0
+    for engine in ENGINES:
+        for raw, want in zip(corpus, expected):
+            got = clean_html(raw, engine=engine)
+            if got != want:
+                mismatches += 1
+                print(f"[{engine}] mismatch for {raw[:60]!r}\n  expected {want!r}\n  got      {got!r}", file=sys.stderr)
+
+    timings = {}
+    runs = [("reference", reference)] + [(e, lambda s, e=e: clean_html(s, engine=e)) for e in ENGINES]
+    for name, fn in runs:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for s in corpus:
+                fn(s)
+        timings[name] = (time.perf_counter() - started) * 1e6 / (args.repeat * len(corpus))
+
+    print(json.dumps({
+        "documents": len(corpus),
+        "mismatches": mismatches,
+        "us_per_document": {k: round(v, 2) for k, v in timings.items()},
+        "speedup_vs_reference": {k: round(timings["reference"] / v, 2) for k, v in timings.items()},
+    }, indent=2))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Repeated dashboard-style feed refreshes with and without FeedCache.
+
+    python -m benchmarks.bench_feed_cache --refreshes 20 --freshness 0
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from src.data.async_fetcher import AsyncFetcher
+from src.data.feed_cache import FeedCache
+
+
+async def refresh_loop(urls, refreshes, freshness=None):
+    async with AsyncFetcher() as fetcher:
+        cache = FeedCache(fetcher, freshness=freshness) if freshness is not None else None
+        timings = []
+        for _ in range(refreshes):
+            started = time.perf_counter()
+            if cache is None:
+                await fetcher.fetch_feeds(urls)
+            else:
+                await cache.get_many(urls)
+            timings.append((time.perf_counter() - started) * 1000.0)
+        return timings, cache.stats() if cache else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", type=int, default=3)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--freshness", type=float, default=0.0,
+                        help="0 revalidates every refresh, so only conditional GETs are measured")
+    args = parser.parse_args()
+
+    with FixtureServer(latency_ms=args.latency_ms, items_per_feed=args.items) as server:
+        urls = server.feed_urls(args.feeds)
+        plain, _ = asyncio.run(refresh_loop(urls, args.refreshes))
+        cached, stats = asyncio.run(refresh_loop(urls, args.refreshes, args.freshness))
+
+    def summary(ts):
+        return {"first_ms": round(ts[0], 1), "mean_rest_ms": round(sum(ts[1:]) / max(1, len(ts) - 1), 1)}
+
+    print(json.dumps({
+        "uncached": summary(plain),
+        "cached": summary(cached),
+        "hit_ratio": round(stats["hit_ratio"], 3),
+        "upstream_304s": server.not_modified,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
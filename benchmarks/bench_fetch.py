@@ -0,0 +1,68 @@
+"""Sequential vs. async feed ingestion against a local fixture server.
+
+    python -m benchmarks.bench_fetch --feeds 6 --per-feed 5 --latency-ms 100
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import feedparser
+from newspaper import Article
+
+from benchmarks.fixture_server import FixtureServer
+from src.data.async_fetcher import AsyncFetcher
+
+
+def sequential(feed_urls, per_feed):
+    # the pre-async fetch_once loop, without the nlp() step
+    count = 0
+    for url in feed_urls:
+        d = feedparser.parse(url)
+        for e in d.entries[:per_feed]:
+            a = Article(e.link)
+            a.download()
+            a.parse()
+            count += 1
+    return count
+
+
+async def concurrent(feed_urls, per_feed, per_host):
+    async with AsyncFetcher(per_host_limit=per_host) as fetcher:
+        parsed = await fetcher.fetch_feeds(feed_urls)
+        links = [e.link for d in parsed if not isinstance(d, Exception) for e in d.entries[:per_feed]]
+        articles = await fetcher.fetch_articles(links, nlp=False)
+        return sum(not isinstance(a, Exception) for a in articles)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--feeds", type=int, default=6)
+    parser.add_argument("--per-feed", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    with FixtureServer(latency_ms=args.latency_ms, items_per_feed=args.per_feed) as server:
+        urls = server.feed_urls(args.feeds)
+
+        started = time.perf_counter()
+        seq_count = sequential(urls, args.per_feed)
+        seq_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        async_count = asyncio.run(concurrent(urls, args.per_feed, args.per_host))
+        async_s = time.perf_counter() - started
+
+    print(json.dumps({
+        "feeds": args.feeds,
+        "articles_per_feed": args.per_feed,
+        "latency_ms": args.latency_ms,
+        "sequential": {"articles": seq_count, "seconds": round(seq_s, 3)},
+        "async": {"articles": async_count, "seconds": round(async_s, 3)},
+        "speedup": round(seq_s / async_s, 2) if async_s else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
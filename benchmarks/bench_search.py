@@ -0,0 +1,99 @@
+"""Query latency of the article vector index at scale.
+
+Fills an index with synthetic vectors of the embedder's output size in
+batches, as ingestion would, then times k-NN queries for the brute-force and
+hnsw backends and reports hnsw recall@k against the exact brute-force result.
+The vectors are drawn around `--clusters` topic centres, since real article
+embeddings cluster by topic; uniform random vectors are the worst case for
+any approximate index.
+
+    python -m benchmarks.bench_search --items 100000 --dim 384 --queries 200
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.data.vector_index import VectorIndex, hnswlib
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=1000, help="0 draws uniform random vectors")
+    parser.add_argument("--spread", type=float, default=0.5, help="noise around each cluster centre")
+    parser.add_argument("--batch", type=int, default=1000, help="vectors per insert, like one ingestion sync")
+    parser.add_argument("--backends", default="brute,hnsw" if hnswlib else "brute")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.clusters:
+        centres = rng.normal(size=(args.clusters, args.dim))
+        vectors = centres[rng.integers(args.clusters, size=args.items)]
+        queries = centres[rng.integers(args.clusters, size=args.queries)]
+        vectors = vectors + args.spread * rng.normal(size=vectors.shape)
+        queries = queries + args.spread * rng.normal(size=queries.shape)
+    else:
+        vectors = rng.normal(size=(args.items, args.dim))
+        queries = rng.normal(size=(args.queries, args.dim))
+    vectors, queries = vectors.astype(np.float32), queries.astype(np.float32)
+
+    results, exact = {}, None
+    for backend in args.backends.split(","):
+        path = tempfile.mkdtemp(prefix="bench_search_")
+        try:
+            index = VectorIndex(path, args.dim, backend)
+            started = time.perf_counter()
+            for start in range(0, args.items, args.batch):
+                ids = list(range(start + 1, min(start + args.batch, args.items) + 1))
+                index.add(ids, vectors[start:start + args.batch], cursor=ids[-1])
+            index.save()
+            build = time.perf_counter() - started
+
+            index.search(queries[0], args.k)  # warm up
+            latencies, found = [], []
+            for q in queries:
+                t = time.perf_counter()
+                hits = index.search(q, args.k)
+                latencies.append(time.perf_counter() - t)
+                found.append({i for i, _ in hits})
+
+            reopened = time.perf_counter()
+            VectorIndex(path, args.dim, backend).search(queries[0], args.k)
+            reopen = time.perf_counter() - reopened
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+        lat = np.array(latencies) * 1000.0
+        entry = {
+            "build_seconds": round(build, 2),
+            "reopen_and_first_query_seconds": round(reopen, 3),
+            "p50_ms": round(float(np.percentile(lat, 50)), 3),
+            "p95_ms": round(float(np.percentile(lat, 95)), 3),
+            "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        }
+        if exact is None and backend == "brute":
+            exact = found
+        if exact is not None and backend != "brute":
+            entry[f"recall_at_{args.k}"] = round(
+                float(np.mean([len(f & e) / args.k for f, e in zip(found, exact)])), 4
+            )
+        results[backend] = entry
+        print(backend, json.dumps(entry))
+
+    report = {"items": args.items, "dim": args.dim, "k": args.k, "clusters": args.clusters, "backends": results}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
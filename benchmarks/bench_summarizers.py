@@ -0,0 +1,132 @@
+"""Latency and ROUGE of the summarizers on the fixture corpus.
+
+Compares lead-N sentences, plain TextRank, TextRank with the lead prior
+(the extractive tier /analyze uses), the abstractive model, and the length
+router, against the reference summaries in benchmarks/fixtures/news_corpus.json.
+ROUGE-1/2/L are F1 scores over lower-cased word tokens.
+
+    python -m benchmarks.bench_summarizers                      # extractive only
+    python -m benchmarks.bench_summarizers --abstractive        # also runs SUMMARIZER_MODEL
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.api.chunking import split_sentences
+from src.api.extractive import extractive_summary, route
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+_WORD = re.compile(r"\w+", re.U)
+
+
+def tokens(text):
+    return _WORD.findall(text.lower())
+
+
+def _f1(overlap, candidate, reference):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    cand = Counter(zip(*(candidate[i:] for i in range(n))))
+    ref = Counter(zip(*(reference[i:] for i in range(n))))
+    return _f1(sum((cand & ref).values()), max(sum(cand.values()), 1), max(sum(ref.values()), 1))
+
+
+def rouge_l(candidate, reference):
+    # longest common subsequence by dynamic programming
+    prev = [0] * (len(reference) + 1)
+    for c in candidate:
+        cur = [0]
+        for j, r in enumerate(reference):
+            cur.append(prev[j] + 1 if c == r else max(prev[j + 1], cur[j]))
+        prev = cur
+    return _f1(prev[-1], max(len(candidate), 1), max(len(reference), 1))
+
+
+def scores(candidate, reference):
+    cand, ref = tokens(candidate), tokens(reference)
+    return {"rouge1": rouge_n(cand, ref, 1), "rouge2": rouge_n(cand, ref, 2), "rougeL": rouge_l(cand, ref)}
+
+
+def load_abstractive():
+    from transformers import pipeline
+
+    summarizer = pipeline("summarization", model=os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn"))
+    # same generation settings as /analyze
+    return lambda text: summarizer(text, max_length=150, min_length=100, do_sample=False, truncation=True)[0][
+        "summary_text"
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sentences", type=int, default=2, help="sentences per extractive summary")
+    parser.add_argument("--lead-weight", type=float, default=0.7)
+    parser.add_argument("--abstractive", action="store_true", help="also time and score SUMMARIZER_MODEL")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions for the extractive methods")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "news_corpus.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    methods = {
+        f"lead{args.sentences}": lambda t: " ".join(split_sentences(t)[:args.sentences]),
+        "textrank": lambda t: extractive_summary(t, args.sentences, lead_weight=0.0),
+        "textrank_lead": lambda t: extractive_summary(t, args.sentences, lead_weight=args.lead_weight),
+    }
+    repeats = {name: args.repeat for name in methods}
+    if args.abstractive:
+        abstractive = load_abstractive()
+        abstractive(corpus[0]["text"])  # load + warm up outside the timings
+        methods["abstractive"] = abstractive
+        repeats["abstractive"] = 1
+
+        def routed(text):
+            # what /analyze does by default (with the default thresholds)
+            method = route(text)
+            if method == "abstractive":
+                return abstractive(text)
+            return text if method == "passthrough" else extractive_summary(text, args.sentences, args.lead_weight)
+
+        methods["routed"] = routed
+        repeats["routed"] = 1
+
+    results = {}
+    for name, fn in methods.items():
+        latencies, rows = [], []
+        for doc in corpus:
+            started = time.perf_counter()
+            for _ in range(repeats[name]):
+                summary = fn(doc["text"])
+            latencies.append((time.perf_counter() - started) / repeats[name])
+            rows.append(scores(summary, doc["summary"]))
+        lat = np.array(latencies) * 1000.0
+        entry = {metric: round(float(np.mean([r[metric] for r in rows])), 4) for metric in rows[0]}
+        entry.update({
+            "mean_ms": round(float(lat.mean()), 3),
+            "p95_ms": round(float(np.percentile(lat, 95)), 3),
+        })
+        results[name] = entry
+        print(name, json.dumps(entry))
+
+    report = {"documents": len(corpus), "sentences": args.sentences, "methods": results}
+    if args.abstractive:
+        report["routes"] = dict(Counter(route(doc["text"]) for doc in corpus))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Memory and throughput of the API as the number of gunicorn workers grows.
+
+For each worker count the server is started with src/api/gunicorn_conf.py,
+warmed up, and loaded with concurrent requests. Memory is reported as the
+summed RSS of master and workers (shared pages counted once per process)
+and as the summed PSS (shared pages split between the processes that map
+them), which is the real footprint. `--mode per-worker` loads the models in
+each worker instead of the master for comparison.
+
+    python -m benchmarks.bench_workers --workers 1,2,4 --endpoint predict
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.fixture_server import FIXTURES
+
+
+def load_texts():
+    with open(os.path.join(FIXTURES, "news_corpus.json"), encoding="utf-8") as f:
+        return [doc["text"] for doc in json.load(f)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_tree(root):
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        pids.append(pid)
+        todo.extend(children.get(pid, []))
+    return pids
+
+
+def memory_kb(pid):
+    # smaps_rollup has Rss and Pss in kB
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def tree_memory_mb(root):
+    totals = {"Rss": 0, "Pss": 0}
+    for pid in process_tree(root):
+        for key, kb in memory_kb(pid).items():
+            totals[key] += kb
+    return {"rss_mb": round(totals["Rss"] / 1024, 1), "pss_mb": round(totals["Pss"] / 1024, 1)}
+
+
+def wait_ready(base, deadline):
+    while time.time() < deadline:
+        try:
+            r = httpx.get(f"{base}/models", timeout=10)
+            models = r.json()["models"].values()
+            if all(m["state"] == "ready" for m in models if m["hosted"]):
+                return True
+        except (httpx.TransportError, ValueError, KeyError):
+            pass
+        time.sleep(0.5)
+    return False
+
+
+async def load(base, endpoint, texts, concurrency, seconds):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(i):
+        nonlocal errors
+        async with httpx.AsyncClient(timeout=120) as client:
+            n = i
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                r = await client.post(f"{base}/{endpoint}", json={"text": texts[n % len(texts)]})
+                if r.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                n += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    lat = np.array(latencies or [0.0]) * 1000.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(lat, 50)), 1),
+        "p95_ms": round(float(np.percentile(lat, 95)), 1),
+    }
+
+
+def run(workers, args, texts):
+    port = free_port()
+    env = dict(os.environ, WEB_WORKERS=str(workers), PORT=str(port))
+    if args.mode == "per-worker":
+        env.update(PRELOAD_MODELS="", WARMUP_MODELS="all")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "src/api/gunicorn_conf.py", "--bind", f"127.0.0.1:{port}",
+         "src.api.main:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if not args.verbose else None,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_ready(base, time.time() + args.startup_timeout):
+            raise RuntimeError(f"server with {workers} workers did not become ready")
+        if args.mode == "per-worker":
+            time.sleep(args.settle)  # the other workers are still loading their own copies
+        # one request per text so every worker has run inference before memory is sampled
+        asyncio.run(load(base, args.endpoint, texts, workers, 1.0))
+        idle = tree_memory_mb(server.pid)
+        stats = asyncio.run(load(base, args.endpoint, texts, args.concurrency, args.seconds))
+        busy = tree_memory_mb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    return {"workers": workers, "idle": idle, "under_load": busy, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--mode", choices=["preload", "per-worker"], default="preload")
+    parser.add_argument("--endpoint", default="predict", help="predict or analyze")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--settle", type=float, default=10.0, help="per-worker mode: extra seconds for workers to load")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--verbose", action="store_true", help="show the server log")
+    args = parser.parse_args()
+
+    texts = load_texts()
+    results = []
+    for n in [int(w) for w in args.workers.split(",")]:
+        result = run(n, args, texts)
+        results.append(result)
+        print(json.dumps(result))
+
+    report = {"mode": args.mode, "endpoint": args.endpoint, "cpus": os.cpu_count(), "runs": results}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
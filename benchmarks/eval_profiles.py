@@ -0,0 +1,150 @@
+"""Latency, memory and quality of the model profiles on the fixture corpus.
+
+Each profile is measured in a fresh process, so memory numbers don't include
+another profile's leftovers. For the summarizer and the NER model it reports
+load time, RSS growth while loading, parameter bytes, per-article latency,
+and quality against benchmarks/fixtures/news_corpus.json: ROUGE-1/2/L of the
+abstractive summaries (same generation settings as /analyze) and
+precision/recall/F1 of the extracted entity names. Deltas are relative to
+the baseline profile.
+
+    python -m benchmarks.eval_profiles                                  # quality vs fast
+    python -m benchmarks.eval_profiles --profiles quality,fast --out profiles.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_summarizers import FIXTURES, scores
+from src.api.entities import normalize_entities
+from src.api.models import ModelRegistry
+from src.api.profiles import PROFILES, profile_models
+
+
+def load_corpus():
+    with open(os.path.join(FIXTURES, "news_corpus.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def timed(fn, corpus):
+    fn(corpus[0]["text"])  # warm up outside the timings
+    outputs, latencies = [], []
+    for doc in corpus:
+        started = time.perf_counter()
+        outputs.append(fn(doc["text"]))
+        latencies.append(time.perf_counter() - started)
+    lat = np.array(latencies) * 1000.0
+    return outputs, {"mean_ms": round(float(lat.mean()), 2), "p95_ms": round(float(np.percentile(lat, 95)), 2)}
+
+
+def entity_scores(predicted, reference):
+    found = {e["word"].casefold() for e in normalize_entities(predicted) if e.get("word")}
+    expected = {e.casefold() for e in reference}
+    hits = len(found & expected)
+    precision = hits / len(found) if found else 0.0
+    recall = hits / len(expected) if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def mean_scores(rows):
+    return {metric: round(float(np.mean([r[metric] for r in rows])), 4) for metric in rows[0]}
+
+
+def load_entry(registry, name):
+    info = registry.status()["models"][name]
+    return {
+        "load_s": round(info["load_seconds"], 2),
+        "rss_delta_mb": round((info.get("rss_delta_bytes") or 0) / 2**20, 1),
+        "param_mb": round(info["param_bytes"] / 2**20, 1),
+    }
+
+
+def evaluate(profile):
+    """Measure one profile in this process."""
+    from transformers import pipeline
+
+    corpus = load_corpus()
+    models = profile_models(profile)
+    registry = ModelRegistry()
+    registry.register("summarizer", lambda: pipeline("summarization", model=models["summarizer"]))
+    registry.register("ner", lambda: pipeline("ner", model=models["ner"], grouped_entities=True))
+
+    summarizer = registry.get("summarizer")
+    summaries, latency = timed(
+        lambda t: summarizer(t, max_length=150, min_length=100, do_sample=False, truncation=True)[0]["summary_text"],
+        corpus,
+    )
+    summary = dict(load_entry(registry, "summarizer"), model=models["summarizer"], **latency)
+    summary.update(mean_scores([scores(s, doc["summary"]) for s, doc in zip(summaries, corpus)]))
+
+    ner = registry.get("ner")
+    found, latency = timed(ner, corpus)
+    entities = dict(load_entry(registry, "ner"), model=models["ner"] or "pipeline-default", **latency)
+    entities.update(mean_scores([entity_scores(f, doc["entities"]) for f, doc in zip(found, corpus)]))
+
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"summarizer": summary, "ner": entities, "peak_rss_mb": round(peak, 1)}
+
+
+def relative(value, base):
+    if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+        return None
+    return round((value - base) / base, 3)
+
+
+def deltas(result, baseline):
+    out = {"peak_rss_mb": relative(result["peak_rss_mb"], baseline["peak_rss_mb"])}
+    for part in ("summarizer", "ner"):
+        out[part] = {
+            metric: relative(value, baseline[part][metric])
+            for metric, value in result[part].items() if metric != "model"
+        }
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", default="quality,fast", help=f"comma-separated, from {sorted(PROFILES)}")
+    parser.add_argument("--baseline", default=None, help="profile the deltas are relative to (default: the first)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(evaluate(args.child)))
+        return
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    for profile in profiles:
+        profile_models(profile)  # fail fast on a typo
+    baseline = args.baseline or profiles[0]
+
+    results = {}
+    for profile in profiles:
+        print(f"evaluating {profile} ...", file=sys.stderr)
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.eval_profiles", "--child", profile],
+            check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        results[profile] = json.loads(out.strip().splitlines()[-1])
+        print(profile, json.dumps(results[profile]))
+
+    report = {"documents": len(load_corpus()), "baseline": baseline, "profiles": results}
+    if baseline in results:
+        report["deltas"] = {p: deltas(r, results[baseline]) for p, r in results.items() if p != baseline}
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
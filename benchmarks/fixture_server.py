@@ -0,0 +1,96 @@
+"""Local stand-in for upstream RSS feeds and article pages.
+
+Serves /feed/<n>.xml and /article/<n>/<m>.html from the templates in
+benchmarks/fixtures, with an optional artificial latency per request.
+Responses carry ETag/Last-Modified and honour If-None-Match with a 304.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _template(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return Template(f.read())
+
+
+class FixtureServer:
+    def __init__(self, latency_ms=50.0, items_per_feed=10, host="127.0.0.1", port=0):
+        self.latency = latency_ms / 1000.0
+        self.items_per_feed = items_per_feed
+        self.requests = 0
+        self.not_modified = 0
+        self.last_modified = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime())
+        self._feed = _template("feed.xml")
+        self._item = _template("feed_item.xml")
+        self._article = _template("article.html")
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, ctype, body = server.render(self.path)
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", server.last_modified)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.base = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def render(self, path):
+        m = re.fullmatch(r"/feed/(\d+)\.xml", path)
+        if m:
+            feed = m.group(1)
+            items = "".join(
+                self._item.substitute(base=self.base, feed=feed, item=i) for i in range(self.items_per_feed)
+            )
+            body = self._feed.substitute(base=self.base, feed=feed, items=items)
+            return 200, "application/rss+xml; charset=utf-8", body.encode("utf-8")
+        m = re.fullmatch(r"/article/(\d+)/(\d+)\.html", path)
+        if m:
+            body = self._article.substitute(feed=m.group(1), item=m.group(2))
+            return 200, "text/html; charset=utf-8", body.encode("utf-8")
+        return 404, "text/plain", b"not found"
+
+    def feed_urls(self, n):
+        return [f"{self.base}/feed/{i}.xml" for i in range(n)]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
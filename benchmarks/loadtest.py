@@ -0,0 +1,253 @@
+"""Load test of /predict, /analyze and /fetch_sample against a local API instance.
+
+The API runs in a child process with stubbed models (benchmarks/stub_models.py)
+and its feeds pointed at a local fixture server, so runs are reproducible
+and need no network. Every endpoint is driven at each concurrency level and
+text length; latency percentiles, throughput and the server's peak RSS are
+written to JSON. Responses served degraded by admission control (an
+`X-Degraded` header) are counted apart from full ones and left out of the
+latency and throughput figures. Pass `--baseline` with an earlier result file to print the
+change per scenario.
+
+    python -m benchmarks.loadtest --concurrency 1,8,32 --words 50,400,2000 --out loadtest.json
+    python -m benchmarks.loadtest --baseline loadtest.json --out loadtest-new.json
+
+`--models real` keeps the models configured through the usual environment
+variables (e.g. tiny local checkpoints) instead of the stubs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_workers import free_port
+from benchmarks.fixture_server import FIXTURES, FixtureServer
+
+
+def load_corpus_words():
+    with open(os.path.join(FIXTURES, "news_corpus.json"), encoding="utf-8") as f:
+        return " ".join(doc["text"] for doc in json.load(f)).split()
+
+
+def make_texts(words, n=16):
+    # n different texts of `words` words each, cut from the corpus at different offsets
+    corpus = load_corpus_words()
+    texts = []
+    for i in range(n):
+        start = (i * 97) % len(corpus)
+        picked = [corpus[(start + j) % len(corpus)] for j in range(words)]
+        texts.append(" ".join(picked))
+    return texts
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- server side
+
+def serve(args):
+    import uvicorn
+
+    from benchmarks import stub_models
+    from src.api import main
+
+    fixtures = FixtureServer(latency_ms=args.feed_latency_ms).start()
+    if args.models == "stub":
+        stub_models.install(main.registry, scale=args.model_scale)
+    main.FEEDS.clear()
+    main.FEEDS.update({f"feed{i}": url for i, url in enumerate(fixtures.feed_urls(args.feeds))})
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def start_server(args, port):
+    cmd = [
+        sys.executable, "-m", "benchmarks.loadtest", "--serve", "--port", str(port),
+        "--models", args.models, "--model-scale", str(args.model_scale),
+        "--feeds", str(args.feeds), "--feed-latency-ms", str(args.feed_latency_ms),
+    ]
+    env = dict(os.environ, INGEST_ENABLED="0")
+    env.pop("ARTICLE_DB_PATH", None)
+    if not args.cache:
+        env["CACHE_MAX_ITEMS"] = "0"  # measure the model path, not cache hits
+    server = subprocess.Popen(cmd, env=env, stderr=None if args.verbose else subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{base}/", timeout=2).status_code == 200:
+                break
+        except httpx.TransportError:
+            time.sleep(0.2)
+    else:
+        server.kill()
+        raise RuntimeError("API server did not start")
+    httpx.post(f"{base}/models/warmup", timeout=args.startup_timeout)
+    return server, base
+
+
+# --- client side
+
+async def run_level(base, endpoint, texts, concurrency, seconds, pid):
+    latencies, degraded, errors = [], [], 0
+    peak = rss_mb(pid)
+    deadline = time.perf_counter() + seconds
+
+    async def worker(i, client):
+        nonlocal errors
+        n = i
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if endpoint == "fetch_sample":
+                    r = await client.get(f"{base}/fetch_sample")
+                else:
+                    r = await client.post(f"{base}/{endpoint}", json={"text": texts[n % len(texts)]})
+                ok = r.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if not ok:
+                errors += 1
+            elif r.headers.get("X-Degraded"):
+                degraded.append(time.perf_counter() - started)
+            else:
+                latencies.append(time.perf_counter() - started)
+            n += concurrency
+
+    async def sample_rss():
+        nonlocal peak
+        while time.perf_counter() < deadline:
+            peak = max(peak, rss_mb(pid))
+            await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(sample_rss(), *(worker(i, client) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    lat = np.array(latencies or [0.0]) * 1000.0
+    return {
+        "requests": len(latencies),
+        "degraded": len(degraded),
+        "degraded_p95_ms": round(float(np.percentile(np.array(degraded or [0.0]) * 1000.0, 95)), 2),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p95_ms": round(float(np.percentile(lat, 95)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+        "peak_rss_mb": round(max(peak, rss_mb(pid)), 1),
+    }
+
+
+def scenario_key(r):
+    return r["endpoint"], r["words"], r["concurrency"]
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {scenario_key(r): r for r in json.load(f)["results"]}
+
+    def change(new, old):
+        return f"{(new - old) / old * 100.0:+.1f}%" if old else "n/a"
+
+    print(f"\nchange vs {baseline_path}:")
+    print(f"{'endpoint':<14}{'words':>7}{'conc':>6}{'req/s':>10}{'p95':>10}{'p99':>10}{'rss':>10}{'degraded':>10}")
+    for r in results:
+        old = baseline.get(scenario_key(r))
+        if old is None:
+            continue
+        print(f"{r['endpoint']:<14}{r['words']:>7}{r['concurrency']:>6}"
+              f"{change(r['requests_per_second'], old['requests_per_second']):>10}"
+              f"{change(r['p95_ms'], old['p95_ms']):>10}"
+              f"{change(r['p99_ms'], old['p99_ms']):>10}"
+              f"{change(r['peak_rss_mb'], old['peak_rss_mb']):>10}"
+              f"{r['degraded'] - old.get('degraded', 0):>+10}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", default="predict,analyze,fetch_sample")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--words", default="50,400,2000", help="text lengths for /predict and /analyze")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each scenario")
+    parser.add_argument("--models", choices=["stub", "real"], default="stub")
+    parser.add_argument("--model-scale", type=float, default=1.0, help="multiplies the stub models' cost")
+    parser.add_argument("--feeds", type=int, default=3)
+    parser.add_argument("--feed-latency-ms", type=float, default=50.0)
+    parser.add_argument("--cache", action="store_true", help="keep the /analyze result cache on")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the server log")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    server, base = start_server(args, free_port())
+    results = []
+    try:
+        for endpoint in args.endpoints.split(","):
+            lengths = [0] if endpoint == "fetch_sample" else [int(w) for w in args.words.split(",")]
+            for words in lengths:
+                texts = make_texts(words) if words else []
+                for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                    stats = asyncio.run(run_level(base, endpoint, texts, concurrency, args.seconds, server.pid))
+                    result = {"endpoint": endpoint, "words": words, "concurrency": concurrency, **stats}
+                    results.append(result)
+                    print(json.dumps(result))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "models": args.models,
+            "model_scale": args.model_scale,
+            "seconds": args.seconds,
+            "feed_latency_ms": args.feed_latency_ms,
+            "cache": args.cache,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Stand-ins for the classifier, summarizer and NER models.
+
+They implement just the interfaces src/api/main.py uses and spend a fixed
+amount of time per call plus per token (sleeping, like a model that releases
+the GIL), so load tests exercise the serving path without downloading or
+running real models.
+"""
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+# milliseconds per call and per token at scale 1.0
+COSTS = {
+    "classifier": (2.0, 0.01),
+    "summarizer": (40.0, 0.1),
+    "ner": (4.0, 0.02),
+}
+
+
+class StubTokenizer:
+    """Whitespace tokenizer with the call/decode surface `chunk_text` needs.
+
+    The vocabulary is shared by all instances, so they encode identically,
+    as the shared encoding cache assumes for tokenizers with the same name.
+    """
+
+    name_or_path = "stub-whitespace"
+    _lock = threading.Lock()
+    _ids = {}
+    _words = []
+
+    def __len__(self):
+        # the vocabulary grows as it goes; a fixed nominal size keeps the cache key stable
+        return 1 << 20
+
+    def _id(self, word):
+        i = self._ids.get(word)
+        if i is None:
+            with self._lock:
+                i = self._ids.setdefault(word, len(self._words))
+                if i == len(self._words):
+                    self._words.append(word)
+        return i
+
+    def __call__(self, texts, add_special_tokens=True, **kwargs):
+        if isinstance(texts, str):
+            return {"input_ids": [self._id(w) for w in texts.split()]}
+        return {"input_ids": [[self._id(w) for w in t.split()] for t in texts]}
+
+    def decode(self, ids):
+        return " ".join(self._words[i] for i in ids)
+
+
+def _spend(model, texts, scale):
+    per_call, per_token = COSTS[model]
+    tokens = sum(len(t.split()) for t in texts)
+    time.sleep(scale * (per_call + per_token * tokens) / 1000.0)
+
+
+class StubClassifier:
+    name = "stub"
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.tokenizer = StubTokenizer()
+
+    def logits(self, texts):
+        _spend("classifier", texts, self.scale)
+        # deterministic per text, so repeated runs classify the same way
+        seeds = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=4).digest(), "little") for t in texts]
+        return np.array([np.random.default_rng(s).normal(size=4) for s in seeds], dtype=np.float32)
+
+
+class StubSummarizer:
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.tokenizer = StubTokenizer()
+
+    def __call__(self, inputs, max_length=150, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        _spend("summarizer", texts, self.scale)
+        return [{"summary_text": " ".join(t.split()[:max_length // 2])} for t in texts]
+
+
+class StubNER:
+    def __init__(self, scale=1.0):
+        self.scale = scale
+
+    def __call__(self, inputs, **kwargs):
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        _spend("ner", texts, self.scale)
+        results = []
+        for t in texts:
+            # capitalized words stand in for entities
+            words = [w.strip(".,;:\"'()") for w in t.split()]
+            results.append([
+                {"entity_group": "MISC", "score": np.float32(0.9), "word": w}
+                for w in words[1:] if w[:1].isupper()
+            ][:20])
+        return results[0] if isinstance(inputs, str) else results
+
+
+def install(registry, scale=1.0):
+    """Register the stubs in a `ModelRegistry` in place of the real loaders."""
+    registry.register("classifier", lambda: StubClassifier(scale))
+    registry.register("summarizer", lambda: StubSummarizer(scale))
+    registry.register("ner", lambda: StubNER(scale))
@@ -0,0 +1,154 @@
+"""Admission control for the model endpoints.
+
+Each `Limiter` admits a fixed number of concurrent requests and queues a
+bounded number more for at most `queue_timeout` seconds. Requests beyond that
+are turned away at once (`429` when the queue is full, `503` when the wait
+runs out) instead of piling onto the models. Requests admitted while the
+limiter is busy are flagged as degraded, so the endpoint can skip its most
+expensive work.
+"""
+import asyncio
+import contextvars
+import math
+import os
+import time
+
+from src.api import metrics
+
+SHED = metrics.Counter("requests_shed_total", "Requests turned away by admission control", ["endpoint", "reason"])
+DEGRADED = metrics.Counter("requests_degraded_total", "Requests admitted in degraded mode", ["endpoint"])
+WAIT_SECONDS = metrics.Histogram("admission_wait_seconds", "Time requests spent queued for admission", ["endpoint"])
+ACTIVE = metrics.Gauge("admission_active", "Requests currently admitted", ["endpoint"])
+QUEUED = metrics.Gauge("admission_queued", "Requests waiting for admission", ["endpoint"])
+
+_degraded = contextvars.ContextVar("degraded", default=False)
+
+
+def degraded():
+    """True when the current request was admitted under pressure."""
+    return _degraded.get()
+
+
+def set_degraded(value):
+    return _degraded.set(value)
+
+
+def reset_degraded(token):
+    _degraded.reset(token)
+
+
+class Rejected(Exception):
+    def __init__(self, status_code, detail, retry_after=1):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Limiter:
+    def __init__(self, name, concurrency, queue, queue_timeout, degrade_at=None):
+        """`concurrency <= 0` admits everything; `degrade_at` is the number of busy
+        slots (admitted plus queued) from which requests are degraded, 0 never."""
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.degrade_at = concurrency if degrade_at is None else degrade_at
+        self.active = 0
+        self.waiting = 0
+        self._sem = None
+        self._loop = None
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._sem, self._loop = asyncio.Semaphore(self.concurrency), loop
+        return self._sem
+
+    async def acquire(self):
+        """Wait for a slot; returns whether the request should be served degraded.
+
+        Raises `Rejected` when the request is shed.
+        """
+        if self.concurrency <= 0:
+            return False
+        sem = self._semaphore()
+        busy = self.active + self.waiting
+        if sem.locked():
+            if self.waiting >= self.queue:
+                SHED.labels(self.name, "queue_full").inc()
+                raise Rejected(429, f"{self.name} is at capacity, retry shortly")
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(sem.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                SHED.labels(self.name, "queue_timeout").inc()
+                raise Rejected(
+                    503, f"{self.name} waited {self.queue_timeout:g}s for capacity", math.ceil(self.queue_timeout)
+                ) from None
+            finally:
+                self.waiting -= 1
+                WAIT_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+        else:
+            await sem.acquire()
+        self.active += 1
+        is_degraded = 0 < self.degrade_at <= busy
+        if is_degraded:
+            DEGRADED.labels(self.name).inc()
+        return is_degraded
+
+    def release(self):
+        if self.concurrency <= 0:
+            return
+        self.active -= 1
+        self._sem.release()
+
+    def hold(self, response):
+        """Wrap an admitted ASGI `response` so its slot is released once it's sent.
+
+        The slot is freed however sending ends: completed, failed, or the
+        client disconnected before the body was read.
+        """
+        return _Held(response, self.release)
+
+    def collect(self):
+        ACTIVE.labels(self.name).set(self.active)
+        QUEUED.labels(self.name).set(self.waiting)
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "queue_timeout": self.queue_timeout,
+            "degrade_at": self.degrade_at,
+            "active": self.active,
+            "waiting": self.waiting,
+        }
+
+
+class _Held:
+    # a streamed response keeps its slot until the last chunk is sent
+    def __init__(self, response, release):
+        self.response = response
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.release()
+
+
+def limiter_from_env(name, concurrency, queue, queue_timeout_ms):
+    # e.g. ANALYZE_MAX_CONCURRENCY, ANALYZE_MAX_QUEUE, ANALYZE_QUEUE_TIMEOUT_MS, ANALYZE_DEGRADE_AT
+    prefix = name.upper()
+    concurrency = int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(concurrency)))
+    degrade_at = os.getenv(f"{prefix}_DEGRADE_AT")
+    return Limiter(
+        name,
+        concurrency,
+        int(os.getenv(f"{prefix}_MAX_QUEUE", str(queue))),
+        float(os.getenv(f"{prefix}_QUEUE_TIMEOUT_MS", str(queue_timeout_ms))) / 1000.0,
+        degrade_at=int(degrade_at) if degrade_at is not None else None,
+    )
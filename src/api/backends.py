@@ -0,0 +1,162 @@
+import importlib.util
+import inspect
+import os
+import re
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from src.api import metrics, tokens
+
+MAX_LENGTH = 512
+
+
+def unbucket(parts, n):
+    # (indices, rows) per length bucket -> rows in input order
+    out = None
+    for idx, rows in parts:
+        if out is None:
+            out = np.empty((n,) + rows.shape[1:], dtype=rows.dtype)
+        out[idx] = rows
+    return out
+
+
+class TorchBackend:
+    """Eager PyTorch inference, optionally with dynamic int8 quantization of Linear layers."""
+
+    def __init__(self, model_path, quantize=False):
+        self.name = "torch-int8" if quantize else "torch"
+        self.model_path = model_path
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def logits(self, texts):
+        parts = []
+        for idx, inputs in tokens.batches(self.tokenizer, texts, MAX_LENGTH, "classifier"):
+            with metrics.timer("forward"), torch.no_grad():
+                out = self.model(**{k: torch.from_numpy(v) for k, v in inputs.items()}).logits.numpy()
+            parts.append((idx, out))
+        return unbucket(parts, len(texts))
+
+
+class _LogitsOnly(torch.nn.Module):
+    # positional inputs -> logits, so the ONNX graph has a plain signature
+    def __init__(self, model, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *args):
+        return self.model(**dict(zip(self.input_names, args))).logits
+
+
+def export_onnx(model_path, onnx_path, opset=17):
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    sample = tokenizer(["export sample", "a second, longer export sample"], return_tensors="pt", padding=True)
+    names = [n for n in tokenizer.model_input_names if n in sample]
+    axes = {n: {0: "batch", 1: "sequence"} for n in names}
+    axes["logits"] = {0: "batch"}
+
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False  # the TorchScript exporter handles dynamic_axes for HF models reliably
+    os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model, names),
+            tuple(sample[n] for n in names),
+            onnx_path,
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=axes,
+            opset_version=opset,
+            **kwargs,
+        )
+    return onnx_path
+
+
+def quantize_onnx(onnx_path, quantized_path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+class OnnxBackend:
+    """ONNX Runtime inference; the model is exported (and quantized) on first use and reused afterwards."""
+
+    def __init__(self, model_path, quantize=False, cache_dir=None, threads=0):
+        import onnxruntime as ort
+
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.model_path = model_path
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+
+        cache_dir = cache_dir or os.getenv("ONNX_CACHE_DIR", os.path.join("models", "onnx"))
+        base = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_path))
+        path = base + ".onnx"
+        if not os.path.exists(path):
+            export_onnx(model_path, path)
+        if quantize:
+            fp32_path, path = path, base + ".int8.onnx"
+            if not os.path.exists(path):
+                quantize_onnx(fp32_path, path)
+        self.onnx_path = path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def logits(self, texts):
+        parts = []
+        for idx, inputs in tokens.batches(self.tokenizer, texts, MAX_LENGTH, "classifier"):
+            feed = {n: inputs[n] for n in self.input_names}
+            with metrics.timer("forward"):
+                parts.append((idx, self.session.run(["logits"], feed)[0]))
+        return unbucket(parts, len(texts))
+
+
+BACKENDS = {
+    "torch": lambda path, **kw: TorchBackend(path),
+    "torch-int8": lambda path, **kw: TorchBackend(path, quantize=True),
+    "onnx": lambda path, **kw: OnnxBackend(path, **kw),
+    "onnx-int8": lambda path, **kw: OnnxBackend(path, quantize=True, **kw),
+}
+
+
+# optional packages a backend imports when it loads: onnx for the export, onnxruntime to run and quantize
+REQUIRES = {
+    "onnx": ("onnx", "onnxruntime"),
+    "onnx-int8": ("onnx", "onnxruntime"),
+}
+
+
+def check_backend(name):
+    """Fail at startup, not at the first request, when the backend is unknown or its packages are missing."""
+    if name not in BACKENDS:
+        raise ValueError(f"unknown classifier backend '{name}', expected one of {sorted(BACKENDS)}")
+    missing = [m for m in REQUIRES.get(name, ()) if importlib.util.find_spec(m) is None]
+    if missing:
+        raise ValueError(f"the {name} classifier backend needs {' and '.join(missing)} installed")
+
+
+def load_backend(name, model_path, **kwargs):
+    check_backend(name)
+    return BACKENDS[name](model_path, **kwargs)
+
+
+def softmax(logits):
+    z = logits - logits.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
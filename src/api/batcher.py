@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item calls into batched calls of `fn`.
+
+    `fn` receives a list of items and must return a list of results in the
+    same order. Callers block in `submit` until their own result is ready.
+    """
+
+    def __init__(self, fn, max_batch_size=32, max_wait_ms=10.0, name="batcher"):
+        self.fn = fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self._size_hist = Counter()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit_async(self, item):
+        self._ensure_started()
+        fut = Future()
+        self._queue.put((item, fut, time.perf_counter()))
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._stats_lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+        return fut
+
+    def submit(self, item, timeout=None):
+        return self.submit_async(item).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # window closed: still drain whatever is already queued
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+            except Exception as e:
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                failed = True
+            else:
+                for (_, fut, _), res in zip(batch, results):
+                    fut.set_result(res)
+                failed = False
+            finished = time.perf_counter()
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._errors += int(failed)
+                self._size_hist[len(batch)] += 1
+                self._wait_total += sum(started - enq for _, _, enq in batch)
+                self._run_total += finished - started
+
+    def stats(self):
+        with self._stats_lock:
+            batches = self._batches
+            items = self._items
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "items": items,
+                "errors": self._errors,
+                "avg_batch_size": items / batches if batches else 0.0,
+                "avg_queue_wait_ms": 1000.0 * self._wait_total / items if items else 0.0,
+                "avg_batch_run_ms": 1000.0 * self._run_total / batches if batches else 0.0,
+                "batch_size_hist": {str(k): v for k, v in sorted(self._size_hist.items())},
+            }
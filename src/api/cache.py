@@ -0,0 +1,156 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.api.clean_text import clean_html
+from src.data.sqlite_conn import Reopenable
+
+
+def content_key(text, revision=""):
+    """Hash of the normalized text plus the model revision it was computed with."""
+    normalized = clean_html(text)
+    return hashlib.sha256(f"{revision}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class ResultCache(Reopenable):
+    """In-memory LRU with TTL, optionally backed by an SQLite tier on disk.
+
+    The disk tier holds at most `max_disk_items` rows. Expired rows and the
+    oldest rows over the cap are deleted every `prune_interval` seconds
+    while results are being written.
+    """
+
+    def __init__(self, max_items=1024, ttl=3600.0, db_path=None, max_disk_items=100_000, prune_interval=60.0):
+        self.max_items = int(max_items)
+        self.ttl = float(ttl)
+        self.db_path = db_path
+        self.max_disk_items = int(max_disk_items)
+        self.prune_interval = float(prune_interval)
+        self._last_prune = 0.0
+
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()  # key -> (stored_at, value)
+        self._db = None
+        if db_path:
+            self._connect()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_stored ON results (stored_at)")
+        self._db.commit()
+
+    def _prune_disk(self, now):
+        # called under the lock; rows are otherwise only deleted when their key is read again
+        self._last_prune = now
+        if self.ttl > 0:
+            self.expirations += self._db.execute(
+                "DELETE FROM results WHERE stored_at < ?", (now - self.ttl,)
+            ).rowcount
+        excess = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_disk_items
+        if excess > 0:
+            self.evictions += self._db.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY stored_at LIMIT ?)", (excess,)
+            ).rowcount
+
+    def _expired(self, stored_at, now):
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def _mem_put(self, key, stored_at, value):
+        self._mem[key] = (stored_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        now = time.time()
+        expired = False
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._mem.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._mem[key]
+                expired = True
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, stored_at FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        value = json.loads(row[0])
+                        self._mem_put(key, row[1], value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+                    expired = True
+
+            self.expirations += int(expired)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._mem_put(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now),
+                )
+                if now - self._last_prune >= self.prune_interval:
+                    self._prune_disk(now)
+                self._db.commit()
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when `key` is None. Returns the number of entries removed."""
+        with self._lock:
+            if key is None:
+                removed = len(self._mem)
+                self._mem.clear()
+                if self._db is not None:
+                    removed = max(removed, self._db.execute("DELETE FROM results").rowcount)
+                    self._db.commit()
+                return removed
+
+            removed = int(self._mem.pop(key, None) is not None)
+            if self._db is not None:
+                removed = max(removed, self._db.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount)
+                self._db.commit()
+            return removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            disk_items = None
+            if self._db is not None:
+                disk_items = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "memory_items": len(self._mem),
+                "disk_items": disk_items,
+                "max_items": self.max_items,
+                "max_disk_items": self.max_disk_items if self._db is not None else None,
+                "ttl_seconds": self.ttl,
+                "db_path": self.db_path,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
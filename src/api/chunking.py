@@ -0,0 +1,73 @@
+import re
+
+import numpy as np
+
+from src.api.tokens import token_cache
+
+# a sentence ends at . ! or ? (plus closing quotes/brackets) followed by whitespace, so "3.5" stays whole
+_SENTENCE = re.compile(r'\S.*?(?:[.!?]+["”’)\]]*(?=\s|$)|$)', re.S)
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE.findall(text) if s.strip()]
+
+
+def chunk_text(text, tokenizer, max_tokens, overlap=1, max_chunks=None):
+    """Split `text` into chunks of at most `max_tokens` tokens on sentence boundaries.
+
+    Consecutive chunks share their last/first `overlap` sentences. Sentences
+    longer than `max_tokens` are cut on token boundaries. At most
+    `max_chunks` chunks are returned (the lead of the article is kept).
+    Text that already fits comes back unchanged as a single chunk.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    # sentence encodings are cached, so classifier and summarizer chunking share them when tokenizers match
+    encoded = token_cache.encode(tokenizer, sentences, special=False)
+    lengths = [len(ids) for ids in encoded]
+    if sum(lengths) <= max_tokens:
+        return [text]
+
+    pieces = []
+    for sentence, ids, n in zip(sentences, encoded, lengths):
+        if n <= max_tokens:
+            pieces.append((sentence, n))
+            continue
+        ids = ids.tolist()
+        for i in range(0, n, max_tokens):
+            part = ids[i:i + max_tokens]
+            pieces.append((tokenizer.decode(part).strip(), len(part)))
+
+    chunks = []
+    current, size = [], 0
+    for piece, n in pieces:
+        if current and size + n > max_tokens:
+            chunks.append(" ".join(p for p, _ in current))
+            if max_chunks and len(chunks) >= max_chunks:
+                return chunks
+            current = current[-overlap:] if overlap else []
+            size = sum(m for _, m in current)
+            # the overlap must never push a chunk over the limit
+            while current and size + n > max_tokens:
+                size -= current.pop(0)[1]
+        current.append((piece, n))
+        size += n
+    if current:
+        chunks.append(" ".join(p for p, _ in current))
+    return chunks[:max_chunks] if max_chunks else chunks
+
+
+def pool_logits(logits, groups, weights=None):
+    """Average chunk logits back to one row per text.
+
+    `groups[i]` is the text index of chunk row i; `weights` (e.g. chunk
+    lengths) make longer chunks count for more.
+    """
+    groups = np.asarray(groups)
+    weights = np.ones(len(groups)) if weights is None else np.asarray(weights, dtype=np.float64)
+    n = int(groups.max()) + 1 if len(groups) else 0
+    sums = np.zeros((n, logits.shape[-1]))
+    np.add.at(sums, groups, logits * weights[:, None])
+    totals = np.bincount(groups, weights=weights, minlength=n)
+    return sums / totals[:, None]
@@ -1,7 +1,69 @@
 from bs4 import BeautifulSoup
+from html.entities import html5
+import os
 import re
 
-def clean_html(raw_html):
-    clean = BeautifulSoup(raw_html, "html.parser").get_text()
-    clean = re.sub(r'\s+', ' ', clean)
-    return clean.strip()
\ No newline at end of file
+try:
+    import lxml.etree
+except ImportError:  # lxml is optional; BeautifulSoup is always available
+    lxml = None
+
+_WS = re.compile(r'\s+')
+_MARKUP = re.compile(r'[<&]')
+# a complete character reference: &name; or &#N; / &#xN;
+_ENTITY = re.compile(r'&(?:([A-Za-z][A-Za-z0-9]*;)|#[0-9]+;|#[xX][0-9A-Fa-f]+;)')
+_TAG = re.compile(r'<[A-Za-z/!?][^<>]*>')
+_TAG_START = re.compile(r'<[A-Za-z/!?]')
+# elements whose content html.parser parses as markup but lxml keeps as raw text
+_RAW_TEXT = re.compile(r'<(?:textarea|xmp|plaintext|listing|noembed|noframes)\b', re.I)
+
+# Text nodes BeautifulSoup's get_text() would return: no comments, scripts, styles or templates
+_TEXT_XPATH = "//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]"
+_lxml_parser = lxml.etree.HTMLParser(recover=True, remove_comments=True, remove_pis=True) if lxml else None
+
+
+def _bs4_text(raw_html):
+    return BeautifulSoup(raw_html, "html.parser").get_text()
+
+
+def _lxml_compatible(raw_html):
+    """Whether lxml extracts the same text as html.parser from `raw_html`.
+
+    html.parser keeps CDATA sections, NUL bytes and a `<` that never closes
+    into a tag ("if a<b then") as text. It also decodes (or drops) an `&`
+    that doesn't start a complete known reference ("&pound5", "&#65", "P&G")
+    differently from lxml.
+    """
+    if "<![CDATA[" in raw_html or "\x00" in raw_html or _RAW_TEXT.search(raw_html):
+        return False
+    entities = _ENTITY.findall(raw_html)
+    if len(entities) != raw_html.count("&") or any(name and name not in html5 for name in entities):
+        return False
+    return not _TAG_START.search(_TAG.sub("", raw_html))
+
+
+def _lxml_text(raw_html):
+    if not _lxml_compatible(raw_html):
+        return _bs4_text(raw_html)
+    try:
+        root = lxml.etree.fromstring(raw_html, _lxml_parser)
+    except (ValueError, lxml.etree.LxmlError):
+        return _bs4_text(raw_html)
+    if root is None:
+        return ""
+    return "".join(root.xpath(_TEXT_XPATH))
+
+
+ENGINES = {"bs4": _bs4_text}
+if lxml:
+    ENGINES["lxml"] = _lxml_text
+
+CLEAN_HTML_ENGINE = os.getenv("CLEAN_HTML_ENGINE") or ("lxml" if lxml else "bs4")
+
+
+def clean_html(raw_html, engine=None):
+    # fast path: nothing to parse without tags or entities
+    if _MARKUP.search(raw_html):
+        raw_html = ENGINES[engine or CLEAN_HTML_ENGINE](raw_html)
+    clean = _WS.sub(' ', raw_html)
+    return clean.strip()
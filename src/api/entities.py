@@ -0,0 +1,107 @@
+"""NER post-processing and corpus-level entity counts.
+
+`normalize_entities` turns raw pipeline output for one text into clean,
+deduplicated entities. `EntityCounter` keeps a running frequency table over
+every analyzed article.
+"""
+import heapq
+import re
+import threading
+
+import numpy as np
+
+_WORDPIECE = re.compile(r"\s*##")
+_EDGE_PUNCT = re.compile(r"^[^\w]+|[^\w]+$")
+
+
+def clean_word(word):
+    # "Wash ##ington" -> "Washington"; also trims stray punctuation and extra spaces
+    return _EDGE_PUNCT.sub("", _WORDPIECE.sub("", " ".join(word.split())))
+
+
+def entity_key(entity):
+    return entity.get("entity_group"), entity["word"].casefold()
+
+
+def normalize_entities(raw):
+    """Merge wordpiece fragments, clean and dedup entities by (group, case-folded word).
+
+    Each entity keeps its first position and its highest score, and gains a
+    `mentions` count. Error placeholders pass through untouched.
+    """
+    merged = []
+    for ent in raw:
+        word = ent.get("word", "")
+        prev = merged[-1] if merged else None
+        # a "##" piece the pipeline failed to group continues the entity right before it
+        if word.startswith("##") and prev is not None and ent.get("start") is not None \
+                and prev.get("end") == ent.get("start"):
+            prev["word"] += word
+            prev["end"] = ent.get("end")
+            prev["score"] = min(prev.get("score", 1.0), ent.get("score", 1.0))
+            continue
+        merged.append(dict(ent))
+
+    # one conversion for all numpy scalars instead of one per field
+    scores = np.asarray([e.get("score", 0.0) for e in merged], dtype=np.float64).tolist()
+
+    entities, index = [], {}
+    for ent, score in zip(merged, scores):
+        if ent.get("entity_group") == "Error":
+            entities.append(ent)
+            continue
+        word = clean_word(ent.get("word", ""))
+        if not word:
+            continue
+        ent["word"] = word
+        key = entity_key(ent)
+        seen = index.get(key)
+        if seen is None:
+            if "score" in ent:
+                ent["score"] = score
+            for pos in ("start", "end"):
+                if ent.get(pos) is not None:
+                    ent[pos] = int(ent[pos])
+            ent["mentions"] = 1
+            index[key] = ent
+            entities.append(ent)
+        else:
+            seen["mentions"] += 1
+            if "score" in seen and score > seen["score"]:
+                seen["score"] = score
+    return entities
+
+
+class EntityCounter:
+    """In-memory running entity frequency table: mentions and number of articles per entity."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = {}  # (group, key) -> [word, mentions, articles]
+        self._seen = set()
+        self.articles = 0
+
+    def add(self, entities, key=None):
+        """Count one article's (normalized) entities; an article `key` already counted is skipped."""
+        with self._lock:
+            if key is not None:
+                if key in self._seen:
+                    return
+                self._seen.add(key)
+            self.articles += 1
+            for ent in entities:
+                if ent.get("entity_group") == "Error" or not ent.get("word"):
+                    continue
+                row = self._table.setdefault(entity_key(ent), [ent["word"], 0, 0])
+                row[1] += ent.get("mentions", 1)
+                row[2] += 1
+
+    def top(self, limit=20, group=None):
+        with self._lock:
+            rows = [(g, row) for (g, _), row in self._table.items() if group is None or g == group]
+            best = heapq.nlargest(limit, rows, key=lambda r: (r[1][2], r[1][1]))
+        return [{"entity_group": g, "word": w, "mentions": m, "articles": a} for g, (w, m, a) in best]
+
+    def stats(self):
+        with self._lock:
+            return {"articles": self.articles, "entities": len(self._table)}
@@ -0,0 +1,94 @@
+"""Extractive summarization: pick the article's most central sentences.
+
+Sentences are TF-IDF vectors; TextRank runs PageRank over their cosine
+similarity graph, blended with a lead prior because news articles put the
+key facts first. Everything is a few NumPy operations on a
+sentences x vocabulary matrix, so summarizing an article takes about a
+millisecond instead of a seq2seq generation.
+"""
+import re
+
+import numpy as np
+
+from src.api.chunking import split_sentences
+
+_WORD = re.compile(r"\w+", re.U)
+
+STOPWORDS = frozenset("""
+a about after again against all also am an and any are as at be because been before being between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself
+him himself his how i if in into is it its itself just me more most my myself no nor not now of off on once only
+or other our ours ourselves out over own said same says she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves
+""".split())
+
+
+def sentence_vectors(sentences):
+    """Row-normalized TF-IDF matrix, one row per sentence (sentences act as documents)."""
+    vocab, rows, cols = {}, [], []
+    for row, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                rows.append(row)
+                cols.append(vocab.setdefault(word, len(vocab)))
+    tf = np.zeros((len(sentences), max(len(vocab), 1)))
+    np.add.at(tf, (rows, cols), 1.0)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1.0 + len(sentences)) / (1.0 + df)) + 1.0
+    tfidf = np.log1p(tf) * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    return tfidf / np.maximum(norms, 1e-12)
+
+
+def textrank(vectors, damping=0.85, iterations=50, tol=1e-6):
+    sim = vectors @ vectors.T
+    np.fill_diagonal(sim, 0.0)
+    out = sim.sum(axis=1, keepdims=True)
+    # sentences sharing no words with the rest link to everything evenly
+    transition = np.where(out > 0, sim / np.maximum(out, 1e-12), 1.0 / len(sim))
+    n = len(sim)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1.0 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tol:
+            return updated
+        scores = updated
+    return scores
+
+
+def score_sentences(sentences, lead_weight=0.7):
+    """TextRank centrality blended with a 1/(position+1) lead prior, both scaled to sum to 1."""
+    centrality = textrank(sentence_vectors(sentences))
+    lead = 1.0 / np.arange(1, len(sentences) + 1)
+    return (1.0 - lead_weight) * centrality / centrality.sum() + lead_weight * lead / lead.sum()
+
+
+def extractive_summary(text, max_sentences=2, lead_weight=0.7):
+    """The `max_sentences` best-scoring sentences of `text`, in their original order."""
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+    scores = score_sentences(sentences, lead_weight)
+    best = np.sort(np.argpartition(-scores, max_sentences - 1)[:max_sentences])
+    return " ".join(sentences[i] for i in best)
+
+
+QUALITIES = ("auto", "fast", "best")
+
+
+def route(text, quality="auto", passthrough_words=60, abstractive_min_words=250):
+    """Which summarizer `text` gets: "passthrough", "extractive" or "abstractive".
+
+    Text no longer than a summary (an RSS blurb) is its own summary. "fast"
+    always extracts and "best" always generates; "auto" generates only for
+    articles long enough that picking sentences would leave too much out.
+    """
+    words = len(text.split())
+    if words <= passthrough_words:
+        return "passthrough"
+    if quality == "fast":
+        return "extractive"
+    if quality == "best":
+        return "abstractive"
+    return "abstractive" if words >= abstractive_min_words else "extractive"
@@ -0,0 +1,72 @@
+"""Gunicorn settings for serving the API with several worker processes.
+
+    gunicorn -c src/api/gunicorn_conf.py src.api.main:app
+
+The app is imported once in the master and the models in PRELOAD_MODELS are
+loaded there before the workers are forked, so every worker reads the same
+copy-on-write weights instead of holding its own copy.
+
+One worker is the default: the in-memory result cache, metrics, batcher and
+entity counts are per process, so with several workers each one reports (and
+`DELETE /admin/cache` clears) only its own.
+"""
+import gc
+import importlib.util
+import os
+
+import torch
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv("WEB_WORKERS", "1"))
+worker_class = (
+    "uvicorn_worker.UvicornWorker" if importlib.util.find_spec("uvicorn_worker") else "uvicorn.workers.UvicornWorker"
+)
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+
+if os.getenv("INGEST_ENABLED", "0") == "1" and workers > 1:
+    # every worker would run its own scheduler: duplicate polls, analyses and racing inserts
+    raise RuntimeError("INGEST_ENABLED needs WEB_WORKERS=1; with more workers run `python -m src.data.ingest` instead")
+
+# the Rust tokenizers disable their own thread pool after a fork anyway; say so up front
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def _models_to_preload(main):
+    names = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+    if names == ["all"]:
+        names = [n for n in main.registry.status()["models"] if main.registry.is_hosted(n)]
+    if main.CLASSIFIER_BACKEND.startswith("onnx") and "classifier" in names:
+        # an ONNX Runtime session owns a thread pool that does not survive fork()
+        names.remove("classifier")
+    return names
+
+
+def worker_threads():
+    # split the cores between workers unless TORCH_THREADS pins a count
+    return int(os.getenv("TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // workers)
+
+
+def when_ready(server):
+    from src.api import main
+
+    names = _models_to_preload(main)
+    if names:
+        errors = main.registry.warmup(names)
+        for name, error in errors.items():
+            server.log.warning("preloading %s failed: %s", name, error)
+        server.log.info("preloaded models in master: %s", ", ".join(n for n in names if n not in errors))
+    # keep the refcount/GC bookkeeping of preloaded objects from un-sharing their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from src.api import main
+
+    torch.set_num_threads(worker_threads())
+    main.result_cache.reopen()
+    if main.job_store is not None:
+        main.job_store.reopen()
+    if main.article_store is not None:
+        main.article_store.reopen()
@@ -1,98 +1,888 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Match
 from pydantic import BaseModel
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+from typing import List, Literal, Optional
+from functools import partial
+from transformers import pipeline
 import torch
 import uvicorn
-import feedparser
 import numpy as np
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import asyncio
+import threading
+from contextvars import ContextVar, copy_context
+from src.api import admission, metrics
 from src.api.clean_text import clean_html
+from src.api.entities import EntityCounter, normalize_entities
+from src.api.backends import MAX_LENGTH, check_backend, load_backend, softmax
+from src.api.batcher import MicroBatcher
+from src.api.cache import ResultCache, content_key
+from src.api.chunking import chunk_text, pool_logits
+from src.api.extractive import extractive_summary, route
+from src.api.models import LoadClock, ModelRegistry, ModelNotHosted, track_loads
+from src.api.profiles import PROFILES, profile_models
+from src.api.tokens import token_cache
+from src.data.async_fetcher import fetcher_from_env
+from src.data.feed_cache import FeedCache
+from src.data.ingest import IngestScheduler
+from src.data.jobs import JobRunner, JobStore
+from src.data.store import ArticleStore
+from src.data.vector_index import VectorIndex
 
 app = FastAPI()
-MODEL_PATH = "upasanapandey/news-classifier"
+MODEL_PATH = os.getenv("CLASSIFIER_MODEL", "upasanapandey/news-classifier")
+# torch | torch-int8 | onnx | onnx-int8
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch")
+check_backend(CLASSIFIER_BACKEND)
+# Summarizer/NER model profiles: MODEL_PROFILES are loaded, MODEL_PROFILE serves requests that don't pick one
+DEFAULT_PROFILE = os.getenv("MODEL_PROFILE", "quality")
+LOADED_PROFILES = [p.strip() for p in os.getenv("MODEL_PROFILES", DEFAULT_PROFILE).split(",") if p.strip()]
+if DEFAULT_PROFILE not in LOADED_PROFILES:
+    LOADED_PROFILES.insert(0, DEFAULT_PROFILE)
+PROFILE_MODELS = {name: profile_models(name) for name in LOADED_PROFILES}
+SUMMARIZER_MODEL = PROFILE_MODELS[DEFAULT_PROFILE]["summarizer"]
+NER_MODEL = PROFILE_MODELS[DEFAULT_PROFILE]["ner"]  # None uses the pipeline's default model
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
-tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_PATH)
-model.eval()
+# Intra-op threads for this process; under gunicorn each worker gets its share of the cores
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))
+if TORCH_THREADS:
+    torch.set_num_threads(TORCH_THREADS)
 
-# Pipelines
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-ner = pipeline("ner", grouped_entities=True)  # uses default model
+
+def load_classifier():
+    if CLASSIFIER_BACKEND.startswith("onnx"):
+        return load_backend(CLASSIFIER_BACKEND, MODEL_PATH, threads=int(os.getenv("ORT_THREADS", "0")))
+    return load_backend(CLASSIFIER_BACKEND, MODEL_PATH)
+
+
+def load_summarizer(model=SUMMARIZER_MODEL):
+    return pipeline("summarization", model=model)
+
+
+def load_ner(model=NER_MODEL):
+    return pipeline("ner", model=model, grouped_entities=True)
+
+
+def load_embedder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+
+def model_name(kind, profile=None):
+    # the default profile keeps the plain names, e.g. "summarizer" and "summarizer@fast"
+    profile = profile or DEFAULT_PROFILE
+    return kind if profile == DEFAULT_PROFILE else f"{kind}@{profile}"
+
+
+# Models load on first use; HOSTED_MODELS limits which ones this process serves
+registry = ModelRegistry(hosted=[m.strip() for m in os.getenv("HOSTED_MODELS", "").split(",") if m.strip()])
+registry.register("classifier", load_classifier)
+for _profile, _models in PROFILE_MODELS.items():
+    registry.register(model_name("summarizer", _profile), partial(load_summarizer, _models["summarizer"]))
+    registry.register(model_name("ner", _profile), partial(load_ner, _models["ner"]))
 
 labels = ["World", "Sports", "Business", "Sci/Tech"]  # AG News mapping
 
+# Summaries: inputs no longer than a summary pass through, mid-length ones get the
+# extractive summarizer and only long articles pay for abstractive generation
+SUMMARY_PASSTHROUGH_WORDS = int(os.getenv("SUMMARY_PASSTHROUGH_WORDS", "60"))
+ABSTRACTIVE_MIN_WORDS = int(os.getenv("ABSTRACTIVE_MIN_WORDS", "250"))
+EXTRACTIVE_SENTENCES = int(os.getenv("EXTRACTIVE_SENTENCES", "2"))
+
+
+def profile_revision(profile):
+    # Cached /analyze results are only valid for the models (and summary routing) that produced them
+    if os.getenv("MODEL_REVISION"):
+        revision = os.getenv("MODEL_REVISION")
+        return revision if profile == DEFAULT_PROFILE else f"{revision}|profile={profile}"
+    models = PROFILE_MODELS[profile]
+    return "|".join([
+        f"{MODEL_PATH}:{CLASSIFIER_BACKEND}", models["summarizer"], models["ner"] or "ner-default",
+        f"route:{SUMMARY_PASSTHROUGH_WORDS}/{ABSTRACTIVE_MIN_WORDS}/{EXTRACTIVE_SENTENCES}",
+    ])
+
+
+PROFILE_REVISIONS = {name: profile_revision(name) for name in LOADED_PROFILES}
+MODEL_REVISION = PROFILE_REVISIONS[DEFAULT_PROFILE]
+
+
+def cache_revision(quality=None, profile=None):
+    revision = PROFILE_REVISIONS[profile or DEFAULT_PROFILE]
+    # an explicit summary quality gives different summaries, so it gets its own cache entries
+    return revision if quality in (None, "auto") else f"{revision}|summary={quality}"
+
+
+def cache_revisions():
+    """Every revision a cached /analyze result of this deployment can be stored under."""
+    return {cache_revision(quality, profile) for profile in LOADED_PROFILES for quality in (None, "fast", "best")}
+
+result_cache = ResultCache(
+    max_items=int(os.getenv("CACHE_MAX_ITEMS", "1024")),
+    ttl=float(os.getenv("CACHE_TTL_SECONDS", "3600")),
+    db_path=os.getenv("CACHE_DB_PATH") or None,
+    max_disk_items=int(os.getenv("CACHE_DB_MAX_ITEMS", "100000")),
+)
+
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+
+# Long articles are split on sentence/token boundaries instead of being cut off
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "1"))  # sentences shared by neighbouring chunks
+MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "8"))
+CLASSIFIER_CHUNK_TOKENS = int(os.getenv("CLASSIFIER_CHUNK_TOKENS", "500"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "900"))
+
+# "concurrent" runs the /analyze stages side by side on a bounded pool
+ANALYZE_MODE = os.getenv("ANALYZE_MODE", "concurrent")
+STAGE_TIMEOUTS = {
+    "prediction": float(os.getenv("PREDICT_TIMEOUT", "10")),
+    "summary": float(os.getenv("SUMMARY_TIMEOUT", "60")),
+    "entities": float(os.getenv("NER_TIMEOUT", "30")),
+}
+# how often a stage waiting on a model load is checked for the load having finished
+LOAD_POLL_SECONDS = 0.1
+
+# --- instrumentation
+REQUESTS = metrics.Counter("http_requests_total", "HTTP requests by route and status", ["method", "path", "status"])
+REQUEST_SECONDS = metrics.Histogram("http_request_duration_seconds", "HTTP request latency by route", ["method", "path"])
+IN_FLIGHT = metrics.Gauge("http_requests_in_flight", "Requests currently being served, by route", ["path"])
+FEED_SECONDS = metrics.Histogram("feed_fetch_seconds", "Feed fetch latency (including cache revalidation) by source", ["feed"])
+MODELS_LOADED = metrics.Gauge("models_loaded", "1 when the model is loaded in this process", ["model"])
+BATCHER_QUEUE = metrics.Gauge("batcher_queue_depth", "Requests waiting for the classifier batcher")
+CACHE_ITEMS = metrics.Gauge("result_cache_items", "Analyses held in the in-memory result cache")
+TOKEN_CACHE_TOKENS = metrics.Gauge("token_cache_tokens", "Tokens held in the shared encoding cache")
+JOBS_PENDING = metrics.Gauge("jobs_pending_items", "Job items queued or running")
+SUMMARY_ROUTES = metrics.Counter("summary_route_total", "Summaries produced, by summarizer", ["method"])
+
+# requests carrying this header get their per-stage timings back in Server-Timing
+TRACE_HEADER = "X-Trace"
+
+
+def route_path(request):
+    # the route template keeps label cardinality bounded (/articles/{article_id}, not one per id)
+    path = request.scope.get("route_path")
+    if path is None:
+        path = "unmatched"
+        for candidate in app.router.routes:
+            match, _ = candidate.matches(request.scope)
+            if match == Match.FULL:
+                path = candidate.path
+                break
+        request.scope["route_path"] = path
+    return path
+
+
+# --- admission control: bounded concurrency and queueing in front of the models
+predict_limiter = admission.limiter_from_env("predict", concurrency=64, queue=256, queue_timeout_ms=2000)
+analyze_limiter = admission.limiter_from_env("analyze", concurrency=8, queue=32, queue_timeout_ms=5000)
+ADMISSION = {
+    "/predict": predict_limiter,
+    "/predict_batch": predict_limiter,
+    "/analyze": analyze_limiter,
+    "/analyze_stream": analyze_limiter,
+    "/analyze_batch": analyze_limiter,
+}
+# what /analyze does with the summary when admitted under pressure: "extractive" or "skip"
+DEGRADED_SUMMARY = os.getenv("DEGRADED_SUMMARY", "extractive")
+
+
+# declared before `instrument` so it runs inside it and shed requests still show up in the HTTP metrics
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    limiter = ADMISSION.get(route_path(request))
+    if limiter is None:
+        return await call_next(request)
+    try:
+        degraded = await limiter.acquire()
+    except admission.Rejected as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail},
+                            headers={"Retry-After": str(e.retry_after)})
+    token = admission.set_degraded(degraded)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        limiter.release()
+        raise
+    finally:
+        admission.reset_degraded(token)
+    return limiter.hold(response)
+
+
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    path = route_path(request)
+    trace = metrics.start_trace() if request.headers.get(TRACE_HEADER) else None
+    IN_FLIGHT.labels(path).inc()
+    status = 500
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        took = time.perf_counter() - started
+        IN_FLIGHT.labels(path).dec()
+        REQUEST_SECONDS.labels(request.method, path).observe(took)
+        REQUESTS.labels(request.method, path, status).inc()
+    if trace is not None:
+        response.headers["Server-Timing"] = metrics.server_timing(trace, took)
+    return response
+
+
+# inputs no longer than SUMMARY_PASSTHROUGH_WORDS are their own summary; above that,
+# "auto" routes by length, "fast" always extracts and "best" always generates
+SummaryQuality = Optional[Literal["auto", "fast", "best"]]
+
 class Query(BaseModel):
     text: str
+    quality: SummaryQuality = None
+    profile: Optional[str] = None
+
+class BatchQuery(BaseModel):
+    texts: List[str]
+    quality: SummaryQuality = None
+    profile: Optional[str] = None
+
+
+def check_profile(profile):
+    if profile is not None and profile not in PROFILE_MODELS:
+        raise HTTPException(
+            status_code=422, detail=f"profile '{profile}' is not loaded, expected one of {LOADED_PROFILES}"
+        )
+    return profile
+
+@app.exception_handler(ModelNotHosted)
+def model_not_hosted(request: Request, exc: ModelNotHosted):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.on_event("startup")
+def warmup_on_startup():
+    # e.g. WARMUP_MODELS=classifier,ner or WARMUP_MODELS=all
+    names = [m.strip() for m in os.getenv("WARMUP_MODELS", "").split(",") if m.strip()]
+    if names:
+        registry.warmup(None if names == ["all"] else names)
+
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "News Recommendation API running!"}
     
+def classify_batch(texts):
+    backend = registry.get("classifier")
+    # texts longer than the model window are classified per chunk and pooled;
+    # a text can't have more tokens than characters, so short ones skip chunking
+    long = [i for i, text in enumerate(texts) if len(text) > CLASSIFIER_CHUNK_TOKENS]
+    # encoded exactly as `backend.logits` encodes them, so a text that fits is tokenized once;
+    # an encoding cut off at MAX_LENGTH fills the whole window
+    encoded = token_cache.encode(backend.tokenizer, [texts[i] for i in long], MAX_LENGTH)
+    limit = min(CLASSIFIER_CHUNK_TOKENS, MAX_LENGTH - 1)
+    over = {i for i, ids in zip(long, encoded) if len(ids) > limit}
+    chunks, groups = [], []
+    for i, text in enumerate(texts):
+        parts = [text]
+        if i in over:
+            parts = chunk_text(text, backend.tokenizer, CLASSIFIER_CHUNK_TOKENS, CHUNK_OVERLAP, MAX_CHUNKS) or [text]
+        chunks.extend(parts)
+        groups.extend([i] * len(parts))
+
+    # one padded forward pass for the whole batch
+    logits = backend.logits(chunks)
+    if len(chunks) > len(texts):
+        logits = pool_logits(logits, groups, weights=[max(len(c), 1) for c in chunks])
+    probs = softmax(logits)
+
+    results = []
+    for row in probs:
+        label_index = int(np.argmax(row))
+        # Convert probabilities to Python floats for JSON serialization
+        results.append({
+            "label": labels[label_index],
+            "probs": [float(p) for p in row]
+        })
+    return results
+
+
+# Concurrent /predict callers are coalesced into one forward pass
+batcher = MicroBatcher(
+    classify_batch,
+    max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "10")),
+    name="classifier-batcher",
+)
+
+
 @app.post("/predict")
 def predict(q: Query):
-    inputs = tokenizer(q.text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-    with torch.no_grad():
-        out = model(**inputs)
-        probs = torch.nn.functional.softmax(out.logits, dim=-1).squeeze()
+    with metrics.timer("classify"):
+        return batcher.submit(q.text)
 
-    label_index = int(torch.argmax(out.logits))
-    # Convert probabilities to Python floats for JSON serialization
-    probs_list = [float(p) for p in probs]
 
-    return {
-        "label": labels[label_index],
-        "probs": probs_list
-    }
+@app.get("/batcher/stats")
+def batcher_stats():
+    return batcher.stats()
 
 
-@app.post("/analyze")
-def analyze(q: Query):
-    pred = predict(q)
+@app.get("/admission/stats")
+def admission_stats():
+    return {limiter.name: limiter.stats() for limiter in (predict_limiter, analyze_limiter)}
 
-    # --- summarization with error handling
+
+def summary_input(text):
+    with metrics.timer("clean"):
+        return clean_html(text).strip()
+
+
+def summarize_texts(texts, profile=None):
+    """Map-reduce summarization: every chunk of every text is summarized in one
+    batched call, then each multi-chunk text's partial summaries are summarized again."""
+    summarizer = registry.get(model_name("summarizer", profile))
+
+    def run(inputs, max_length, min_length):
+        if not inputs:
+            return []
+        check_cancelled()
+        with metrics.timer("summarize"):
+            out = summarizer(inputs, max_length=max_length, min_length=min_length, do_sample=False,
+                             truncation=True, batch_size=SUMMARY_BATCH_SIZE)
+        return [r["summary_text"] if r else "" for r in out]
+
+    chunked = [chunk_text(t, summarizer.tokenizer, SUMMARY_CHUNK_TOKENS, CHUNK_OVERLAP, MAX_CHUNKS) for t in texts]
+    single = [i for i, c in enumerate(chunked) if len(c) == 1]
+    multi = [i for i, c in enumerate(chunked) if len(c) > 1]
+
+    results = ["No summary generated."] * len(texts)
+    for i, summary in zip(single, run([chunked[i][0] for i in single], 150, 100)):
+        results[i] = summary or results[i]
+
+    # map
+    partials = run([c for i in multi for c in chunked[i]], 80, 30)
+    # reduce
+    combined, start = [], 0
+    for i in multi:
+        n = len(chunked[i])
+        combined.append(" ".join(partials[start:start + n]))
+        start += n
+    for i, summary in zip(multi, run(combined, 150, 100)):
+        results[i] = summary or results[i]
+    return results
+
+
+def ner_texts(texts, profile=None):
+    ner = registry.get(model_name("ner", profile))
+    check_cancelled()
+    with metrics.timer("ner"):
+        results = ner(texts, batch_size=NER_BATCH_SIZE)
+    # a single input comes back as a flat list of entities
+    if len(texts) == 1 and (not results or isinstance(results[0], dict)):
+        results = [results]
+    return results
+
+
+def dedup_entities(entities_raw):
+    with metrics.timer("dedup"):
+        return normalize_entities(entities_raw)
+
+
+# corpus-level entity frequencies; with an article store they are kept in the store instead
+entity_counter = EntityCounter()
+
+
+def count_entities(entities, text):
+    if article_store is None:
+        # keyed by the text alone, so re-analyzing it (after eviction, or at another quality or profile) counts once
+        entity_counter.add(entities, key=content_key(text))
+
+
+def run_batched(fn, items, batch_size, stage="batch"):
+    """Run `fn` over `items` shortest-first in batches of `batch_size`.
+
+    Returns `(ok, value)` pairs in input order. A failing batch is retried
+    item by item so one bad input only fails itself; failures are counted
+    under `stage` in `errors_total`.
+    """
+    order = sorted(range(len(items)), key=lambda i: len(items[i]))
+    results = [None] * len(items)
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        try:
+            values = fn([items[i] for i in idx])
+            for i, v in zip(idx, values):
+                results[i] = (True, v)
+        except Exception:
+            for i in idx:
+                try:
+                    results[i] = (True, fn([items[i]])[0])
+                except Exception as e:
+                    metrics.ERRORS.labels(stage, "error").inc()
+                    results[i] = (False, str(e))
+    return results
+
+
+def stage_prediction(text):
+    # the batcher's thread would load the classifier outside this stage's LoadClock; load it here instead
+    registry.get("classifier")
+    with metrics.timer("classify"):
+        return batcher.submit(text)
+
+
+def summarize_routed(texts, quality=None, profile=None):
+    """Summaries of raw `texts`, each from the summarizer `route` picks for it."""
+    cleaned = [summary_input(t) for t in texts]
+    methods = [route(c, quality or "auto", SUMMARY_PASSTHROUGH_WORDS, ABSTRACTIVE_MIN_WORDS) for c in cleaned]
+    results = ["No summary generated."] * len(texts)
+    abstractive = []
+    for i, method in enumerate(methods):
+        SUMMARY_ROUTES.labels(method).inc()
+        if method == "abstractive":
+            abstractive.append(i)
+        elif method == "extractive":
+            with metrics.timer("extractive"):
+                results[i] = extractive_summary(cleaned[i], EXTRACTIVE_SENTENCES) or results[i]
+        else:
+            results[i] = cleaned[i] or results[i]
+    # the summarizer model is only loaded once something needs it
+    if abstractive:
+        for i, summary in zip(abstractive, summarize_texts([cleaned[i] for i in abstractive], profile)):
+            results[i] = summary
+    return results
+
+
+def stage_summary(text, quality=None, profile=None):
+    return summarize_routed([text], quality, profile)[0]
+
+
+def stage_entities(text, profile=None):
+    return dedup_entities(ner_texts([text], profile)[0])
+
+
+def degraded_summaries(texts):
+    if DEGRADED_SUMMARY == "skip":
+        return [None] * len(texts)
+    return summarize_routed(texts, "fast")
+
+
+def degraded_summary(text):
+    return degraded_summaries([text])[0]
+
+
+ANALYZE_STAGES = {
+    "prediction": stage_prediction,
+    "summary": stage_summary,
+    "entities": stage_entities,
+}
+
+
+def analyze_stages(quality=None, profile=None):
+    """The stage functions for one request, and whether it is served degraded."""
+    degraded = admission.degraded()
+    if not degraded and quality in (None, "auto") and profile in (None, DEFAULT_PROFILE):
+        return ANALYZE_STAGES, False
+    stages = dict(
+        ANALYZE_STAGES,
+        summary=partial(stage_summary, quality=quality, profile=profile),
+        entities=partial(stage_entities, profile=profile),
+    )
+    if degraded:
+        # the abstractive summarizer is by far the slowest stage, so it is the one dropped under pressure
+        stages["summary"] = degraded_summary
+    return stages, degraded
+
+
+# one thread per stage of every admitted analysis, so admitted requests never wait for a thread
+stage_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ANALYZE_WORKERS", "0"))
+    or len(ANALYZE_STAGES) * (analyze_limiter.concurrency if analyze_limiter.concurrency > 0 else 2),
+    thread_name_prefix="analyze",
+)
+
+
+class StageCancelled(Exception):
+    pass
+
+
+# set once nobody waits for the stage running in this context (it timed out, or the client left)
+_stage_cancel = ContextVar("stage_cancel", default=None)
+
+
+def check_cancelled():
+    """Raise `StageCancelled` if the current stage was abandoned; called before each model pass."""
+    cancel = _stage_cancel.get()
+    if cancel is not None and cancel.is_set():
+        raise StageCancelled("stage abandoned")
+
+
+def _timed(fn, text):
+    started = time.perf_counter()
+    value = fn(text)
+    return value, time.perf_counter() - started
+
+
+def _run_stage(cancel, clock, fn, text):
+    _stage_cancel.set(cancel)
+    track_loads(clock)
+    check_cancelled()
+    return _timed(fn, text)
+
+
+def iter_stages(text, mode=None, stages=None):
+    """Run every /analyze stage on `text`, yielding `(stage, status, value, seconds)`
+    as each one finishes.
+
+    Status is one of "ok", "error" or "timeout". Errors carry the exception
+    as `value`, timeouts a message. A stage's timeout doesn't count time spent
+    loading its models, so a cold start doesn't time out the first requests.
+    """
+    mode = mode or ANALYZE_MODE
+    stages = stages or ANALYZE_STAGES
+
+    if mode != "concurrent":
+        for name, fn in stages.items():
+            started = time.perf_counter()
+            try:
+                value, took = _timed(fn, text)
+                yield name, "ok", value, took
+            except Exception as e:
+                metrics.ERRORS.labels(name, "error").inc()
+                yield name, "error", e, time.perf_counter() - started
+        return
+
+    started = time.perf_counter()
+    cancels = {name: threading.Event() for name in stages}
+    clocks = {name: LoadClock() for name in stages}
+
+    def deadline(name, now):
+        # every stage started together, so each timeout counts from `started`, minus model loading;
+        # None while the stage is loading a model
+        loading_for, loading = clocks[name].read(now)
+        return None if loading else started + loading_for + STAGE_TIMEOUTS[name]
+
+    # each stage runs in a copy of this context so its timers land in the request's trace
+    pending = {
+        stage_pool.submit(copy_context().run, _run_stage, cancels[name], clocks[name], fn, text): name
+        for name, fn in stages.items()
+    }
     try:
-        text = clean_html(q.text).strip()[:2500]
-        summary_result = summarizer(text, max_length=150, min_length=100, do_sample=False)
-        summary = summary_result[0]["summary_text"] if summary_result else "No summary generated."
-    except Exception as e:
-        summary = f"⚠️ Summarization failed: {str(e)}"
+        while pending:
+            now = time.perf_counter()
+            deadlines = [deadline(name, now) for name in pending.values()]
+            # a paused deadline resumes when the load finishes, so look again shortly
+            waits = [d - now for d in deadlines if d is not None] + [LOAD_POLL_SECONDS] * (None in deadlines)
+            done, _ = wait(pending, timeout=max(0.0, min(waits)), return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = pending.pop(fut)
+                try:
+                    value, took = fut.result()
+                    yield name, "ok", value, took
+                except Exception as e:
+                    metrics.ERRORS.labels(name, "error").inc()
+                    yield name, "error", e, time.perf_counter() - started
+            now = time.perf_counter()
+            for fut, name in list(pending.items()):
+                due = deadline(name, now)
+                if due is not None and now >= due:
+                    del pending[fut]
+                    cancels[name].set()
+                    fut.cancel()
+                    metrics.ERRORS.labels(name, "timeout").inc()
+                    yield name, "timeout", f"{name} timed out after {STAGE_TIMEOUTS[name]:g}s", now - started
+    finally:
+        # the generator was closed early (e.g. a streaming client went away): drop what is still queued
+        # and let running stages stop at their next model pass
+        for fut, name in pending.items():
+            cancels[name].set()
+            fut.cancel()
+
+
+def run_stages(text, mode=None, stages=None):
+    """`iter_stages` collected into `{stage: (status, value, seconds)}`."""
+    return {name: (status, value, took) for name, status, value, took in iter_stages(text, mode, stages)}
+
 
+def stage_value(name, status, value):
+    """The JSON-safe value a stage contributes to the /analyze response."""
+    if status == "ok":
+        return value
+    if name == "prediction":
+        return None
+    # --- summarization with error handling
+    if name == "summary":
+        return f"⚠️ Summarization failed: {value}"
     # --- NER with cleaning and deduplication
-    try:
-        entities_raw = ner(q.text)
-    except Exception as e:
-        entities_raw = [{"entity_group": "Error", "word": str(e)}]
-
-    seen = set()
-    entities = []
-    for ent in entities_raw:
-        word = ent.get("word", "").strip()
-        key = (ent.get("entity_group"), word.lower())
-        if word and key not in seen:
-            seen.add(key)
-            # cast floats to Python floats
-            cleaned = {k: (float(v) if isinstance(v, (np.float32, np.float64)) else v) for k, v in ent.items()}
-            entities.append(cleaned)
+    return dedup_entities([{"entity_group": "Error", "word": str(value)}])
+
+
+@app.post("/analyze")
+def analyze(q: Query, response: Response):
+    key = content_key(q.text, cache_revision(q.quality, check_profile(q.profile)))
+    cached = result_cache.get(key)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+    response.headers["X-Cache"] = "MISS"
+
+    stages, degraded = analyze_stages(q.quality, q.profile)
+    outcomes = run_stages(q.text, stages=stages)
+    failed = any(status != "ok" for status, _, _ in outcomes.values())
+
+    status, pred, _ = outcomes["prediction"]
+    if status == "error":
+        raise pred
 
     # --- ensure everything is JSON-safe
-    response = {
-        "prediction": pred,
-        "summary": summary,
-        "entities": entities,
+    result = {name: stage_value(name, *outcomes[name][:2]) for name in ANALYZE_STAGES}
+
+    # don't pin transient failures or degraded answers in the cache
+    if not failed and not degraded:
+        result_cache.set(key, result)
+        count_entities(result["entities"], q.text)
+
+    result = dict(result)
+    result["timings_ms"] = {name: round(took * 1000.0, 2) for name, (_, _, took) in outcomes.items()}
+    timed_out = [name for name, (status, _, _) in outcomes.items() if status == "timeout"]
+    if timed_out:
+        result["timed_out"] = timed_out
+    if degraded:
+        result["degraded"] = ["summary"]
+        response.headers["X-Degraded"] = "summary"
+    return result
+
+
+def _stream_events(text, quality=None, profile=None):
+    key = content_key(text, cache_revision(quality, profile))
+    cached = result_cache.get(key)
+    if cached is not None:
+        for name in ANALYZE_STAGES:
+            yield {"stage": name, "data": cached[name], "cached": True}
+        yield {"stage": "done", "cached": True}
+        return
+
+    stages, degraded = analyze_stages(quality, profile)
+    result, timings, failed = {}, {}, False
+    for name, status, value, took in iter_stages(text, stages=stages):
+        result[name] = stage_value(name, status, value)
+        timings[name] = round(took * 1000.0, 2)
+        event = {"stage": name, "data": result[name], "ms": timings[name]}
+        if status != "ok":
+            failed = True
+            event["status"] = status
+            event["error"] = str(value)
+        yield event
+
+    done = {"stage": "done", "cached": False, "timings_ms": timings}
+    if degraded:
+        done["degraded"] = ["summary"]
+    elif not failed:
+        result_cache.set(key, result)
+        count_entities(result["entities"], text)
+    yield done
+
+
+@app.post("/analyze_stream")
+def analyze_stream(q: Query, format: str = "ndjson"):
+    """Like /analyze, but emits each stage's result as soon as it is ready.
+
+    `format=ndjson` (default) writes one JSON object per line;
+    `format=sse` writes server-sent events.
+    """
+    events = _stream_events(q.text, q.quality, check_profile(q.profile))
+    if format == "sse":
+        body = (f"event: {e['stage']}\ndata: {json.dumps(e)}\n\n" for e in events)
+        media_type = "text/event-stream"
+    else:
+        body = (json.dumps(e) + "\n" for e in events)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/predict_batch")
+def predict_batch(q: BatchQuery):
+    results = []
+    for ok, value in run_batched(classify_batch, q.texts, batcher.max_batch_size, "prediction"):
+        results.append(value if ok else {"error": value})
+    return results
+
+
+def analyze_texts(texts, cache_stats=None, degraded=False, quality=None, profile=None):
+    """Batched /analyze over `texts`; results are in input order, failures reported per item.
+
+    `degraded` replaces the summarizer with `degraded_summaries`; such results are not cached.
+    """
+    keys = [content_key(t, cache_revision(quality, profile)) for t in texts]
+    results = [result_cache.get(k) for k in keys]
+    misses = [i for i, r in enumerate(results) if r is None]
+    if cache_stats is not None:
+        cache_stats["hits"] = len(keys) - len(misses)
+        cache_stats["misses"] = len(misses)
+
+    texts = [texts[i] for i in misses]
+    with metrics.timer("classify"):
+        preds = run_batched(classify_batch, texts, batcher.max_batch_size, "prediction")
+    if degraded:
+        summaries = run_batched(degraded_summaries, texts, SUMMARY_BATCH_SIZE, "summary")
+    else:
+        summaries = run_batched(partial(summarize_routed, quality=quality, profile=profile), texts, SUMMARY_BATCH_SIZE, "summary")
+    ents = run_batched(partial(ner_texts, profile=profile), texts, NER_BATCH_SIZE, "entities")
+
+    outcomes = zip(misses, texts, preds, summaries, ents)
+    for i, text, (pred_ok, pred), (sum_ok, summary), (ner_ok, entities_raw) in outcomes:
+        errors = {}
+        if not pred_ok:
+            errors["prediction"] = pred
+            pred = None
+        if not sum_ok:
+            errors["summary"] = summary
+            summary = f"⚠️ Summarization failed: {summary}"
+        if not ner_ok:
+            errors["entities"] = entities_raw
+            entities_raw = [{"entity_group": "Error", "word": entities_raw}]
+
+        item = {
+            "prediction": pred,
+            "summary": summary,
+            "entities": dedup_entities(entities_raw),
+        }
+        if errors:
+            item["errors"] = errors
+        elif degraded:
+            item["degraded"] = ["summary"]
+        else:
+            result_cache.set(keys[i], item)
+            count_entities(item["entities"], text)
+        results[i] = item
+    return results
+
+
+@app.post("/analyze_batch")
+def analyze_batch(q: BatchQuery, response: Response):
+    cache_stats = {}
+    results = analyze_texts(q.texts, cache_stats, degraded=admission.degraded(), quality=q.quality,
+                            profile=check_profile(q.profile))
+    response.headers["X-Cache-Hits"] = str(cache_stats["hits"])
+    response.headers["X-Cache-Misses"] = str(cache_stats["misses"])
+    return results
+
+
+@app.get("/admin/cache")
+def cache_stats():
+    stats = result_cache.stats()
+    stats["model_revision"] = MODEL_REVISION
+    return stats
+
+
+@app.delete("/admin/cache")
+def cache_invalidate(text: Optional[str] = None, key: Optional[str] = None):
+    # no argument clears the whole cache; `text` drops its results under every profile and quality
+    if text is not None:
+        return {"removed": sum(result_cache.invalidate(content_key(text, r)) for r in sorted(cache_revisions()))}
+    return {"removed": result_cache.invalidate(key)}
+
+@app.get("/models")
+def models_status():
+    return registry.status()
+
+
+@app.get("/profiles")
+def profiles_status():
+    return {
+        "default": DEFAULT_PROFILE,
+        "loaded": {
+            name: {
+                "models": PROFILE_MODELS[name],
+                "registry": [model_name(kind, name) for kind in PROFILES[name]],
+            }
+            for name in LOADED_PROFILES
+        },
     }
 
-    return response
+
+@metrics.REGISTRY.on_collect
+def collect_gauges():
+    for name, info in registry.status()["models"].items():
+        MODELS_LOADED.labels(name).set(1 if info["state"] == "ready" else 0)
+    BATCHER_QUEUE.set(batcher.stats()["queue_depth"])
+    CACHE_ITEMS.set(result_cache.stats()["memory_items"])
+    TOKEN_CACHE_TOKENS.set(token_cache.stats()["tokens"])
+    if job_store is not None:
+        JOBS_PENDING.set(job_store.pending())
+    for limiter in (predict_limiter, analyze_limiter):
+        limiter.collect()
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.post("/models/warmup")
+def models_warmup(names: Optional[List[str]] = None):
+    errors = registry.warmup(names)
+    status = registry.status()
+    status["errors"] = errors
+    return status
+
+
+FEEDS = {
+    "BBC": "http://feeds.bbci.co.uk/news/rss.xml",
+    "Reuters": "http://feeds.reuters.com/reuters/topNews",
+    "TechCrunch": "https://techcrunch.com/feed/",
+}
+
+feed_fetcher = fetcher_from_env()
+feed_cache = FeedCache(feed_fetcher, freshness=float(os.getenv("FEED_FRESHNESS_SECONDS", "60")))
+
+# With ingestion on, articles are polled in the background and served from the store
+INGEST_ENABLED = os.getenv("INGEST_ENABLED", "0") == "1"
+ARTICLE_DB_PATH = os.getenv("ARTICLE_DB_PATH") or ("articles.db" if INGEST_ENABLED else None)
+article_store = ArticleStore(ARTICLE_DB_PATH) if ARTICLE_DB_PATH else None
+ingest_scheduler = None
+
+
+@app.on_event("startup")
+async def start_ingestion():
+    global ingest_scheduler
+    if INGEST_ENABLED:
+        ingest_scheduler = IngestScheduler(
+            article_store,
+            feeds=FEEDS,
+            analyzer=analyze_texts,
+            max_per_feed=int(os.getenv("INGEST_MAX_PER_FEED", "10")),
+            on_stored=lambda ids: update_search_index(ids) if SEARCH_INDEX_PATH else None,
+        )
+        ingest_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def close_feed_fetcher():
+    if ingest_scheduler is not None:
+        await ingest_scheduler.stop()
+    if job_runner is not None:
+        await job_runner.stop()
+    await feed_fetcher.aclose()
+
 
 @app.get("/fetch_sample")
-def fetch_sample():
-    feeds = {
-        "BBC": "http://feeds.bbci.co.uk/news/rss.xml",
-        "Reuters": "http://feeds.reuters.com/reuters/topNews",
-        "TechCrunch": "https://techcrunch.com/feed/",
-    }
+async def fetch_sample():
+    if article_store is not None and article_store.count():
+        return article_store.recent(limit=3 * len(FEEDS))
+
+    async def fetch(source, url):
+        with metrics.timer(f"feed_{source}", FEED_SECONDS.labels(source)):
+            return await feed_cache.get(url)
+
+    # all feeds are fetched concurrently; a failing feed just contributes no entries
+    parsed = await asyncio.gather(*(fetch(source, url) for source, url in FEEDS.items()), return_exceptions=True)
 
     articles = []
-    for source, url in feeds.items():
-        d = feedparser.parse(url)
+    for source, d in zip(FEEDS, parsed):
+        if isinstance(d, Exception):
+            metrics.ERRORS.labels("fetch_sample", "feed").inc()
+            continue
         for entry in d.entries[:3]:  # limit to 3 per source
             articles.append({
                 "source": source,
@@ -104,5 +894,280 @@ def fetch_sample():
     return articles
 
 
+@app.get("/feeds/stats")
+def feeds_stats():
+    return feed_cache.stats()
+
+
+def require_store():
+    if article_store is None:
+        raise HTTPException(status_code=404, detail="article store is not enabled (set ARTICLE_DB_PATH or INGEST_ENABLED=1)")
+    return article_store
+
+
+@app.get("/articles")
+def list_articles(limit: int = 20, offset: int = 0, source: Optional[str] = None):
+    store = require_store()
+    limit = min(max(limit, 1), 200)
+    offset = max(offset, 0)
+    return {
+        "total": store.count(source),
+        "limit": limit,
+        "offset": offset,
+        "items": store.recent(limit=limit, offset=offset, source=source),
+    }
+
+
+@app.get("/articles/{article_id}")
+def get_article(article_id: int):
+    article = require_store().get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="article not found")
+    return article
+
+
+@app.get("/ingest/stats")
+def ingest_stats():
+    if ingest_scheduler is None:
+        return {"running": False}
+    return ingest_scheduler.stats()
+
+
+@app.get("/entities/top")
+def top_entities(limit: int = 20, group: Optional[str] = None):
+    """Most frequent entities across analyzed articles (ranked by number of articles)."""
+    limit = min(max(limit, 1), 200)
+    if article_store is not None:
+        return {"source": "store", "items": article_store.top_entities(limit, group)}
+    return {"source": "memory", **entity_counter.stats(), "items": entity_counter.top(limit, group)}
+
+
+TREND_BUCKETS = {"hour": 3600, "day": 86400}
+TREND_MAX_HOURS = int(os.getenv("TREND_MAX_HOURS", str(90 * 24)))
+
+
+@app.get("/trends")
+def trends(hours: int = 24, bucket: Literal["hour", "day"] = "hour", source: Optional[str] = None,
+           by_source: bool = False, entities: int = 5):
+    """Categories, mean confidence and top entities of stored articles over time, from the hourly rollups."""
+    store = require_store()
+    hours = min(max(hours, 1), TREND_MAX_HOURS)
+    result = store.trends(
+        time.time() - hours * 3600, bucket=TREND_BUCKETS[bucket], source=source, by_source=by_source,
+        entities=min(max(entities, 0), 50),
+    )
+    result["labels"] = labels
+    return result
+
+
+# --- semantic search over stored articles
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH") or ("search_index" if article_store is not None else None)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "brute")  # brute | hnsw
+if SEARCH_INDEX_PATH:
+    registry.register("embedder", load_embedder)
+search_index = None
+_search_index_lock = threading.Lock()
+# one thread embeds new articles in the background, so queries never wait on indexing
+index_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+_index_sync = None
+
+
+def get_search_index():
+    global search_index
+    if SEARCH_INDEX_PATH is None or article_store is None:
+        raise HTTPException(status_code=404, detail="search is not enabled (needs the article store)")
+    if search_index is None:
+        embedder = registry.get("embedder")
+        with _search_index_lock:
+            if search_index is None:
+                search_index = VectorIndex(SEARCH_INDEX_PATH, embedder.get_sentence_embedding_dimension(), SEARCH_BACKEND)
+    return search_index
+
+
+def embed(texts):
+    embedder = registry.get("embedder")
+    with metrics.timer("embed"):
+        return embedder.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+
+
+def article_document(article):
+    analysis = article.get("analysis") or {}
+    body = analysis.get("summary") or article.get("summary") or (article.get("text") or "")[:1000]
+    return f"{article.get('title') or ''}. {body}"
+
+
+def sync_search_index(batch_size=64):
+    """Embed canonical articles stored since the index was last synced; returns how many were added."""
+    index = get_search_index()
+    added = 0
+    while True:
+        batch = article_store.canonical_after(index.cursor, limit=batch_size)
+        if not batch:
+            # duplicates are never indexed; move the cursor past them too
+            index.skip_to(article_store.max_id())
+            return added
+        index.add([a["id"] for a in batch], embed([article_document(a) for a in batch]), cursor=batch[-1]["id"])
+        added += len(batch)
+        index.save()
+
+
+def reindex_articles(ids):
+    """Re-embed indexed articles whose text changed in place; returns how many were replaced."""
+    index = get_search_index()
+    articles = [a for a in article_store.get_many(ids) if index.vector(a["id"]) is not None]
+    if articles:
+        index.add([a["id"] for a in articles], embed([article_document(a) for a in articles]))
+        index.save()
+    return len(articles)
+
+
+def update_search_index(ids):
+    """Index newly stored articles and replace the vectors of `ids` that were already indexed."""
+    index_pool.submit(reindex_articles, ids)
+    return schedule_index_sync()
+
+
+def schedule_index_sync():
+    global _index_sync
+    if _index_sync is None or _index_sync.done():
+        _index_sync = index_pool.submit(sync_search_index)
+    return _index_sync
+
+
+def index_behind(index):
+    """Whether the store has articles the index hasn't considered yet."""
+    return article_store.max_id() > index.cursor
+
+
+@app.on_event("startup")
+def start_index_sync():
+    if SEARCH_INDEX_PATH and article_store is not None and registry.is_hosted("embedder"):
+        schedule_index_sync()
+
+
+@app.on_event("shutdown")
+def save_search_index():
+    if search_index is not None:
+        search_index.save()
+
+
+def search_hits(hits):
+    articles = {a["id"]: a for a in article_store.get_many([i for i, _ in hits])}
+    return [
+        {
+            "id": i,
+            "score": round(score, 4),
+            "title": articles[i]["title"],
+            "source": articles[i]["source"],
+            "link": articles[i]["link"],
+            "published": articles[i]["published"],
+            "summary": (articles[i]["analysis"] or {}).get("summary") or articles[i]["summary"],
+        }
+        for i, score in hits if i in articles
+    ]
+
+
+@app.get("/search")
+def search(q: str, k: int = 10):
+    index = get_search_index()
+    # articles stored by another process (e.g. a standalone ingester) are picked up in the background
+    if index_behind(index):
+        schedule_index_sync()
+    k = min(max(k, 1), 100)
+    with metrics.timer("search"):
+        hits = index.search(embed([q])[0], k)
+    return {"query": q, "indexed": len(index), "results": search_hits(hits)}
+
+
+@app.get("/related/{article_id}")
+def related(article_id: int, k: int = 5):
+    index = get_search_index()
+    article = article_store.get(article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="article not found")
+    # duplicates share their canonical article's neighbours
+    canonical_id = article["canonical_id"] or article_id
+    vector = index.vector(canonical_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="article is not indexed yet")
+    k = min(max(k, 1), 100)
+    with metrics.timer("search"):
+        hits = index.search(vector, k, exclude=[article_id, canonical_id])
+    return {"id": article_id, "results": search_hits(hits)}
+
+
+@app.get("/search/stats")
+def search_stats():
+    return get_search_index().stats()
+
+
+# --- jobs: bulk analysis that is submitted now and collected later
+JOB_MAX_ITEMS = int(os.getenv("JOB_MAX_ITEMS", "100"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "1000"))
+# jobs are opt-in: no database file and no workers unless JOB_DB_PATH is set
+JOB_DB_PATH = os.getenv("JOB_DB_PATH") or None
+job_store = JobStore(JOB_DB_PATH) if JOB_DB_PATH else None
+job_runner = JobRunner(
+    job_store,
+    analyzer=analyze_texts,
+    fetcher=feed_fetcher,
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    batch_size=int(os.getenv("JOB_BATCH_SIZE", "8")),
+    lease=float(os.getenv("JOB_LEASE_SECONDS", "300")),
+    retention=float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 86400))),
+) if job_store is not None else None
+
+
+class JobRequest(BaseModel):
+    texts: List[str] = []
+    urls: List[str] = []
+    priority: int = 0
+
+
+@app.on_event("startup")
+async def start_jobs():
+    if job_runner is not None:
+        job_runner.start()
+
+
+def require_jobs():
+    if job_store is None:
+        raise HTTPException(status_code=404, detail="jobs are not enabled (set JOB_DB_PATH)")
+    return job_store
+
+
+@app.post("/jobs", status_code=202)
+def submit_job(q: JobRequest, response: Response):
+    job_store = require_jobs()
+    items = [("text", t) for t in q.texts] + [("url", u) for u in q.urls]
+    if not items:
+        raise HTTPException(status_code=422, detail="give at least one text or url")
+    if len(items) > JOB_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"a job takes at most {JOB_MAX_ITEMS} items")
+    # backpressure: refuse new work while the queue is full rather than letting it grow without bound
+    if job_store.pending() + len(items) > JOB_MAX_PENDING:
+        metrics.ERRORS.labels("jobs", "rejected").inc()
+        raise HTTPException(status_code=429, detail="job queue is full", headers={"Retry-After": "30"})
+    job_id = job_store.create(items, priority=max(-100, min(q.priority, 100)))
+    job_runner.notify()
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return {"id": job_id, "status": "queued", "total": len(items)}
+
+
+@app.get("/jobs/stats")
+def jobs_stats():
+    require_jobs()
+    return job_runner.stats()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, results: bool = True):
+    job = require_jobs().get(job_id, items=results)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=7860)
\ No newline at end of file
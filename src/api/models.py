@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+
+class ModelNotHosted(Exception):
+    pass
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _param_bytes(obj):
+    # sums torch parameters of a model, a pipeline, or a (tokenizer, model) tuple
+    if isinstance(obj, (tuple, list)):
+        return sum(_param_bytes(o) for o in obj)
+    model = getattr(obj, "model", obj)
+    params = getattr(model, "parameters", None)
+    if params is None:
+        return 0
+    return sum(p.numel() * p.element_size() for p in params())
+
+
+# transformers initializes weights through process-global state (meta-device
+# init), so two models loading at the same time can corrupt each other
+_load_lock = threading.Lock()
+
+
+class LoadClock:
+    """Time a caller spent waiting for models to load, so its deadlines can leave cold starts out."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = 0.0
+        self._since = None
+        self._depth = 0
+
+    def start(self):
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                self._since = time.perf_counter()
+
+    def stop(self):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self._seconds += time.perf_counter() - self._since
+                self._since = None
+
+    def read(self, now=None):
+        """`(seconds spent loading so far, whether a load is in progress)`."""
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            if self._since is None:
+                return self._seconds, False
+            return self._seconds + now - self._since, True
+
+
+# the LoadClock of whatever runs in the current context; loads (and waits for another load) are charged to it
+_load_clock = ContextVar("load_clock", default=None)
+
+
+def track_loads(clock):
+    _load_clock.set(clock)
+
+
+class ModelRegistry:
+    """Loads models on first use and tracks readiness, load time and memory per model."""
+
+    def __init__(self, hosted=None):
+        # None hosts every registered model
+        self.hosted = set(hosted) if hosted else None
+        self._loaders = {}
+        self._models = {}
+        self._info = {}
+        self._locks = {}
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        self._models.pop(name, None)
+        self._info[name] = {
+            "state": "not_loaded",
+            "hosted": self.is_hosted(name),
+            "load_seconds": None,
+            "rss_delta_bytes": None,
+            "param_bytes": None,
+            "error": None,
+        }
+
+    def is_hosted(self, name):
+        return name in self._loaders and (self.hosted is None or name in self.hosted)
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if not self.is_hosted(name):
+            raise ModelNotHosted(f"model '{name}' is not hosted by this process")
+
+        clock = _load_clock.get()
+        if clock is not None:
+            clock.start()
+        try:
+            return self._load(name)
+        finally:
+            if clock is not None:
+                clock.stop()
+
+    def _load(self, name):
+        with self._locks[name], _load_lock:
+            if name in self._models:
+                return self._models[name]
+            info = self._info[name]
+            info["state"] = "loading"
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                info["state"] = "error"
+                info["error"] = str(e)
+                raise
+            info["load_seconds"] = time.perf_counter() - started
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                info["rss_delta_bytes"] = rss_after - rss_before
+            info["param_bytes"] = _param_bytes(model)
+            info["state"] = "ready"
+            info["error"] = None
+            self._models[name] = model
+            return model
+
+    def warmup(self, names=None):
+        names = names or [n for n in self._loaders if self.is_hosted(n)]
+        errors = {}
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                errors[name] = str(e)
+        return errors
+
+    def status(self):
+        return {
+            "rss_bytes": _rss_bytes(),
+            "models": {name: dict(info) for name, info in self._info.items()},
+        }
@@ -0,0 +1,29 @@
+"""Named model profiles: the summarizer and NER model a request runs on.
+
+"quality" is the original pair (BART-large CNN and the pipeline's default
+BERT-large CoNLL-03 tagger). "fast" swaps in distilled models that are
+several times cheaper on CPU. The classifier is shared by every profile.
+
+A profile's models can be overridden with `<PROFILE>_SUMMARIZER_MODEL` and
+`<PROFILE>_NER_MODEL`. "quality" also honours the older `SUMMARIZER_MODEL`
+and `NER_MODEL` variables.
+"""
+import os
+
+# ner None: the transformers pipeline default (dbmdz/bert-large-cased-finetuned-conll03-english)
+PROFILES = {
+    "quality": {"summarizer": "facebook/bart-large-cnn", "ner": None},
+    "fast": {"summarizer": "sshleifer/distilbart-cnn-6-6", "ner": "dslim/distilbert-NER"},
+}
+
+
+def profile_models(name):
+    if name not in PROFILES:
+        raise ValueError(f"unknown model profile '{name}', expected one of {sorted(PROFILES)}")
+    models = {}
+    for kind, default in PROFILES[name].items():
+        override = os.getenv(f"{name.upper()}_{kind.upper()}_MODEL")
+        if override is None and name == "quality":
+            override = os.getenv(f"{kind.upper()}_MODEL")
+        models[kind] = override or default
+    return models
@@ -0,0 +1,146 @@
+"""Shared tokenization: an encoding cache and length-bucketed padding.
+
+Encodings are cached by tokenizer and a hash of the text, so a text that is
+classified, chunked or re-analyzed is tokenized once per tokenizer rather
+than once per stage or request. `batches` pads groups of similarly long
+inputs together instead of padding a whole batch to its longest member.
+"""
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from src.api import metrics
+
+TOKENS = metrics.Counter("tokens_total", "Tokens fed to a model, real and padding", ["model", "kind"])
+TOKEN_CACHE = metrics.Counter("token_cache_total", "Encoding cache lookups by result", ["result"])
+
+# a bucket may be this much padding; below MIN_PAD_TOKENS wasted tokens an extra forward pass costs more
+MAX_PADDING = float(os.getenv("BUCKET_MAX_PADDING", "0.25"))
+MIN_PAD_TOKENS = 64
+
+_tokenizer_keys = weakref.WeakKeyDictionary()
+
+
+def tokenizer_key(tokenizer):
+    # tokenizers loaded from the same files encode identically, so their stages share entries
+    key = _tokenizer_keys.get(tokenizer)
+    if key is None:
+        key = _tokenizer_keys[tokenizer] = (type(tokenizer).__name__, tokenizer.name_or_path, len(tokenizer))
+    return key
+
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenCache:
+    """LRU of token id arrays, bounded by the total number of tokens held."""
+
+    def __init__(self, max_tokens=2_000_000):
+        self.max_tokens = max_tokens
+        self.tokens = 0
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def encode(self, tokenizer, texts, max_length=None, special=True):
+        """Token ids (int32 arrays) for `texts`; only texts not seen before are tokenized."""
+        prefix = (tokenizer_key(tokenizer), max_length, special)
+        keys = [(prefix, text_digest(t)) for t in texts]
+        found = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                ids = self._items.get(key)
+                if ids is not None:
+                    self._items.move_to_end(key)
+                    found[i] = ids
+
+        missing = {}
+        for i, ids in enumerate(found):
+            if ids is None:
+                missing.setdefault(keys[i], []).append(i)
+        hits = len(texts) - sum(len(v) for v in missing.values())
+        if hits:
+            TOKEN_CACHE.labels("hit").inc(hits)
+        if not missing:
+            return found
+
+        TOKEN_CACHE.labels("miss").inc(len(texts) - hits)
+        order = list(missing)
+        encoded = tokenizer(
+            [texts[missing[k][0]] for k in order],
+            add_special_tokens=special,
+            truncation=max_length is not None,
+            max_length=max_length,
+        )["input_ids"]
+        with self._lock:
+            for key, ids in zip(order, encoded):
+                ids = np.asarray(ids, dtype=np.int32)
+                for i in missing[key]:
+                    found[i] = ids
+                if self.max_tokens > 0 and len(ids) <= self.max_tokens and key not in self._items:
+                    self._items[key] = ids
+                    self.tokens += len(ids)
+            while self._items and self.tokens > self.max_tokens:
+                self.tokens -= len(self._items.popitem(last=False)[1])
+        return found
+
+    def stats(self):
+        with self._lock:
+            return {"items": len(self._items), "tokens": self.tokens, "max_tokens": self.max_tokens}
+
+
+token_cache = TokenCache(int(os.getenv("TOKEN_CACHE_TOKENS", "2000000")))
+
+
+def length_buckets(lengths, max_padding=None):
+    """Group indices by length so each group pads to its own longest member.
+
+    Indices are taken shortest-first, and a group is closed when the next
+    input would make more than `max_padding` of its cells padding.
+    """
+    max_padding = MAX_PADDING if max_padding is None else max_padding
+    buckets, current, total = [], [], 0
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        n = lengths[i]
+        wasted = n * (len(current) + 1) - (total + n)
+        if current and wasted > MIN_PAD_TOKENS and wasted > max_padding * n * (len(current) + 1):
+            buckets.append(current)
+            current, total = [], 0
+        current.append(i)
+        total += n
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def pad(tokenizer, encodings, model="model"):
+    """Pad token id arrays into int64 model inputs, like `tokenizer(..., padding=True)`."""
+    width = max(len(e) for e in encodings)
+    input_ids = np.full((len(encodings), width), tokenizer.pad_token_id or 0, dtype=np.int64)
+    attention_mask = np.zeros_like(input_ids)
+    left = tokenizer.padding_side == "left"
+    for row, ids in enumerate(encodings):
+        cols = slice(width - len(ids), width) if left else slice(0, len(ids))
+        input_ids[row, cols] = ids
+        attention_mask[row, cols] = 1
+
+    real = int(attention_mask.sum())
+    TOKENS.labels(model, "real").inc(real)
+    TOKENS.labels(model, "padding").inc(input_ids.size - real)
+
+    inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+    if "token_type_ids" in tokenizer.model_input_names:
+        inputs["token_type_ids"] = np.zeros_like(input_ids)
+    return inputs
+
+
+def batches(tokenizer, texts, max_length=None, model="model"):
+    """Yield `(indices, inputs)` for length-bucketed, padded batches of `texts`."""
+    with metrics.timer("tokenize"):
+        encodings = token_cache.encode(tokenizer, texts, max_length)
+    for idx in length_buckets([len(e) for e in encodings]):
+        yield idx, pad(tokenizer, [encodings[i] for i in idx], model)
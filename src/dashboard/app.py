@@ -1,9 +1,10 @@
 # src/dashboard/app.py
 import streamlit as st
-import requests
 import pandas as pd
 import os
 
+from client import APIClient, APIError, text_key
+
 st.set_page_config(page_title="News Analysis Dashboard", layout="wide", page_icon="📰")
 
 # Custom CSS for beautiful styling
@@ -137,11 +138,173 @@ def show_logo():
 
 show_logo()
 
+# --------------------
+# Helpers: analysis rendering
+# --------------------
+def stats_box(value, caption):
+    return f"""
+        <div class='stats-box'>
+            <h2 style='margin:0; color: #2d3436;'>{value}</h2>
+            <p style='margin:0.3rem 0 0 0; color: #636e72; font-size: 0.9em;'>{caption}</p>
+        </div>
+        """
+
+def render_stats(slot, text, data):
+    with slot.container():
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.markdown(stats_box(len(text.split()), "Words Analyzed"), unsafe_allow_html=True)
+        with col2:
+            ent_count = len(data["entities"] or []) if "entities" in data else "…"
+            st.markdown(stats_box(ent_count, "Entities Found"), unsafe_allow_html=True)
+        with col3:
+            summary_len = len((data["summary"] or "").split()) if "summary" in data else "…"
+            st.markdown(stats_box(summary_len, "Summary Words"), unsafe_allow_html=True)
+        st.markdown("")
+
+def render_prediction(pred):
+    st.markdown("### 🎯 Category Prediction")
+    label = pred.get('label', 'Unknown')
+    probs = pred.get("probs", [])
+
+    if probs:
+        max_prob = max(probs) * 100
+        st.markdown(f"""
+            <div class='metric-card'>
+                <h2 style='margin:0; color: white;'>{label}</h2>
+                <p style='margin:0.5rem 0 0 0; color: rgba(255,255,255,0.9);'>Primary Category</p>
+                <div style='margin-top: 1rem;'>
+                    <div class='confidence-bar' style='background: rgba(255,255,255,0.3);'>
+                        <div class='confidence-fill' style='width: {max_prob}%; background: rgba(255,255,255,0.9); color: #667eea;'>
+                            {max_prob:.1f}% Confidence
+                        </div>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        st.markdown("#### 📊 Probability Distribution")
+        df = pd.DataFrame({"Category": ["World","Sports","Business","Sci/Tech"], "Probability": probs})
+        st.bar_chart(df.set_index("Category"), color="#667eea", height=250)
+
+def render_summary(summary):
+    st.markdown("### 📋 AI-Generated Summary")
+    st.markdown(f"""
+        <div style='background-color: #f8f9fa; 
+                    padding: 1.5rem; 
+                    border-radius: 10px; 
+                    border-left: 4px solid #667eea;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);'>
+            <p style='margin: 0; line-height: 1.6;'>{summary}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def render_entities(ents):
+    st.markdown("### 🏷️ Named Entity Recognition")
+    if not ents:
+        st.info("ℹ️ No entities found.")
+        return
+
+    # Group entities by type
+    entity_groups = {}
+    for e in ents:
+        eg = e.get('entity_group', 'MISC')
+        if eg not in entity_groups:
+            entity_groups[eg] = []
+        mentions = e.get('mentions', 1)
+        entity_groups[eg].append(e.get('word', '') + (f" ×{mentions}" if mentions > 1 else ""))
+
+    entity_html = "<div style='padding: 1rem;'>"
+    for eg, words in entity_groups.items():
+        badge_class = "entity-badge"
+        if eg == "PER":
+            badge_class += " per-badge"
+        elif eg == "ORG":
+            badge_class += " org-badge"
+        elif eg == "LOC":
+            badge_class += " loc-badge"
+        else:
+            badge_class += " misc-badge"
+
+        entity_html += f"<div style='margin-bottom: 1rem;'><strong>{eg}:</strong> "
+        for word in words:
+            entity_html += f"<span class='{badge_class}'>{word}</span> "
+        entity_html += "</div>"
+    entity_html += "</div>"
+    st.markdown(entity_html, unsafe_allow_html=True)
+
+def render_feed_result(result):
+    st.markdown("""
+        <div style='background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%); 
+                    padding: 1.5rem; 
+                    border-radius: 12px; 
+                    margin: 1rem 0;
+                    box-shadow: 0 4px 8px rgba(0,0,0,0.1);'>
+        """, unsafe_allow_html=True)
+    
+    pred = result.get("prediction") or {}
+    label = pred.get('label', 'Unknown')
+    probs = pred.get("probs", [])
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        if probs:
+            max_prob = max(probs) * 100
+            st.markdown(f"""
+                <div style='background: white; padding: 1rem; border-radius: 8px; text-align: center;'>
+                    <h3 style='margin: 0; color: #667eea;'>{label}</h3>
+                    <p style='margin: 0.3rem 0 0 0; color: #636e72; font-size: 0.85em;'>{max_prob:.1f}% Confidence</p>
+                </div>
+                """, unsafe_allow_html=True)
+    with col2:
+        if probs:
+            df = pd.DataFrame({"Category": ["World","Sports","Business","Sci/Tech"], "Probability": probs})
+            st.bar_chart(df.set_index("Category"), color="#667eea", height=150)
+
+    st.markdown("### 📋 Summary")
+    st.markdown(f"""
+        <div style='background: white; padding: 1rem; border-radius: 8px; margin: 0.5rem 0;'>
+            {result.get("summary") or ""}
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.markdown("### 🏷️ Entities")
+    ents = result.get("entities") or []
+    if ents:
+        entity_html = "<div style='background: white; padding: 1rem; border-radius: 8px;'>"
+        for e in ents:
+            eg = e.get('entity_group', 'MISC')
+            badge_class = "entity-badge"
+            if eg == "PER":
+                badge_class += " per-badge"
+            elif eg == "ORG":
+                badge_class += " org-badge"
+            elif eg == "LOC":
+                badge_class += " loc-badge"
+            entity_html += f"<span class='{badge_class}'>{eg}: {e.get('word')}</span> "
+        entity_html += "</div>"
+        st.markdown(entity_html, unsafe_allow_html=True)
+    else:
+        st.info("ℹ️ No entities detected.")
+    
+    st.markdown("</div>", unsafe_allow_html=True)
+
+@st.cache_resource
+def get_client():
+    # one pooled session and analysis cache per dashboard process, shared by all sessions
+    return APIClient(
+        API_URL,
+        ttl=int(os.getenv("DASHBOARD_CACHE_TTL", "600")),
+        workers=int(os.getenv("DASHBOARD_WORKERS", "4")),
+    )
+
+client = get_client()
+
 # --------------------
 # Sidebar
 # --------------------
 st.sidebar.markdown("## 🧭 Navigation")
-mode = st.sidebar.radio("", ["📝 Analyze Article", "📡 Live Feed"], label_visibility="collapsed")
+mode = st.sidebar.radio("", ["📝 Analyze Article", "📡 Live Feed", "📈 Trends"], label_visibility="collapsed")
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
     <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
@@ -197,122 +360,34 @@ if mode == "📝 Analyze Article":
             if not text.strip():
                 st.warning("⚠️ Please paste some text")
             else:
+                st.markdown("---")
+                # sections are filled in as each stage's result streams in
+                stats_slot = st.empty()
+                pred_slot = st.empty()
+                summary_slot = st.empty()
+                entities_slot = st.empty()
+
+                data = {}
+                render_stats(stats_slot, text, data)
+                for slot, message in ((pred_slot, "🎯 Classifying..."), (summary_slot, "📋 Summarizing..."), (entities_slot, "🏷️ Extracting entities...")):
+                    slot.info(message)
+
                 with st.spinner("🤖 Analyzing with AI..."):
                     try:
-                        resp = requests.post(f"{API_URL}/analyze", json={"text": text}, timeout=60)
+                        for stage, value in client.analyze_stream(text):
+                            data[stage] = value
+                            if stage == "prediction":
+                                with pred_slot.container():
+                                    render_prediction(value or {})
+                            elif stage == "summary":
+                                with summary_slot.container():
+                                    render_summary(value or "")
+                            elif stage == "entities":
+                                with entities_slot.container():
+                                    render_entities(value or [])
+                            render_stats(stats_slot, text, data)
                     except Exception as e:
                         st.error(f"❌ Request failed: {e}")
-                    else:
-                        if resp.status_code != 200:
-                            st.error(f"❌ API error {resp.status_code}: {resp.text}")
-                        else:
-                            try:
-                                data = resp.json()
-                            except Exception as e:
-                                st.error(f"❌ Invalid JSON from API: {e}")
-                                st.text(resp.text)
-                            else:
-                                st.markdown("---")
-                                
-                                # Stats overview
-                                col1, col2, col3 = st.columns(3)
-                                with col1:
-                                    word_count = len(text.split())
-                                    st.markdown(f"""
-                                        <div class='stats-box'>
-                                            <h2 style='margin:0; color: #2d3436;'>{word_count}</h2>
-                                            <p style='margin:0.3rem 0 0 0; color: #636e72; font-size: 0.9em;'>Words Analyzed</p>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                with col2:
-                                    ent_count = len(data.get("entities", []))
-                                    st.markdown(f"""
-                                        <div class='stats-box'>
-                                            <h2 style='margin:0; color: #2d3436;'>{ent_count}</h2>
-                                            <p style='margin:0.3rem 0 0 0; color: #636e72; font-size: 0.9em;'>Entities Found</p>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                with col3:
-                                    summary_len = len(data.get("summary", "").split())
-                                    st.markdown(f"""
-                                        <div class='stats-box'>
-                                            <h2 style='margin:0; color: #2d3436;'>{summary_len}</h2>
-                                            <p style='margin:0.3rem 0 0 0; color: #636e72; font-size: 0.9em;'>Summary Words</p>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                
-                                st.markdown("")
-                                
-                                # Prediction section
-                                st.markdown("### 🎯 Category Prediction")
-                                pred = data.get("prediction", {})
-                                label = pred.get('label', 'Unknown')
-                                probs = pred.get("probs", [])
-                                
-                                if probs:
-                                    max_prob = max(probs) * 100
-                                    st.markdown(f"""
-                                        <div class='metric-card'>
-                                            <h2 style='margin:0; color: white;'>{label}</h2>
-                                            <p style='margin:0.5rem 0 0 0; color: rgba(255,255,255,0.9);'>Primary Category</p>
-                                            <div style='margin-top: 1rem;'>
-                                                <div class='confidence-bar' style='background: rgba(255,255,255,0.3);'>
-                                                    <div class='confidence-fill' style='width: {max_prob}%; background: rgba(255,255,255,0.9); color: #667eea;'>
-                                                        {max_prob:.1f}% Confidence
-                                                    </div>
-                                                </div>
-                                            </div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                    
-                                    st.markdown("#### 📊 Probability Distribution")
-                                    df = pd.DataFrame({"Category": ["World","Sports","Business","Sci/Tech"], "Probability": probs})
-                                    st.bar_chart(df.set_index("Category"), color="#667eea", height=250)
-
-                                # Summary section
-                                st.markdown("### 📋 AI-Generated Summary")
-                                st.markdown(f"""
-                                    <div style='background-color: #f8f9fa; 
-                                                padding: 1.5rem; 
-                                                border-radius: 10px; 
-                                                border-left: 4px solid #667eea;
-                                                box-shadow: 0 2px 4px rgba(0,0,0,0.1);'>
-                                        <p style='margin: 0; line-height: 1.6;'>{data.get("summary", "")}</p>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-
-                                # Entities section
-                                st.markdown("### 🏷️ Named Entity Recognition")
-                                ents = data.get("entities", [])
-                                if ents:
-                                    # Group entities by type
-                                    entity_groups = {}
-                                    for e in ents:
-                                        eg = e.get('entity_group', 'MISC')
-                                        if eg not in entity_groups:
-                                            entity_groups[eg] = []
-                                        entity_groups[eg].append(e.get('word', ''))
-                                    
-                                    entity_html = "<div style='padding: 1rem;'>"
-                                    for eg, words in entity_groups.items():
-                                        badge_class = "entity-badge"
-                                        if eg == "PER":
-                                            badge_class += " per-badge"
-                                        elif eg == "ORG":
-                                            badge_class += " org-badge"
-                                        elif eg == "LOC":
-                                            badge_class += " loc-badge"
-                                        else:
-                                            badge_class += " misc-badge"
-                                        
-                                        entity_html += f"<div style='margin-bottom: 1rem;'><strong>{eg}:</strong> "
-                                        for word in words:
-                                            entity_html += f"<span class='{badge_class}'>{word}</span> "
-                                        entity_html += "</div>"
-                                    entity_html += "</div>"
-                                    st.markdown(entity_html, unsafe_allow_html=True)
-                                else:
-                                    st.info("ℹ️ No entities found.")
 
 # --------------------
 # Live Feed Mode
@@ -325,25 +400,41 @@ elif mode == "📡 Live Feed":
         if st.button("🔄 Fetch Articles"):
             with st.spinner("📥 Fetching articles..."):
                 try:
-                    resp = requests.get(f"{API_URL}/fetch_sample", timeout=20)
+                    articles = client.fetch_sample()
+                except APIError as e:
+                    st.error(f"❌ {e}")
+                except ValueError as e:
+                    st.error(f"❌ Invalid JSON from /fetch_sample: {e}")
                 except Exception as e:
                     st.error(f"❌ Failed to fetch sample articles: {e}")
-                    resp = None
-
-                if resp is None:
-                    pass
-                elif resp.status_code != 200:
-                    st.error(f"❌ API error {resp.status_code}: {resp.text}")
                 else:
-                    try:
-                        articles = resp.json()
-                    except Exception as e:
-                        st.error(f"❌ Invalid JSON from /fetch_sample: {e}")
-                        st.text(resp.text)
-                        articles = []
                     st.session_state["articles"] = articles
                     st.success(f"✅ Fetched {len(articles)} articles")
 
+    query = st.text_input("🔎 Search stored articles", placeholder="e.g. interest rates in Europe")
+    if query:
+        hits = None
+        try:
+            hits = client.search(query, k=10)
+        except APIError as e:
+            if e.status_code == 404:
+                st.info("ℹ️ Search needs the article store (set ARTICLE_DB_PATH or INGEST_ENABLED=1 on the API).")
+            else:
+                st.error(f"❌ {e}")
+        except Exception as e:
+            st.error(f"❌ Search failed: {e}")
+
+        if hits is not None:
+            if not hits:
+                st.info("ℹ️ No matching articles.")
+            for hit in hits:
+                st.markdown(
+                    f"**[{hit.get('title') or 'Untitled'}]({hit.get('link', '')})** · "
+                    f"{hit.get('source', 'Unknown')} · relevance {hit.get('score', 0):.2f}"
+                )
+                if hit.get("summary"):
+                    st.caption(hit["summary"])
+
     st.markdown("---")
 
     articles = st.session_state.get("articles", [])
@@ -371,13 +462,23 @@ elif mode == "📡 Live Feed":
                 <strong>📊 {len(articles)} Articles Ready for Analysis</strong>
             </div>
             """, unsafe_allow_html=True)
-        
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            analyze_all = st.button("⚡ Analyze all", key="analyze_all")
+        progress_slot = st.empty()
+
+        # results are keyed by text hash, so they stay attached to the right article after a refetch
+        results = st.session_state["analysis_results"]
+        texts, result_slots = [], {}
         for i, a in enumerate(articles):
             title = a.get("title", f"Article {i+1}")
             source = a.get("source", "Unknown")
             url = a.get("url") or a.get("link") or ""
             summary = a.get("summary", "")
             text = a.get("text", "") or summary or ""
+            key = text_key(text)
+            texts.append(text)
 
             st.markdown(f"""
                 <div class='article-card'>
@@ -406,86 +507,126 @@ elif mode == "📡 Live Feed":
                     </div>
                     """, unsafe_allow_html=True)
 
-            analyze_key = f"analyze_btn_{i}"
+            analyze_key = f"analyze_btn_{i}_{key[:12]}"
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button(f"🔍 Analyze Article #{i+1}", key=analyze_key):
-                    st.session_state["analysis_results"].pop(str(i), None)
                     with st.spinner("🤖 Analyzing article..."):
                         try:
-                            resp = requests.post(f"{API_URL}/analyze", json={"text": text}, timeout=60)
+                            results[key] = client.analyze(text)
+                        except ValueError as e:
+                            st.error(f"❌ Invalid JSON from analyze: {e}")
                         except Exception as e:
                             st.error(f"❌ Request failed: {e}")
-                            continue
 
-                        if resp.status_code != 200:
-                            st.error(f"❌ API error {resp.status_code}: {resp.text}")
-                            continue
+            slot = st.empty()
+            result = results.get(key) or client.cached(text)
+            if result:
+                results[key] = result
+                with slot.container():
+                    render_feed_result(result)
+            elif analyze_all and text.strip():
+                slot.info("⏳ Queued for analysis...")
+                result_slots[i] = slot
+            
+            st.markdown("---")
 
-                        try:
-                            data = resp.json()
-                        except Exception as e:
-                            st.error(f"❌ Invalid JSON from analyze: {e}")
-                            st.text(resp.text)
-                            continue
+        if result_slots:
+            # fill each article in as its batch comes back instead of blocking on the whole feed
+            pending = sorted(result_slots)
+            done = 0
+            progress_slot.progress(0.0, text=f"Analyzing {len(pending)} articles...")
+            for j, result in client.analyze_many([texts[i] for i in pending]):
+                i = pending[j]
+                done += 1
+                if isinstance(result, Exception):
+                    result_slots[i].error(f"❌ Request failed: {result}")
+                else:
+                    results[text_key(texts[i])] = result
+                    with result_slots[i].container():
+                        render_feed_result(result)
+                progress_slot.progress(done / len(pending), text=f"Analyzed {done}/{len(pending)} articles")
+            progress_slot.success(f"✅ Analyzed {len(pending)} articles")
 
-                        st.session_state["analysis_results"][str(i)] = data
+# --------------------
+# Trends Mode
+# --------------------
+elif mode == "📈 Trends":
+    st.markdown("### 📈 Topic Trends")
+    windows = {"Last 24 hours": (24, "hour"), "Last 7 days": (7 * 24, "hour"), "Last 30 days": (30 * 24, "day")}
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        window = st.selectbox("Window", list(windows))
+    hours, bucket = windows[window]
+    sources = st.session_state.get("trend_sources", [])
+    with col2:
+        source = st.selectbox("Source", ["All sources"] + sources)
 
-            result = st.session_state["analysis_results"].get(str(i))
-            if result:
-                st.markdown("""
-                    <div style='background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%); 
-                                padding: 1.5rem; 
-                                border-radius: 12px; 
-                                margin: 1rem 0;
-                                box-shadow: 0 4px 8px rgba(0,0,0,0.1);'>
-                    """, unsafe_allow_html=True)
-                
-                pred = result.get("prediction", {})
-                label = pred.get('label', 'Unknown')
-                probs = pred.get("probs", [])
-                
-                col1, col2 = st.columns([1, 2])
-                with col1:
-                    if probs:
-                        max_prob = max(probs) * 100
-                        st.markdown(f"""
-                            <div style='background: white; padding: 1rem; border-radius: 8px; text-align: center;'>
-                                <h3 style='margin: 0; color: #667eea;'>{label}</h3>
-                                <p style='margin: 0.3rem 0 0 0; color: #636e72; font-size: 0.85em;'>{max_prob:.1f}% Confidence</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                with col2:
-                    if probs:
-                        df = pd.DataFrame({"Category": ["World","Sports","Business","Sci/Tech"], "Probability": probs})
-                        st.bar_chart(df.set_index("Category"), color="#667eea", height=150)
-
-                st.markdown("### 📋 Summary")
-                st.markdown(f"""
-                    <div style='background: white; padding: 1rem; border-radius: 8px; margin: 0.5rem 0;'>
-                        {result.get("summary", "")}
-                    </div>
-                    """, unsafe_allow_html=True)
+    data = None
+    try:
+        data = client.trends(hours, bucket, None if source == "All sources" else source)
+    except APIError as e:
+        if e.status_code == 404:
+            st.info("ℹ️ Trends need the article store (set ARTICLE_DB_PATH or INGEST_ENABLED=1 on the API).")
+        else:
+            st.error(f"❌ {e}")
+    except Exception as e:
+        st.error(f"❌ Failed to load trends: {e}")
+
+    if data is not None:
+        loaded = [s["source"] for s in data["sources"]]
+        if loaded != sources:
+            # the source picker above lists what the rollups have seen
+            st.session_state["trend_sources"] = loaded
+            st.rerun()
+        totals = data["totals"]
+        if not totals["articles"]:
+            st.info("ℹ️ No analyzed articles in this window yet.")
+        else:
+            categories = totals["categories"]
+            top_label = max(categories, key=lambda label: categories[label]["articles"])
+            confidence = sum(c["articles"] * c["mean_confidence"] for c in categories.values()) / totals["articles"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(stats_box(totals["articles"], "Articles Analyzed"), unsafe_allow_html=True)
+            with col2:
+                st.markdown(stats_box(top_label, "Top Category"), unsafe_allow_html=True)
+            with col3:
+                st.markdown(stats_box(f"{confidence * 100:.1f}%", "Mean Confidence"), unsafe_allow_html=True)
+            st.markdown("")
 
-                st.markdown("### 🏷️ Entities")
-                ents = result.get("entities", [])
-                if ents:
-                    entity_html = "<div style='background: white; padding: 1rem; border-radius: 8px;'>"
-                    for e in ents:
-                        eg = e.get('entity_group', 'MISC')
-                        badge_class = "entity-badge"
-                        if eg == "PER":
-                            badge_class += " per-badge"
-                        elif eg == "ORG":
-                            badge_class += " org-badge"
-                        elif eg == "LOC":
-                            badge_class += " loc-badge"
-                        entity_html += f"<span class='{badge_class}'>{eg}: {e.get('word')}</span> "
-                    entity_html += "</div>"
-                    st.markdown(entity_html, unsafe_allow_html=True)
+            # one row per bucket, empty buckets shown as zero articles
+            index = pd.date_range(
+                pd.to_datetime(data["since"], unit="s"), pd.to_datetime(data["until"], unit="s"),
+                freq=f"{data['bucket_seconds']}s", inclusive="left",
+            )
+            rows = [
+                {"time": pd.to_datetime(point["start"], unit="s"), "category": label, **values}
+                for point in data["series"] for label, values in point["categories"].items()
+            ]
+            df = pd.DataFrame(rows)
+            counts = df.pivot_table(index="time", columns="category", values="articles", aggfunc="sum")
+            counts = counts.reindex(index=index, columns=data["labels"], fill_value=0).fillna(0)
+            confidence = df.pivot_table(index="time", columns="category", values="mean_confidence")
+
+            st.markdown("#### 🗂️ Articles per Category")
+            st.area_chart(counts, height=280)
+            st.markdown("#### 🎯 Mean Confidence per Category")
+            st.line_chart(confidence.reindex(columns=[l for l in data["labels"] if l in confidence]), height=220)
+
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.markdown("#### 📰 Articles per Source")
+                by_source = pd.DataFrame(data["sources"]).set_index("source")
+                st.bar_chart(by_source, color="#667eea", height=250)
+            with col2:
+                st.markdown("#### 🏷️ Top Entities")
+                if totals["entities"]:
+                    st.dataframe(
+                        pd.DataFrame(totals["entities"]).rename(columns={
+                            "entity_group": "Type", "word": "Entity", "articles": "Articles", "mentions": "Mentions",
+                        })[["Entity", "Type", "Articles", "Mentions"]],
+                        hide_index=True, use_container_width=True,
+                    )
                 else:
-                    st.info("ℹ️ No entities detected.")
-                
-                st.markdown("</div>", unsafe_allow_html=True)
-            
-            st.markdown("---")
\ No newline at end of file
+                    st.info("ℹ️ No entities in this window.")
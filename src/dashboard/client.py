@@ -0,0 +1,193 @@
+"""HTTP client for the dashboard: one pooled session and a TTL cache of analyses.
+
+Analyses are cached by a hash of the article text rather than by where the
+article sits in a list, so refetching the feed or re-running the script
+reuses results for articles that were already analyzed.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+STAGES = ("prediction", "entities", "summary")
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def complete(result):
+    """True for a full analysis: every stage present and none failed, timed out or degraded."""
+    if not isinstance(result, dict) or any(result.get(k) for k in ("error", "errors", "timed_out", "degraded")):
+        return False
+    return all(result.get(stage) is not None for stage in STAGES)
+
+
+class APIError(RuntimeError):
+    def __init__(self, resp):
+        self.status_code = resp.status_code
+        super().__init__(f"API error {resp.status_code}: {resp.text}")
+
+
+class TTLCache:
+    """Thread-safe LRU of analysis results that expire after `ttl` seconds."""
+
+    def __init__(self, ttl=600, max_items=512):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, value):
+        if self.ttl <= 0 or self.max_items <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class APIClient:
+    def __init__(self, base_url, ttl=600, max_items=512, pool_size=8, batch_size=4, workers=4):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.workers = workers
+        self.cache = TTLCache(ttl, max_items)
+        self._batch_supported = True
+
+        # keep-alive connections shared by every script run; retry only failed connects
+        self.session = requests.Session()
+        retries = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.3)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, path, timeout=20, **kwargs):
+        resp = self.session.get(f"{self.base_url}{path}", timeout=timeout, **kwargs)
+        if resp.status_code != 200:
+            raise APIError(resp)
+        return resp.json()
+
+    def _post(self, path, body, timeout=60, **kwargs):
+        resp = self.session.post(f"{self.base_url}{path}", json=body, timeout=timeout, **kwargs)
+        if resp.status_code != 200 and not kwargs.get("stream"):
+            raise APIError(resp)
+        return resp
+
+    def fetch_sample(self):
+        return self._get("/fetch_sample")
+
+    def search(self, query, k=10):
+        return self._get("/search", params={"q": query, "k": k}).get("results", [])
+
+    def trends(self, hours=24, bucket="hour", source=None):
+        params = {"hours": hours, "bucket": bucket}
+        if source:
+            params["source"] = source
+        return self._get("/trends", params=params)
+
+    def cached(self, text):
+        return self.cache.get(text_key(text))
+
+    def analyze(self, text):
+        key = text_key(text)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._post("/analyze", {"text": text}).json()
+            if complete(result):
+                self.cache.put(key, result)
+        return result
+
+    def analyze_stream(self, text):
+        """Yield (stage, value) pairs from /analyze_stream as each stage finishes.
+
+        Cached articles are replayed at once; APIs without streaming fall back
+        to the blocking /analyze endpoint. Only complete analyses are cached,
+        so a failed, timed-out or degraded stage is retried next time.
+        """
+        key = text_key(text)
+        result = self.cache.get(key)
+        if result is None:
+            resp = self._post("/analyze_stream", {"text": text}, stream=True)
+            if resp.status_code == 404:
+                result = self.analyze(text)
+            elif resp.status_code != 200:
+                raise APIError(resp)
+            else:
+                result, failed = {}, False
+                for line in resp.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("stage") == "done":
+                        if not failed and complete(dict(result, degraded=event.get("degraded"))):
+                            self.cache.put(key, result)
+                        break
+                    failed = failed or event.get("status", "ok") != "ok"
+                    result[event["stage"]] = event.get("data")
+                    yield event["stage"], event.get("data")
+                return
+        for stage in STAGES:
+            yield stage, result.get(stage)
+
+    def _analyze_chunk(self, texts):
+        if self._batch_supported:
+            try:
+                return self._post("/analyze_batch", {"texts": texts}, timeout=60 + 30 * len(texts)).json()
+            except APIError as e:
+                if e.status_code != 404:
+                    raise
+                self._batch_supported = False
+        return [self.analyze(text) for text in texts]
+
+    def analyze_many(self, texts):
+        """Analyze several texts, yielding (index, result) pairs as they complete.
+
+        Cached texts come back first. The rest go out as concurrent
+        /analyze_batch calls of `batch_size` texts, and a failed call yields
+        its exception in place of each of its results.
+        """
+        pending = {}
+        for i, text in enumerate(texts):
+            key = text_key(text)
+            result = self.cache.get(key)
+            if result is not None:
+                yield i, result
+            else:
+                pending.setdefault(key, []).append(i)
+        if not pending:
+            return
+
+        keys = list(pending)
+        chunks = [keys[start:start + self.batch_size] for start in range(0, len(keys), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            futures = {pool.submit(self._analyze_chunk, [texts[pending[k][0]] for k in chunk]): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [e] * len(chunk)
+                for key, result in zip(chunk, results):
+                    if complete(result):
+                        self.cache.put(key, result)
+                    for i in pending[key]:
+                        yield i, result
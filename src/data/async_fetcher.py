@@ -0,0 +1,121 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import feedparser
+import httpx
+from newspaper import Article
+
+USER_AGENT = "news-analysis-dashboard/1.0 (+https://huggingface.co/upasanapandey)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AsyncFetcher:
+    """Pooled async HTTP fetching for feeds and articles.
+
+    Requests share one `httpx.AsyncClient`, are limited per host, time out
+    and retry with backoff. Feed XML is parsed from bytes and articles are
+    parsed with newspaper on a bounded worker pool.
+    """
+
+    def __init__(self, per_host_limit=4, timeout=10.0, retries=2, backoff=0.25, workers=4):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.workers = workers
+        self._client = None
+        self._host_limits = {}
+        self._pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+        return self._client
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="article-parse")
+        return self._pool
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        sem = self._host_limits.get(host)
+        if sem is None:
+            sem = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return sem
+
+    async def get(self, url, headers=None):
+        """GET `url` with per-host limiting and retries. Returns the `httpx.Response`."""
+        attempt = 0
+        while True:
+            try:
+                async with self._host_limit(url):
+                    resp = await self.client.get(url, headers=headers)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+            except (httpx.TransportError, httpx.TimeoutException):
+                if attempt >= self.retries:
+                    raise
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    async def run_in_pool(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def fetch_feed(self, url):
+        resp = await self.get(url)
+        resp.raise_for_status()
+        return await self.run_in_pool(feedparser.parse, resp.content)
+
+    async def fetch_feeds(self, urls):
+        """Fetch feeds concurrently. Failed feeds come back as the exception instead of a parsed feed."""
+        return await asyncio.gather(*(self.fetch_feed(u) for u in urls), return_exceptions=True)
+
+    async def fetch_article(self, url, nlp=True):
+        resp = await self.get(url)
+        resp.raise_for_status()
+        return await self.run_in_pool(parse_article, url, resp.text, nlp)
+
+    async def fetch_articles(self, urls, nlp=True):
+        return await asyncio.gather(*(self.fetch_article(u, nlp) for u in urls), return_exceptions=True)
+
+
+def parse_article(url, html, nlp=True):
+    a = Article(url)
+    a.download(input_html=html)
+    a.parse()
+    if nlp:
+        a.nlp()
+    return a
+
+
+def fetcher_from_env():
+    return AsyncFetcher(
+        per_host_limit=int(os.getenv("FETCH_PER_HOST", "4")),
+        timeout=float(os.getenv("FETCH_TIMEOUT", "10")),
+        retries=int(os.getenv("FETCH_RETRIES", "2")),
+        workers=int(os.getenv("FETCH_WORKERS", "4")),
+    )
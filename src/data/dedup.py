@@ -0,0 +1,128 @@
+import hashlib
+import re
+import threading
+from collections import defaultdict
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+MASK64 = (1 << 64) - 1
+
+
+def normalize(text):
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def exact_hash(text):
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text, shingle=3):
+    """64-bit SimHash over word shingles; near-identical texts differ in few bits."""
+    words = normalize(text).split()
+    if len(words) < shingle:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1)]
+
+    weights = [0] * 64
+    for gram in grams:
+        h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    value = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            value |= 1 << bit
+    return value
+
+
+def to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value & MASK64
+
+
+class Deduplicator:
+    """Finds exact and near-duplicate articles among the canonical ones seen so far.
+
+    Near duplicates are SimHashes within `max_distance` bits. The hash is
+    split into `max_distance + 1` bands, so any match within that distance
+    shares at least one band exactly and only those candidates are compared.
+    """
+
+    def __init__(self, max_distance=6):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = 64 // self.bands
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._digests = {}
+        self._simhashes = {}
+        self._band_index = [defaultdict(list) for _ in range(self.bands)]
+        self.checked = 0
+        self.exact_dups = 0
+        self.near_dups = 0
+
+    def _band_keys(self, value):
+        mask = (1 << self._band_bits) - 1
+        return [(value >> (i * self._band_bits)) & mask for i in range(self.bands)]
+
+    def fingerprint(self, text):
+        return exact_hash(text), simhash(text)
+
+    def find(self, fingerprint):
+        """Returns `("exact" | "near", canonical_id)` for a duplicate, else `("new", None)`."""
+        digest, sim = fingerprint
+        with self._lock:
+            self.checked += 1
+            if digest in self._exact:
+                self.exact_dups += 1
+                return "exact", self._exact[digest]
+            best = None
+            for band, key in enumerate(self._band_keys(sim)):
+                for article_id in self._band_index[band].get(key, ()):
+                    distance = bin(sim ^ self._simhashes[article_id]).count("1")
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, article_id)
+            if best is not None:
+                self.near_dups += 1
+                return "near", best[1]
+            return "new", None
+
+    def add(self, article_id, fingerprint):
+        digest, sim = fingerprint
+        with self._lock:
+            self._exact.setdefault(digest, article_id)
+            self._digests[article_id] = digest
+            self._simhashes[article_id] = sim
+            for band, key in enumerate(self._band_keys(sim)):
+                self._band_index[band][key].append(article_id)
+
+    def remove(self, article_id):
+        """Forget an article's fingerprint, e.g. because its text changed."""
+        with self._lock:
+            sim = self._simhashes.pop(article_id, None)
+            if sim is None:
+                return
+            digest = self._digests.pop(article_id)
+            if self._exact.get(digest) == article_id:
+                del self._exact[digest]
+            for band, key in enumerate(self._band_keys(sim)):
+                ids = self._band_index[band][key]
+                ids.remove(article_id)
+                if not ids:
+                    del self._band_index[band][key]
+
+    def stats(self):
+        with self._lock:
+            skipped = self.exact_dups + self.near_dups
+            return {
+                "canonical_articles": len(self._simhashes),
+                "checked": self.checked,
+                "exact_duplicates": self.exact_dups,
+                "near_duplicates": self.near_dups,
+                "skip_ratio": skipped / self.checked if self.checked else 0.0,
+                "max_distance": self.max_distance,
+            }
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import feedparser
+
+
+class FeedCache:
+    """Per-URL cache of parsed feeds using conditional GET.
+
+    Within `freshness` seconds a feed is served from memory. After that it is
+    revalidated with If-None-Match / If-Modified-Since, and a 304 reuses the
+    parsed entries. If revalidation fails, the stale copy is served.
+    """
+
+    def __init__(self, fetcher, freshness=60.0):
+        self.fetcher = fetcher
+        self.freshness = float(freshness)
+        self._entries = {}  # url -> dict(parsed, etag, last_modified, fetched_at)
+        self._locks = {}
+        self._stats = {}
+
+    def _stat(self, url):
+        st = self._stats.get(url)
+        if st is None:
+            st = self._stats[url] = {
+                "requests": 0,
+                "fresh_hits": 0,
+                "not_modified": 0,
+                "downloads": 0,
+                "stale_served": 0,
+                "errors": 0,
+                "upstream_ms_total": 0.0,
+                "last_upstream_ms": None,
+            }
+        return st
+
+    async def get(self, url):
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            st = self._stat(url)
+            st["requests"] += 1
+            entry = self._entries.get(url)
+            now = time.time()
+            if entry and now - entry["fetched_at"] < self.freshness:
+                st["fresh_hits"] += 1
+                return entry["parsed"]
+
+            headers = {}
+            if entry and entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry and entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+            started = time.perf_counter()
+            try:
+                resp = await self.fetcher.get(url, headers=headers)
+                if resp.status_code == 304 and entry:
+                    entry["fetched_at"] = now
+                    st["not_modified"] += 1
+                    return entry["parsed"]
+                resp.raise_for_status()
+                parsed = await self.fetcher.run_in_pool(feedparser.parse, resp.content)
+            except Exception:
+                st["errors"] += 1
+                if entry:
+                    st["stale_served"] += 1
+                    return entry["parsed"]
+                raise
+            finally:
+                took = (time.perf_counter() - started) * 1000.0
+                st["upstream_ms_total"] += took
+                st["last_upstream_ms"] = took
+
+            st["downloads"] += 1
+            self._entries[url] = {
+                "parsed": parsed,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": now,
+            }
+            return parsed
+
+    async def get_many(self, urls):
+        """Like `AsyncFetcher.fetch_feeds`: failed feeds come back as the exception."""
+        return await asyncio.gather(*(self.get(u) for u in urls), return_exceptions=True)
+
+    def invalidate(self, url=None):
+        if url is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(url, None)
+
+    def stats(self):
+        feeds = {}
+        total_requests = total_hits = 0
+        for url, st in self._stats.items():
+            hits = st["fresh_hits"] + st["not_modified"]
+            upstream = st["requests"] - st["fresh_hits"]
+            feeds[url] = dict(
+                st,
+                hit_ratio=hits / st["requests"] if st["requests"] else 0.0,
+                avg_upstream_ms=st["upstream_ms_total"] / upstream if upstream else None,
+            )
+            total_requests += st["requests"]
+            total_hits += hits
+        return {
+            "freshness_seconds": self.freshness,
+            "requests": total_requests,
+            "hit_ratio": total_hits / total_requests if total_requests else 0.0,
+            "feeds": feeds,
+        }
@@ -0,0 +1,182 @@
+"""Long-running feed ingestion.
+
+Polls every feed on its own interval, skips entries already in the
+ArticleStore, downloads the new ones and stores them together with their
+classification, summary and entities. Articles whose content is an exact or
+near duplicate of a stored one (e.g. syndicated wire copy) are linked to
+that canonical article instead of being analyzed again. A stored article
+whose feed entry changed is downloaded again and, if its text changed,
+re-analyzed. Analyses that failed are not stored; those articles are retried
+on the feed's next poll.
+
+    python -m src.data.ingest
+"""
+import asyncio
+import os
+import time
+
+from src.data.async_fetcher import fetcher_from_env
+from src.data.dedup import Deduplicator, to_signed, to_unsigned
+from src.data.feed_cache import FeedCache
+from src.data.news_fetcher import fetch_feed_articles
+from src.data.store import ArticleStore
+
+DEFAULT_FEEDS = {
+    "BBC": "http://feeds.bbci.co.uk/news/rss.xml",
+    "Reuters": "http://feeds.reuters.com/reuters/topNews",
+    "TechCrunch": "https://techcrunch.com/feed/",
+    "NYTimes": "https://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml",
+}
+
+
+def intervals_from_env(feeds, default=None):
+    # INGEST_INTERVALS="BBC=120,Reuters=600" overrides INGEST_INTERVAL_SECONDS per source
+    default = float(default or os.getenv("INGEST_INTERVAL_SECONDS", "300"))
+    overrides = {}
+    for part in os.getenv("INGEST_INTERVALS", "").split(","):
+        if "=" in part:
+            name, seconds = part.split("=", 1)
+            overrides[name.strip()] = float(seconds)
+    return {source: overrides.get(source, default) for source in feeds}
+
+
+class IngestScheduler:
+    def __init__(self, store, feeds=None, intervals=None, analyzer=None, fetcher=None, max_per_feed=10,
+                 on_stored=None):
+        """`analyzer(texts)` returns one analysis dict per text; None stores articles unanalyzed.
+
+        `on_stored(ids)` is called with the ids of the new canonical articles once they are analyzed,
+        and of stored ones whose text changed and was analyzed again.
+        """
+        self.store = store
+        self.feeds = feeds or DEFAULT_FEEDS
+        self.intervals = intervals or intervals_from_env(self.feeds)
+        self.analyzer = analyzer
+        self.on_stored = on_stored
+        self.fetcher = fetcher or fetcher_from_env()
+        # freshness 0: every poll revalidates, but unchanged feeds cost a 304
+        self.feed_cache = FeedCache(self.fetcher, freshness=0)
+        self.max_per_feed = max_per_feed
+        self.dedup = Deduplicator(max_distance=int(os.getenv("DEDUP_MAX_DISTANCE", "6")))
+        for article_id, digest, sim in store.fingerprints():
+            self.dedup.add(article_id, (digest, to_unsigned(sim)))
+        self._tasks = []
+        self._stats = {
+            source: {"polls": 0, "errors": 0, "new_articles": 0, "updated_articles": 0, "failed_analyses": 0,
+                     "last_poll": None, "last_error": None}
+            for source in self.feeds
+        }
+
+    async def poll_feed(self, source):
+        # articles stored by an earlier poll whose analysis failed or never ran
+        retry = self.store.unanalyzed(source, self.max_per_feed) if self.analyzer is not None else []
+        articles = await fetch_feed_articles(
+            self.fetcher, self.feeds[source], self.max_per_feed, skip=self.store.has, feed_cache=self.feed_cache
+        )
+        new, updated = [], 0
+        for a in articles:
+            a["source"] = source
+            fingerprint = self.dedup.fingerprint(a["text"] or a["summary"] or a["title"])
+            a["exact_hash"], a["simhash"] = fingerprint[0], to_signed(fingerprint[1])
+            stored = self.store.find(a["guid"], a["url"])
+            if stored is not None:
+                if self._refresh(stored, a, fingerprint):
+                    new.append((stored["id"], a))
+                    updated += 1
+                continue
+            kind, canonical_id = self.dedup.find(fingerprint)
+            a["canonical_id"] = canonical_id
+            article_id = self.store.add(a)
+            if article_id is not None and kind == "new":
+                self.dedup.add(article_id, fingerprint)
+                new.append((article_id, a))
+
+        pending = new + [(a["id"], a) for a in retry if a["id"] not in {article_id for article_id, _ in new}]
+        if pending and self.analyzer is not None:
+            # model inference is blocking; keep it off the event loop
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, self.analyzer, [a["text"] or a["summary"] or a["title"] for _, a in pending]
+            )
+            for (article_id, _), analysis in zip(pending, results):
+                # like /analyze, don't pin transient model failures: the article stays unanalyzed and is retried
+                if analysis.get("errors"):
+                    self._stats[source]["failed_analyses"] += 1
+                    continue
+                self.store.set_analysis(article_id, analysis)
+        if new and self.on_stored is not None:
+            self.on_stored([article_id for article_id, _ in new])
+        self._stats[source]["updated_articles"] += updated
+        return len(new) - updated
+
+    def _refresh(self, stored, a, fingerprint):
+        """Store a re-fetched article's changed entry; returns whether it needs analyzing again."""
+        if stored["exact_hash"] == fingerprint[0]:
+            # only the feed entry changed (e.g. its timestamp), the text is the same
+            self.store.update(stored["id"], {"entry_hash": a["entry_hash"]})
+            return False
+        # the old text no longer belongs to this article; later copies of it must not link here
+        self.dedup.remove(stored["id"])
+        # and its old analysis no longer describes it: until the new one is stored it counts as unanalyzed
+        self.store.set_analysis(stored["id"], None)
+        kind, canonical_id = self.dedup.find(fingerprint)
+        if kind != "new":
+            # the new text is a copy of another stored article, whose analysis it shows from now on
+            self.store.update(stored["id"], dict(a, canonical_id=canonical_id))
+            return False
+        self.store.update(stored["id"], dict(a, canonical_id=None))
+        self.dedup.add(stored["id"], fingerprint)
+        return True
+
+    async def _run_feed(self, source):
+        st = self._stats[source]
+        while True:
+            try:
+                st["new_articles"] += await self.poll_feed(source)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                st["errors"] += 1
+                st["last_error"] = str(e)
+                print("Ingestion failed for", source, e)
+            st["polls"] += 1
+            st["last_poll"] = time.time()
+            await asyncio.sleep(self.intervals[source])
+
+    def start(self):
+        """Schedule one polling task per feed on the running event loop."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run_feed(source)) for source in self.feeds]
+        return self._tasks
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.fetcher.aclose()
+
+    async def run_forever(self):
+        try:
+            await asyncio.gather(*self.start())
+        finally:
+            await self.stop()
+
+    def stats(self):
+        return {
+            "running": bool(self._tasks),
+            "articles": self.store.count(),
+            "intervals": self.intervals,
+            "dedup": self.dedup.stats(),
+            "feeds": {source: dict(st) for source, st in self._stats.items()},
+        }
+
+
+if __name__ == "__main__":
+    from src.api.main import analyze_texts
+
+    store = ArticleStore(os.getenv("ARTICLE_DB_PATH", "articles.db"))
+    scheduler = IngestScheduler(store, analyzer=analyze_texts)
+    try:
+        asyncio.run(scheduler.run_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,321 @@
+"""Asynchronous bulk analysis jobs.
+
+A job is a list of texts and/or article URLs submitted in one call. Jobs and
+their items live in SQLite, so queued work survives a restart. `JobRunner`
+workers claim items highest-priority first under a lease. An item whose
+worker died before finishing it is claimed again once its lease runs out,
+up to `max_attempts` times. Several processes can share one job database.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data.news_fetcher import fetch_article_urls
+from src.data.sqlite_conn import Reopenable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items (status, lease_until);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+# item states; "done" and "error" are final
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+
+class JobStore(Reopenable):
+    """SQLite store for jobs, their items and results."""
+
+    def __init__(self, path="jobs.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def create(self, items, priority=0):
+        """Queue a job of `(kind, input)` items ("text" or "url"); returns its id."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, priority, total, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, priority, len(items), time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, idx, kind, input, status) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, i, kind, value, QUEUED) for i, (kind, value) in enumerate(items)],
+            )
+            self._db.commit()
+        return job_id
+
+    def pending(self):
+        """Items not finished yet, across all jobs."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def claim(self, limit, lease=300.0, max_attempts=3):
+        """Lease up to `limit` runnable items, highest job priority first, then oldest job first.
+
+        Items whose lease ran out are runnable again; once they have been
+        tried `max_attempts` times they fail instead.
+        """
+        now = time.time()
+        with self._lock:
+            # the write lock makes the claim atomic across processes sharing the file
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._db.execute(
+                    "SELECT job_id, idx FROM job_items WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (RUNNING, now, max_attempts),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE job_items SET status = ?, error = ?, finished_at = ? WHERE job_id = ? AND idx = ?",
+                    [(ERROR, f"gave up after {max_attempts} attempts", now, j, i) for j, i in expired],
+                )
+                rows = self._db.execute(
+                    "SELECT i.job_id, i.idx, i.kind, i.input FROM job_items i JOIN jobs j ON j.id = i.job_id "
+                    "WHERE i.status = ? OR (i.status = ? AND i.lease_until < ?) "
+                    "ORDER BY j.priority DESC, j.created_at, i.idx LIMIT ?",
+                    (QUEUED, RUNNING, now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE job_items SET status = ?, lease_until = ?, attempts = attempts + 1, "
+                    "started_at = COALESCE(started_at, ?) WHERE job_id = ? AND idx = ?",
+                    [(RUNNING, now + lease, now, j, i) for j, i, _, _ in rows],
+                )
+                self._finish_jobs({j for j, _ in expired}, now)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return [{"job_id": j, "index": i, "kind": kind, "input": value} for j, i, kind, value in rows]
+
+    def finish(self, outcomes):
+        """Record `(job_id, index, result, error)` outcomes of claimed items."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE job_id = ? AND idx = ?",
+                [
+                    (ERROR if error is not None else DONE, None if result is None else json.dumps(result), error,
+                     now, job_id, index)
+                    for job_id, index, result, error in outcomes
+                ],
+            )
+            self._finish_jobs({o[0] for o in outcomes}, now)
+            self._db.commit()
+
+    def _finish_jobs(self, job_ids, now):
+        for job_id in job_ids:
+            self._db.execute(
+                "UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL AND NOT EXISTS "
+                "(SELECT 1 FROM job_items WHERE job_id = ? AND status IN (?, ?))",
+                (now, job_id, job_id, QUEUED, RUNNING),
+            )
+
+    def get(self, job_id, items=True):
+        with self._lock:
+            job = self._db.execute(
+                "SELECT priority, total, created_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            started = self._db.execute(
+                "SELECT MIN(started_at) FROM job_items WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT idx, kind, input, status, result, error FROM job_items WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall() if items else []
+
+        priority, total, created_at, finished_at = job
+        finished = counts.get(DONE, 0) + counts.get(ERROR, 0)
+        job = {
+            "id": job_id,
+            "status": "done" if finished_at else ("running" if started else "queued"),
+            "priority": priority,
+            "created_at": created_at,
+            "started_at": started,
+            "finished_at": finished_at,
+            "progress": {
+                "total": total,
+                "done": counts.get(DONE, 0),
+                "failed": counts.get(ERROR, 0),
+                "running": counts.get(RUNNING, 0),
+                "queued": counts.get(QUEUED, 0),
+                "fraction": finished / total if total else 1.0,
+            },
+        }
+        if items:
+            job["items"] = [
+                {
+                    "index": idx,
+                    "status": status,
+                    "url": value if kind == "url" else None,
+                    "result": json.loads(result) if result else None,
+                    "error": error,
+                }
+                for idx, kind, value, status, result, error in rows
+            ]
+        return job
+
+    def prune(self, older_than):
+        """Delete jobs that finished more than `older_than` seconds ago."""
+        cutoff = time.time() - older_than
+        with self._lock:
+            ids = [r[0] for r in self._db.execute("SELECT id FROM jobs WHERE finished_at < ?", (cutoff,))]
+            self._db.executemany("DELETE FROM job_items WHERE job_id = ?", [(i,) for i in ids])
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+            self._db.commit()
+        return len(ids)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    def __init__(self, store, analyzer, fetcher, workers=2, batch_size=8, poll_interval=1.0, lease=300.0,
+                 max_attempts=3, retention=7 * 86400):
+        """`analyzer(texts)` returns one analysis dict per text, like `IngestScheduler`'s.
+
+        `workers` batches run at once, each of up to `batch_size` items.
+        """
+        self.store = store
+        self.analyzer = analyzer
+        self.fetcher = fetcher
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._pool = None
+        self._tasks = []
+        self._wake = None
+        self._loop = None
+        self._last_prune = 0.0
+        self._stats = {"batches": 0, "items": 0, "failed": 0}
+
+    def notify(self):
+        """Wake idle workers now instead of at their next poll; safe to call from any thread."""
+        if self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run_batch(self, items):
+        outcomes, texts, analyzed = [], [], []
+        urls = [item for item in items if item["kind"] == "url"]
+        fetched = await fetch_article_urls(self.fetcher, [item["input"] for item in urls]) if urls else []
+        articles = {id(item): article for item, article in zip(urls, fetched)}
+        for item in items:
+            article = articles.get(id(item))
+            if isinstance(article, Exception):
+                outcomes.append((item["job_id"], item["index"], None, f"fetch failed: {article}"))
+                continue
+            text = item["input"] if article is None else (article["text"] or article["summary"] or article["title"])
+            if not (text or "").strip():
+                outcomes.append((item["job_id"], item["index"], None, "no article text"))
+                continue
+            texts.append(text)
+            analyzed.append((item, article))
+
+        if texts:
+            try:
+                # model inference is blocking; keep it off the event loop
+                results = await asyncio.get_running_loop().run_in_executor(self._pool, self.analyzer, texts)
+            except Exception as e:
+                results = [e] * len(texts)
+            for (item, article), result in zip(analyzed, results):
+                if isinstance(result, Exception):
+                    outcomes.append((item["job_id"], item["index"], None, str(result)))
+                    continue
+                if article is not None:
+                    result = dict(result, title=article["title"], url=article["url"])
+                outcomes.append((item["job_id"], item["index"], result, None))
+
+        await self._store_call(self.store.finish, outcomes)
+        self._stats["batches"] += 1
+        self._stats["items"] += len(outcomes)
+        self._stats["failed"] += sum(1 for o in outcomes if o[3] is not None)
+
+    async def _store_call(self, fn, *args):
+        # SQLite calls block (BEGIN IMMEDIATE waits on other processes); keep them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def _work(self):
+        while True:
+            self._wake.clear()
+            try:
+                items = await self._store_call(self.store.claim, self.batch_size, self.lease, self.max_attempts)
+                if items:
+                    await self.run_batch(items)
+                    continue
+                if time.time() - self._last_prune > 3600:
+                    self._last_prune = time.time()
+                    await self._store_call(self.store.prune, self.retention)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job batch failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the worker tasks on the running event loop."""
+        if not self._tasks and self.workers > 0:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jobs")
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        return self._tasks
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def stats(self):
+        return {"workers": len(self._tasks), "pending": self.store.pending(), **self._stats}
@@ -1,33 +1,78 @@
-from newspaper import Article
-import feedparser
+import asyncio
 from datetime import datetime
+from src.data.async_fetcher import fetcher_from_env
+from src.data.dedup import exact_hash
 
 RSS = [
     "http://feeds.bbci.co.uk/news/rss.xml",
     "https://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml"
 ]
 
-def fetch_once(max_per_feed=3):
+def entry_guid(e):
+    return e.get('id') or e.get('guid') or e.link
+
+def entry_hash(e):
+    # changes when the publisher edits the entry, without downloading the article to find out
+    return exact_hash(" ".join([e.get('title', ''), e.get('summary', ''), e.get('updated', '')]))
+
+def article_dict(a, url, guid=None, published=None):
+    return {
+        "guid": guid or url,
+        "title": a.title,
+        "text": a.text,
+        "summary": getattr(a, 'summary', '') or a.meta_description or '',
+        "url": url,
+        "published": published or str(datetime.utcnow())
+    }
+
+async def fetch_feed_articles(fetcher, feed, max_per_feed=3, skip=None, feed_cache=None):
+    """Download and parse the newest articles of one feed.
+
+    `skip(guid, url, entry_hash)` filters out entries that were already
+    processed and haven't changed since, so they are never downloaded.
+    """
+    d = await (feed_cache.get(feed) if feed_cache else fetcher.fetch_feed(feed))
+    entries = [e for e in d.entries[:max_per_feed] if not (skip and skip(entry_guid(e), e.link, entry_hash(e)))]
+
+    # download + parse every article concurrently
+    downloaded = await fetcher.fetch_articles([e.link for e in entries])
     articles = []
-    for feed in RSS:
-        d = feedparser.parse(feed)
-        for e in d.entries[:max_per_feed]:
-            url = e.link
-            a = Article(url)
-            try:
-                a.download(); a.parse(); a.nlp()
-            except Exception as exc:
-                print("Failed to fetch", url, exc)
-                continue
-            articles.append({
-                "title": a.title,
-                "text": a.text,
-                "summary": getattr(a, 'summary', '') or a.meta_description or '',
-                "url": url,
-                "published": e.get('published', str(datetime.utcnow()))
-            })
+    for e, a in zip(entries, downloaded):
+        url = e.link
+        if isinstance(a, Exception):
+            print("Failed to fetch", url, a)
+            continue
+        article = article_dict(a, url, entry_guid(e), e.get('published'))
+        article["entry_hash"] = entry_hash(e)
+        articles.append(article)
     return articles
 
+async def fetch_article_urls(fetcher, urls, nlp=False):
+    """Download and parse articles by URL; a failed download comes back as its exception."""
+    downloaded = await fetcher.fetch_articles(urls, nlp=nlp)
+    return [a if isinstance(a, Exception) else article_dict(a, url) for url, a in zip(urls, downloaded)]
+
+async def fetch_once_async(max_per_feed=3, feeds=RSS, fetcher=None):
+    own_fetcher = fetcher is None
+    fetcher = fetcher or fetcher_from_env()
+    try:
+        per_feed = await asyncio.gather(
+            *(fetch_feed_articles(fetcher, feed, max_per_feed) for feed in feeds), return_exceptions=True
+        )
+        articles = []
+        for feed, result in zip(feeds, per_feed):
+            if isinstance(result, Exception):
+                print("Failed to fetch feed", feed, result)
+                continue
+            articles.extend(result)
+        return articles
+    finally:
+        if own_fetcher:
+            await fetcher.aclose()
+
+def fetch_once(max_per_feed=3):
+    return asyncio.run(fetch_once_async(max_per_feed))
+
 if __name__ == "__main__":
     arts = fetch_once()
     for a in arts:
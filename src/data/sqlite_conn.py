@@ -0,0 +1,13 @@
+"""Per-process SQLite connections for the stores that hold one."""
+import threading
+
+
+class Reopenable:
+    """Mixin for classes whose `_connect()` sets `self._db`, used under `self._lock`."""
+
+    def reopen(self):
+        # SQLite connections must not be shared across fork(), and a lock held by another
+        # thread at fork time is never released in the child: each worker opens its own
+        self._lock = threading.Lock()
+        if self._db is not None:
+            self._connect()
@@ -0,0 +1,416 @@
+import json
+import sqlite3
+import threading
+import time
+
+from src.data.sqlite_conn import Reopenable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guid TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    source TEXT,
+    title TEXT,
+    summary TEXT,
+    text TEXT,
+    published TEXT,
+    fetched_at REAL NOT NULL,
+    analysis TEXT,
+    analyzed_at REAL,
+    canonical_id INTEGER,
+    exact_hash TEXT,
+    simhash INTEGER,
+    entry_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS idx_articles_fetched ON articles (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, fetched_at);
+"""
+
+# running corpus-level entity frequencies, updated as analyses are stored
+ENTITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entity_counts (
+    entity_group TEXT NOT NULL,
+    key TEXT NOT NULL,
+    word TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    articles INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (entity_group, key)
+);
+CREATE INDEX IF NOT EXISTS idx_entity_counts_articles ON entity_counts (articles DESC, mentions DESC);
+"""
+
+# hourly rollups per source of analyzed articles' categories and entities, so trends never scan articles
+TREND_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trend_categories (
+    bucket INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    label TEXT NOT NULL,
+    articles INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    PRIMARY KEY (bucket, source, label)
+);
+CREATE TABLE IF NOT EXISTS trend_entities (
+    bucket INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    entity_group TEXT NOT NULL,
+    key TEXT NOT NULL,
+    word TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    articles INTEGER NOT NULL,
+    PRIMARY KEY (bucket, source, entity_group, key)
+);
+"""
+TREND_BUCKET_SECONDS = 3600
+
+# columns added after the first release of the store
+MIGRATIONS = {
+    "canonical_id": "ALTER TABLE articles ADD COLUMN canonical_id INTEGER",
+    "exact_hash": "ALTER TABLE articles ADD COLUMN exact_hash TEXT",
+    "simhash": "ALTER TABLE articles ADD COLUMN simhash INTEGER",
+    "entry_hash": "ALTER TABLE articles ADD COLUMN entry_hash TEXT",
+}
+
+# what a re-fetched article may change
+UPDATABLE = ("title", "summary", "text", "published", "canonical_id", "exact_hash", "simhash", "entry_hash")
+
+COLUMNS = ["id", "guid", "url", "source", "title", "summary", "text", "published", "fetched_at", "analysis",
+           "analyzed_at", "canonical_id"]
+
+# duplicates have no analysis of their own and show their canonical article's
+SELECT = "SELECT {} FROM articles a LEFT JOIN articles c ON c.id = a.canonical_id".format(
+    ", ".join("COALESCE(a.analysis, c.analysis)" if col == "analysis" else f"a.{col}" for col in COLUMNS)
+)
+
+
+class ArticleStore(Reopenable):
+    """SQLite store for ingested articles and their precomputed analysis."""
+
+    def __init__(self, path="articles.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+        self._db.executescript(SCHEMA)
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(articles)")}
+        for column, ddl in MIGRATIONS.items():
+            if column not in existing:
+                self._db.execute(ddl)
+        backfill = not self._has_table("entity_counts")
+        self._db.executescript(ENTITY_SCHEMA)
+        if backfill:
+            # stores created before entity counting: count what is already analyzed, once
+            for (analysis,) in self._db.execute("SELECT analysis FROM articles WHERE analysis IS NOT NULL").fetchall():
+                self._count_entities(json.loads(analysis).get("entities") or [])
+        backfill = not self._has_table("trend_categories")
+        self._db.executescript(TREND_SCHEMA)
+        if backfill:
+            rows = self._db.execute(
+                "SELECT analysis, source, fetched_at FROM articles WHERE analysis IS NOT NULL"
+            ).fetchall()
+            for analysis, source, fetched_at in rows:
+                self._roll_up(json.loads(analysis), source, fetched_at)
+        self._db.commit()
+
+    def _has_table(self, name):
+        return self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+    def _row(self, row):
+        article = dict(zip(COLUMNS, row))
+        article["analysis"] = json.loads(article["analysis"]) if article["analysis"] else None
+        article["link"] = article["url"]  # same key the /fetch_sample payload uses
+        return article
+
+    def has(self, guid, url=None, entry_hash=None):
+        """Whether the article is stored; with `entry_hash`, only if its feed entry is unchanged too."""
+        found = self.find(guid, url)
+        return found is not None and (entry_hash is None or found["entry_hash"] == entry_hash)
+
+    def find(self, guid, url=None):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, canonical_id, exact_hash, entry_hash FROM articles WHERE guid = ? OR url = ? LIMIT 1",
+                (guid, url or guid),
+            ).fetchone()
+        return dict(zip(("id", "canonical_id", "exact_hash", "entry_hash"), row)) if row else None
+
+    def update(self, article_id, fields):
+        """Overwrite the `UPDATABLE` fields of a stored article, e.g. after it changed at its URL."""
+        fields = {k: v for k, v in fields.items() if k in UPDATABLE}
+        if not fields:
+            return
+        with self._lock:
+            self._db.execute(
+                "UPDATE articles SET {} WHERE id = ?".format(", ".join(f"{k} = ?" for k in fields)),
+                [*fields.values(), article_id],
+            )
+            self._db.commit()
+
+    def add(self, article):
+        """Insert an article; returns its id, or None if the guid/url is already stored."""
+        guid = article.get("guid") or article["url"]
+        with self._lock:
+            if self._db.execute(
+                "SELECT 1 FROM articles WHERE guid = ? OR url = ? LIMIT 1", (guid, article["url"])
+            ).fetchone():
+                return None
+            cur = self._db.execute(
+                "INSERT INTO articles (guid, url, source, title, summary, text, published, fetched_at, "
+                "canonical_id, exact_hash, simhash, entry_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    guid,
+                    article["url"],
+                    article.get("source"),
+                    article.get("title"),
+                    article.get("summary"),
+                    article.get("text"),
+                    article.get("published"),
+                    time.time(),
+                    article.get("canonical_id"),
+                    article.get("exact_hash"),
+                    article.get("simhash"),
+                    article.get("entry_hash"),
+                ),
+            )
+            self._db.commit()
+            return cur.lastrowid
+
+    def set_analysis(self, article_id, analysis):
+        """Store (or with None, clear) an article's analysis; entity counts and trends follow."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis, source, fetched_at FROM articles WHERE id = ?", (article_id,)
+            ).fetchone()
+            if row is None:
+                return
+            previous, source, fetched_at = row
+            self._db.execute(
+                "UPDATE articles SET analysis = ?, analyzed_at = ? WHERE id = ?",
+                (None, None, article_id) if analysis is None else (json.dumps(analysis), time.time(), article_id),
+            )
+            # an article is counted once: a re-analysis replaces its earlier contribution
+            if previous is not None:
+                previous = json.loads(previous)
+                self._count_entities(previous.get("entities") or [], sign=-1)
+                self._roll_up(previous, source, fetched_at, sign=-1)
+            if analysis is not None:
+                self._count_entities(analysis.get("entities") or [])
+                self._roll_up(analysis, source, fetched_at)
+            self._db.commit()
+
+    @staticmethod
+    def _entity_counts(entities):
+        # (group, case-folded word) -> (word as first seen, mentions)
+        counts = {}
+        for e in entities:
+            if e.get("word") and e.get("entity_group") not in (None, "Error"):
+                key = (e["entity_group"], e["word"].casefold())
+                word, mentions = counts.get(key, (e["word"], 0))
+                counts[key] = (word, mentions + int(e.get("mentions", 1)))
+        return counts
+
+    def _count_entities(self, entities, sign=1):
+        # sign -1 takes an article's entities back out, and drops entities no article mentions any more
+        now = time.time() if sign > 0 else 0.0
+        counts = self._entity_counts(entities)
+        rows = [(group, key, word, sign * mentions, sign, now) for (group, key), (word, mentions) in counts.items()]
+        self._db.executemany(
+            "INSERT INTO entity_counts (entity_group, key, word, mentions, articles, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (entity_group, key) DO UPDATE SET "
+            "mentions = mentions + excluded.mentions, articles = articles + excluded.articles, "
+            "last_seen = MAX(last_seen, excluded.last_seen)",
+            rows,
+        )
+        if sign < 0:
+            self._db.execute("DELETE FROM entity_counts WHERE articles <= 0")
+
+    def _roll_up(self, analysis, source, fetched_at, sign=1):
+        bucket = int(fetched_at // TREND_BUCKET_SECONDS) * TREND_BUCKET_SECONDS
+        source = source or "unknown"
+        prediction = analysis.get("prediction") or {}
+        if prediction.get("label"):
+            self._db.execute(
+                "INSERT INTO trend_categories (bucket, source, label, articles, confidence) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (bucket, source, label) DO UPDATE SET "
+                "articles = articles + excluded.articles, confidence = confidence + excluded.confidence",
+                (bucket, source, prediction["label"], sign, sign * float(max(prediction.get("probs") or [0.0]))),
+            )
+        counts = self._entity_counts(analysis.get("entities") or [])
+        self._db.executemany(
+            "INSERT INTO trend_entities (bucket, source, entity_group, key, word, mentions, articles) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (bucket, source, entity_group, key) DO UPDATE SET "
+            "mentions = mentions + excluded.mentions, articles = articles + excluded.articles",
+            [(bucket, source, group, key, word, sign * mentions, sign)
+             for (group, key), (word, mentions) in counts.items()],
+        )
+        if sign < 0:
+            self._db.execute("DELETE FROM trend_categories WHERE bucket = ? AND source = ? AND articles <= 0",
+                             (bucket, source))
+            self._db.execute("DELETE FROM trend_entities WHERE bucket = ? AND source = ? AND articles <= 0",
+                             (bucket, source))
+
+    def trends(self, since, until=None, bucket=TREND_BUCKET_SECONDS, source=None, by_source=False, entities=5):
+        """Category counts, mean confidence and top entities of the articles fetched in [since, until).
+
+        Read from the hourly rollups, merged into buckets of `bucket` seconds
+        (a multiple of an hour), per source when `by_source`.
+        """
+        bucket = max(bucket // TREND_BUCKET_SECONDS, 1) * TREND_BUCKET_SECONDS
+        since = int(since // bucket) * bucket
+        until = int(until if until is not None else time.time() + bucket)
+        where, params = "bucket >= ? AND bucket < ?", [since, until]
+        if source:
+            where += " AND source = ?"
+            params.append(source)
+        group = "source" if by_source else "NULL"
+        bucketed = f"(bucket / {bucket}) * {bucket}"
+
+        def top(partition, group, limit):
+            # the `limit` entities in most articles per (partition, group)
+            return self._db.execute(
+                f"SELECT b, s, entity_group, word, mentions, articles FROM ("
+                f"SELECT {partition} AS b, {group} AS s, entity_group, MAX(word) AS word, "
+                f"SUM(mentions) AS mentions, SUM(articles) AS articles, ROW_NUMBER() OVER ("
+                f"PARTITION BY {partition}, {group} ORDER BY SUM(articles) DESC, SUM(mentions) DESC) AS rank "
+                f"FROM trend_entities WHERE {where} GROUP BY {partition}, {group}, entity_group, key"
+                f") WHERE rank <= ? ORDER BY b, s, rank",
+                params + [limit],
+            ).fetchall()
+
+        with self._lock:
+            categories = self._db.execute(
+                f"SELECT {bucketed} AS b, {group} AS s, label, SUM(articles), SUM(confidence) "
+                f"FROM trend_categories WHERE {where} GROUP BY b, s, label ORDER BY b, s",
+                params,
+            ).fetchall()
+            sources = self._db.execute(
+                "SELECT source, SUM(articles) FROM trend_categories WHERE bucket >= ? AND bucket < ? "
+                "GROUP BY source ORDER BY SUM(articles) DESC",
+                (since, until),
+            ).fetchall()
+            bucket_entities = top(bucketed, group, entities) if entities else []
+            total_entities = top("NULL", "NULL", entities) if entities else []
+
+        series, totals = {}, {}
+        for b, s, label, count, confidence in categories:
+            point = series.get((b, s))
+            if point is None:
+                point = series[(b, s)] = {"start": b, "articles": 0, "categories": {}, "entities": []}
+                if by_source:
+                    point["source"] = s
+            point["articles"] += count
+            point["categories"][label] = {"articles": count, "mean_confidence": round(confidence / count, 4)}
+            total = totals.setdefault(label, [0, 0.0])
+            total[0] += count
+            total[1] += confidence
+        for b, s, entity_group, word, mentions, count in bucket_entities:
+            if (b, s) in series:
+                series[(b, s)]["entities"].append(
+                    {"entity_group": entity_group, "word": word, "mentions": mentions, "articles": count}
+                )
+        return {
+            "bucket_seconds": bucket,
+            "since": since,
+            "until": until,
+            "sources": [{"source": s, "articles": n} for s, n in sources],
+            "series": list(series.values()),
+            "totals": {
+                "articles": sum(n for n, _ in totals.values()),
+                "categories": {
+                    label: {"articles": n, "mean_confidence": round(confidence / n, 4)}
+                    for label, (n, confidence) in totals.items()
+                },
+                "entities": [
+                    {"entity_group": g, "word": w, "mentions": m, "articles": n}
+                    for _, _, g, w, m, n in total_entities
+                ],
+            },
+        }
+
+    def top_entities(self, limit=20, group=None):
+        query = "SELECT entity_group, word, mentions, articles FROM entity_counts"
+        params = []
+        if group:
+            query += " WHERE entity_group = ?"
+            params.append(group)
+        query += " ORDER BY articles DESC, mentions DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [{"entity_group": g, "word": w, "mentions": m, "articles": a} for g, w, m, a in rows]
+
+    def get(self, article_id):
+        with self._lock:
+            row = self._db.execute(SELECT + " WHERE a.id = ?", (article_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def recent(self, limit=20, offset=0, source=None):
+        query = SELECT
+        params = []
+        if source:
+            query += " WHERE a.source = ?"
+            params.append(source)
+        query += " ORDER BY a.fetched_at DESC, a.id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def get_many(self, ids):
+        """Articles by id, in the order of `ids`; unknown ids are left out."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                SELECT + " WHERE a.id IN ({})".format(",".join("?" * len(ids))), ids
+            ).fetchall()
+        by_id = {row[0]: self._row(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def canonical_after(self, last_id, limit=256):
+        """Canonical (non-duplicate) articles with an id above `last_id`, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                SELECT + " WHERE a.id > ? AND a.canonical_id IS NULL ORDER BY a.id LIMIT ?", (last_id, limit)
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def unanalyzed(self, source=None, limit=50):
+        """Canonical articles still without an analysis, e.g. because the models failed on them, oldest first."""
+        query = SELECT + " WHERE a.analysis IS NULL AND a.canonical_id IS NULL"
+        params = []
+        if source:
+            query += " AND a.source = ?"
+            params.append(source)
+        query += " ORDER BY a.id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def max_id(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM articles").fetchone()[0]
+
+    def fingerprints(self):
+        """(id, exact_hash, simhash) of every canonical article that has been fingerprinted."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, exact_hash, simhash FROM articles WHERE canonical_id IS NULL AND exact_hash IS NOT NULL"
+            ).fetchall()
+
+    def count(self, source=None):
+        with self._lock:
+            if source:
+                return self._db.execute("SELECT COUNT(*) FROM articles WHERE source = ?", (source,)).fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
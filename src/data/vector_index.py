@@ -0,0 +1,230 @@
+"""Embedding index for semantic search and related-article lookups.
+
+Vectors are unit-normalized float32 rows in a memory-mapped file, so the
+index survives restarts and is paged in by the OS rather than loaded. Queries
+are a brute-force matrix product over all rows (a few ms for 100k x 384), or
+go through an hnswlib graph when hnswlib is installed and `backend="hnsw"`.
+
+Several processes (e.g. gunicorn workers) can share one index directory:
+writers take a file lock, and every instance picks up rows appended by the
+others before it searches.
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # optional; brute force needs nothing but numpy
+    hnswlib = None
+
+MIN_CAPACITY = 1024
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    def __init__(self, path, dim, backend="brute"):
+        if backend == "hnsw" and hnswlib is None:
+            raise ValueError("the hnsw index backend needs hnswlib installed")
+        if backend not in ("brute", "hnsw"):
+            raise ValueError(f"unknown index backend '{backend}', expected 'brute' or 'hnsw'")
+        self.path = path
+        self.backend = backend
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self.dim = int(dim)
+        self._meta = {"dim": self.dim, "count": 0, "capacity": 0, "cursor": 0}
+        self._meta_mtime = None
+        self._rows = {}
+        self._hnsw = None
+        self._map(0)
+        self._refresh()
+        if backend == "hnsw":
+            self._load_hnsw()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _map(self, capacity):
+        for name, dtype, width in (("vectors.f32", np.float32, self.dim), ("ids.i64", np.int64, 1)):
+            size = capacity * width * np.dtype(dtype).itemsize
+            with open(self._file(name), "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        shape = (max(capacity, 1), self.dim)
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=shape) \
+            if capacity else np.zeros(shape, dtype=np.float32)
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(max(capacity, 1),)) \
+            if capacity else np.zeros(1, dtype=np.int64)
+        self._meta["capacity"] = capacity
+
+    def _load_hnsw(self):
+        # the graph is saved next to the vectors; rows appended since the last save are added on top
+        graph = hnswlib.Index(space="ip", dim=self.dim)
+        capacity = max(self._meta["capacity"], MIN_CAPACITY)
+        if os.path.exists(self._file("hnsw.bin")):
+            graph.load_index(self._file("hnsw.bin"), max_elements=capacity)
+        else:
+            graph.init_index(max_elements=capacity, ef_construction=200, M=16)
+        graph.set_ef(int(os.getenv("HNSW_EF", "128")))
+        self._hnsw = graph
+        self._hnsw_rows = self._hnsw_saved = min(graph.get_current_count(), self._meta["count"])
+        self._sync_hnsw()
+
+    def _sync_hnsw(self):
+        count = self._meta["count"]
+        if self._hnsw is None or count <= self._hnsw_rows:
+            return
+        if count > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(max(count, self._meta["capacity"]))
+        self._hnsw.add_items(self._vectors[self._hnsw_rows:count], self._ids[self._hnsw_rows:count])
+        self._hnsw_rows = count
+
+    def save(self):
+        """Write the hnsw graph to disk so reopening the index doesn't rebuild it."""
+        with self._lock:
+            if self._hnsw is not None and self._hnsw_rows != self._hnsw_saved:
+                self._hnsw.save_index(self._file("hnsw.bin.tmp"))
+                os.replace(self._file("hnsw.bin.tmp"), self._file("hnsw.bin"))
+                self._hnsw_saved = self._hnsw_rows
+
+    def _refresh(self):
+        # pick up rows appended by other processes since meta.json was last read
+        try:
+            mtime = os.stat(self._file("meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        with open(self._file("meta.json")) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"index at {self.path} has dim {meta['dim']}, the embedder produces {self.dim}")
+        known = self._meta["count"]
+        if meta["capacity"] != self._meta["capacity"]:
+            self._map(meta["capacity"])
+        self._meta.update(meta)
+        count = self._meta["count"]
+        for row in range(known, count):
+            self._rows[int(self._ids[row])] = row
+        self._sync_hnsw()
+        self._meta_mtime = mtime
+
+    @contextmanager
+    def _writing(self):
+        with self._lock, open(self._file("lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                yield
+                self._flush()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save_meta(self):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self._file("meta.json"))
+        self._meta_mtime = os.stat(self._file("meta.json")).st_mtime_ns
+
+    def __len__(self):
+        return self._meta["count"]
+
+    def __contains__(self, item_id):
+        return int(item_id) in self._rows
+
+    @property
+    def cursor(self):
+        """Highest source id already considered for indexing (indexed or skipped)."""
+        with self._lock:
+            self._refresh()
+            return self._meta["cursor"]
+
+    def add(self, ids, vectors, cursor=None):
+        """Insert or replace vectors by id; `cursor` records how far the source has been read."""
+        vectors = normalize(vectors).reshape(-1, self.dim)
+        with self._writing():
+            count = self._meta["count"]
+            new = len({int(i) for i in ids if int(i) not in self._rows})
+            if count + new > self._meta["capacity"]:
+                self._map(max(MIN_CAPACITY, 2 * self._meta["capacity"], count + new))
+            for item_id, vector in zip(ids, vectors):
+                item_id = int(item_id)
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = self._rows[item_id] = self._meta["count"]
+                    self._ids[row] = item_id
+                    self._meta["count"] += 1
+                self._vectors[row] = vector
+            if self._hnsw is not None:
+                # replaced rows are updated in place; appended rows are picked up by the sync
+                replaced = [(i, v) for i, v in zip(ids, vectors) if self._rows[int(i)] < self._hnsw_rows]
+                if replaced:
+                    self._hnsw.add_items(np.stack([v for _, v in replaced]), [int(i) for i, _ in replaced])
+                self._sync_hnsw()
+            if cursor is not None:
+                self._meta["cursor"] = max(self._meta["cursor"], int(cursor))
+
+    def skip_to(self, cursor):
+        # an unchanged cursor needs no write, and no rewrite of meta.json for every other process to reload
+        if int(cursor) <= self.cursor:
+            return
+        with self._writing():
+            self._meta["cursor"] = max(self._meta["cursor"], int(cursor))
+
+    def _flush(self):
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+            self._ids.flush()
+        self._save_meta()
+
+    def vector(self, item_id):
+        with self._lock:
+            self._refresh()
+            row = self._rows.get(int(item_id))
+            return None if row is None else np.array(self._vectors[row])
+
+    def search(self, vector, k=10, exclude=()):
+        """Ids and cosine similarities of the `k` nearest vectors, best first."""
+        query = normalize(vector).reshape(self.dim)
+        exclude = {int(i) for i in exclude}
+        with self._lock:
+            self._refresh()
+            count = self._meta["count"]
+            vectors, ids, graph = self._vectors, self._ids, self._hnsw
+            want = min(k + len(exclude), count)
+            if count and graph is not None:
+                # add() and resize_index() change the graph in place; query it under the same lock
+                labels, distances = graph.knn_query(query, k=want)
+        if not count:
+            return []
+
+        if graph is not None:
+            hits = zip(labels[0].tolist(), (1.0 - distances[0]).tolist())
+        else:
+            scores = vectors[:count] @ query
+            top = np.argpartition(-scores, want - 1)[:want] if want < count else np.arange(count)
+            top = top[np.argsort(-scores[top])]
+            hits = zip(ids[top].tolist(), scores[top].tolist())
+        return [(int(i), float(s)) for i, s in hits if int(i) not in exclude][:k]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "backend": self.backend,
+            "dim": self.dim,
+            "count": self._meta["count"],
+            "capacity": self._meta["capacity"],
+            "cursor": self._meta["cursor"],
+        }
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+# the API reads its configuration at import time; never reach the Hugging Face hub from tests
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+
+@pytest.fixture(scope="session")
+def main(tmp_path_factory):
+    """The API module with the stub models from benchmarks/stub_models.py installed."""
+    os.environ.setdefault("JOB_DB_PATH", str(tmp_path_factory.mktemp("jobs") / "jobs.db"))
+    from benchmarks import stub_models
+    from src.api import main
+
+    stub_models.install(main.registry, scale=0.01)
+    return main
+
+
+@pytest.fixture
+def client(main):
+    from fastapi.testclient import TestClient
+
+    main.result_cache.invalidate(None)
+    with TestClient(main.app) as c:
+        yield c
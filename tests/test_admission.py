@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from src.api import admission
+
+
+def test_full_queue_is_shed_with_429():
+    async def run():
+        limiter = admission.Limiter("t", concurrency=1, queue=0, queue_timeout=1)
+        assert await limiter.acquire() is False
+        with pytest.raises(admission.Rejected) as e:
+            await limiter.acquire()
+        limiter.release()
+        return e.value
+
+    assert asyncio.run(run()).status_code == 429
+
+
+def test_queue_wait_times_out_with_503():
+    async def run():
+        limiter = admission.Limiter("t", concurrency=1, queue=1, queue_timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(admission.Rejected) as e:
+            await limiter.acquire()
+        return e.value, limiter.waiting
+
+    rejected, waiting = asyncio.run(run())
+    assert rejected.status_code == 503 and waiting == 0
+
+
+def test_requests_past_degrade_at_are_degraded():
+    async def run():
+        limiter = admission.Limiter("t", concurrency=3, queue=0, queue_timeout=1, degrade_at=1)
+        return [await limiter.acquire() for _ in range(3)]
+
+    assert asyncio.run(run()) == [False, True, True]
+
+
+def test_slot_is_released_when_client_disconnects_before_the_body():
+    async def body():
+        yield b"never read"
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def run():
+        limiter = admission.Limiter("t", concurrency=1, queue=0, queue_timeout=1)
+        await limiter.acquire()
+        with pytest.raises(ClientDisconnect):
+            await limiter.hold(StreamingResponse(body()))({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        # the slot is free again, so the next request is admitted at once
+        assert await asyncio.wait_for(limiter.acquire(), 0.1) is False
+        return limiter.active
+
+    assert asyncio.run(run()) == 1
+
+
+def test_streamed_analysis_gives_its_slot_back(client, main):
+    with client.stream("POST", "/analyze_stream", json={"text": "Markets rallied on Monday."}) as r:
+        assert r.status_code == 200
+        next(r.iter_lines())  # stop reading after the first stage
+    assert main.analyze_limiter.active == 0
+
+
+def test_degraded_batch_fails_only_the_bad_item(main, monkeypatch):
+    summarize = main.summarize_routed
+
+    def flaky(texts, quality=None, profile=None):
+        if any("boom" in t for t in texts):
+            raise RuntimeError("summarizer crashed")
+        return summarize(texts, quality, profile)
+
+    monkeypatch.setattr(main, "DEGRADED_SUMMARY", "extractive")
+    monkeypatch.setattr(main, "summarize_routed", flaky)
+    main.result_cache.invalidate(None)
+    good, bad = main.analyze_texts(["Bond yields fell on Tuesday.", "boom goes the input"], degraded=True)
+    assert good["degraded"] == ["summary"] and good["summary"]
+    assert "summarizer crashed" in bad["errors"]["summary"]
+    assert bad["prediction"] is not None
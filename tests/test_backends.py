@@ -0,0 +1,26 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+from src.api import backends
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="unknown classifier backend"):
+        backends.check_backend("tensorrt")
+
+
+def test_missing_onnx_packages_fail_at_startup(monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util, "find_spec", lambda name, *a: None if name == "onnxruntime" else find_spec(name, *a)
+    )
+    with pytest.raises(ValueError, match="needs onnxruntime installed"):
+        backends.check_backend("onnx-int8")
+    backends.check_backend("torch")
+
+
+def test_unbucket_restores_input_order():
+    parts = [([2, 0], np.array([[2.0], [0.0]])), ([1], np.array([[1.0]]))]
+    assert backends.unbucket(parts, 3).ravel().tolist() == [0.0, 1.0, 2.0]
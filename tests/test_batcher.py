@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from src.api.batcher import MicroBatcher
+
+
+def test_items_queued_while_a_batch_runs_share_the_next_batch():
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def fn(items):
+        calls.append(list(items))
+        started.set()
+        release.wait(5)
+        return [i * 10 for i in items]
+
+    batcher = MicroBatcher(fn, max_batch_size=3, max_wait_ms=0, name="test")
+    first = batcher.submit_async(0)
+    assert started.wait(5)
+    futures = [batcher.submit_async(i) for i in range(1, 6)]
+    release.set()
+
+    assert first.result(5) == 0
+    assert [f.result(5) for f in futures] == [10, 20, 30, 40, 50]
+    assert calls == [[0], [1, 2, 3], [4, 5]]
+    stats = batcher.stats()
+    assert (stats["batches"], stats["items"], stats["errors"]) == (3, 6, 0)
+    assert stats["batch_size_hist"] == {"1": 1, "2": 1, "3": 1}
+    assert stats["max_queue_depth"] >= 5
+
+
+def test_wait_window_coalesces_concurrent_submits():
+    batcher = MicroBatcher(lambda items: [len(items)] * len(items), max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit_async(i) for i in range(4)]
+    assert [f.result(5) for f in futures] == [4, 4, 4, 4]
+
+
+def test_batch_failure_reaches_every_caller():
+    def fn(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(fn, max_wait_ms=0)
+    with pytest.raises(ValueError, match="boom"):
+        batcher.submit("a", timeout=5)
+    assert batcher.stats()["errors"] == 1
+
+
+def test_wrong_number_of_results_is_an_error():
+    batcher = MicroBatcher(lambda items: [], max_wait_ms=0, name="short")
+    with pytest.raises(RuntimeError, match="short: expected 1 results, got 0"):
+        batcher.submit("a", timeout=5)
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from src.api import cache as cache_module
+from src.api.cache import ResultCache, content_key
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=clock))
+    return ResultCache(**kwargs), clock
+
+
+def test_lru_evicts_least_recently_used(monkeypatch):
+    cache, _ = make_cache(monkeypatch, max_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = make_cache(monkeypatch, ttl=10)
+    cache.set("a", 1)
+    clock.now += 10
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_a_new_instance(monkeypatch, tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache, _ = make_cache(monkeypatch, db_path=path)
+    cache.set("a", {"summary": "s"})
+    again = ResultCache(db_path=path)
+    assert again.get("a") == {"summary": "s"}
+    assert again.stats()["disk_hits"] == 1
+    assert again.invalidate("a") == 1
+    assert ResultCache(db_path=path).get("a") is None
+
+
+def test_disk_tier_sweeps_expired_rows(monkeypatch, tmp_path):
+    cache, clock = make_cache(monkeypatch, ttl=10, db_path=str(tmp_path / "cache.db"), prune_interval=5)
+    for i in range(3):
+        cache.set(f"old{i}", i)
+    clock.now += 20
+    cache.set("new", 1)  # past the prune interval: the expired rows go without being read
+    assert cache.stats()["disk_items"] == 1
+    assert cache.stats()["expirations"] == 3
+
+
+def test_disk_tier_is_capped(monkeypatch, tmp_path):
+    cache, clock = make_cache(monkeypatch, ttl=0, db_path=str(tmp_path / "cache.db"), max_disk_items=3,
+                              prune_interval=0)
+    for i in range(5):
+        clock.now += 1
+        cache.set(f"k{i}", i)
+    cache._mem.clear()  # read from disk only
+    assert cache.stats()["disk_items"] == 3
+    assert [cache.get(f"k{i}") for i in range(5)] == [None, None, 2, 3, 4]
+
+
+def test_reopen_gives_a_fresh_connection_and_lock(monkeypatch, tmp_path):
+    cache, _ = make_cache(monkeypatch, db_path=str(tmp_path / "cache.db"))
+    cache.set("k", 1)
+    db, lock = cache._db, cache._lock
+    cache.reopen()
+    assert cache._db is not db and cache._lock is not lock
+    cache._mem.clear()
+    assert cache.get("k") == 1
+
+    memory_only, _ = make_cache(monkeypatch)
+    memory_only.reopen()
+    assert memory_only._db is None
+
+
+def test_content_key_ignores_markup_and_whitespace():
+    assert content_key("<p>Fish &amp; chips</p>", "r1") == content_key("Fish  & chips", "r1")
+    assert content_key("Fish & chips", "r1") != content_key("Fish & chips", "r2")
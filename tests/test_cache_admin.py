@@ -0,0 +1,26 @@
+from src.api.cache import content_key
+
+TEXT = "The council approved the new transit budget on Wednesday."
+
+
+def test_invalidate_text_drops_every_quality(client):
+    for quality in (None, "fast", "best"):
+        assert client.post("/analyze", json={"text": TEXT, "quality": quality}).headers["X-Cache"] == "MISS"
+        assert client.post("/analyze", json={"text": TEXT, "quality": quality}).headers["X-Cache"] == "HIT"
+
+    assert client.delete("/admin/cache", params={"text": TEXT}).json() == {"removed": 3}
+    for quality in (None, "fast", "best"):
+        assert client.post("/analyze", json={"text": TEXT, "quality": quality}).headers["X-Cache"] == "MISS"
+
+
+def test_invalidate_text_drops_every_profile(client, main, monkeypatch):
+    monkeypatch.setattr(main, "LOADED_PROFILES", ["quality", "fast"])
+    monkeypatch.setattr(main, "PROFILE_REVISIONS", {"quality": "rev-q", "fast": "rev-f"})
+    keys = [content_key(TEXT, main.cache_revision(q, p)) for p in ("quality", "fast") for q in (None, "fast", "best")]
+    for key in keys:
+        main.result_cache.set(key, {"summary": "cached"})
+    main.result_cache.set(content_key("another article", "rev-f"), {"summary": "kept"})
+
+    assert client.delete("/admin/cache", params={"text": TEXT}).json() == {"removed": len(keys)}
+    assert all(main.result_cache.get(k) is None for k in keys)
+    assert main.result_cache.get(content_key("another article", "rev-f")) is not None
@@ -0,0 +1,43 @@
+import numpy as np
+
+from benchmarks.stub_models import StubTokenizer
+from src.api.chunking import chunk_text, pool_logits, split_sentences
+
+TOKENIZER = StubTokenizer()
+
+
+def test_sentences_split_on_terminal_punctuation_only():
+    text = 'Rates rose 3.5 percent. "Is that high?" he asked! Prices fell'
+    assert split_sentences(text) == ["Rates rose 3.5 percent.", '"Is that high?"', "he asked!", "Prices fell"]
+
+
+def test_text_that_fits_is_one_unchanged_chunk():
+    text = "One two three.  Four five."
+    assert chunk_text(text, TOKENIZER, max_tokens=5) == [text]
+    assert chunk_text("   ", TOKENIZER, max_tokens=5) == []
+
+
+def test_chunks_respect_the_limit_and_overlap_one_sentence():
+    text = "a1 a2 a3. b1 b2 b3. c1 c2 c3. d1 d2 d3."
+    chunks = chunk_text(text, TOKENIZER, max_tokens=6, overlap=1)
+    assert chunks == ["a1 a2 a3. b1 b2 b3.", "b1 b2 b3. c1 c2 c3.", "c1 c2 c3. d1 d2 d3."]
+    assert chunk_text(text, TOKENIZER, max_tokens=6, overlap=0) == ["a1 a2 a3. b1 b2 b3.", "c1 c2 c3. d1 d2 d3."]
+
+
+def test_long_sentences_are_cut_on_token_boundaries():
+    chunks = chunk_text("w1 w2 w3 w4 w5 w6 w7. End.", TOKENIZER, max_tokens=3, overlap=0)
+    assert chunks == ["w1 w2 w3", "w4 w5 w6", "w7. End."]
+    assert all(len(c.split()) <= 3 for c in chunks)
+
+
+def test_max_chunks_keeps_the_lead():
+    text = " ".join(f"s{i} x y." for i in range(10))
+    chunks = chunk_text(text, TOKENIZER, max_tokens=3, overlap=0, max_chunks=2)
+    assert chunks == ["s0 x y.", "s1 x y."]
+
+
+def test_pool_logits_averages_chunks_per_text():
+    logits = np.array([[1.0, 0.0], [3.0, 2.0], [5.0, 5.0]])
+    np.testing.assert_allclose(pool_logits(logits, [0, 0, 1]), [[2.0, 1.0], [5.0, 5.0]])
+    # weights (chunk lengths) tilt the average toward the longer chunk
+    np.testing.assert_allclose(pool_logits(logits, [0, 0, 1], weights=[3, 1, 2]), [[1.5, 0.5], [5.0, 5.0]])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from benchmarks.stub_models import StubTokenizer
+from src.api import tokens
+from src.api.backends import MAX_LENGTH
+from src.api.models import ModelRegistry
+
+
+class CountingTokenizer(StubTokenizer):
+    name_or_path = "counting-whitespace"
+    pad_token_id = 0
+    padding_side = "right"
+    model_input_names = ["input_ids", "attention_mask"]
+
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts, **kwargs):
+        self.encoded.extend([texts] if isinstance(texts, str) else texts)
+        return super().__call__(texts, **kwargs)
+
+
+class Backend:
+    """Encodes through the shared cache the way the torch and ONNX backends do."""
+
+    def __init__(self):
+        self.tokenizer = CountingTokenizer()
+        self.rows = []
+
+    def logits(self, texts):
+        out = np.zeros((len(texts), 3))
+        for idx, inputs in tokens.batches(self.tokenizer, texts, MAX_LENGTH, "classifier"):
+            self.rows.extend(int(inputs["attention_mask"][r].sum()) for r in range(len(idx)))
+            out[idx, 0] = 1.0
+        return out
+
+
+@pytest.fixture
+def backend(main, monkeypatch):
+    backend = Backend()
+    registry = ModelRegistry()
+    registry.register("classifier", lambda: backend)
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "CLASSIFIER_CHUNK_TOKENS", 50)
+    return backend
+
+
+def test_text_that_fits_is_tokenized_once(main, backend):
+    text = " ".join(f"fits{i}" for i in range(40)) + "."  # over 50 characters, under 50 tokens
+    main.classify_batch([text])
+    assert backend.tokenizer.encoded == [text]
+    assert backend.rows == [40]
+
+
+def test_text_over_the_window_is_chunked(main, backend):
+    text = " ".join(f"Sentence number {i} is here." for i in range(30))  # 150 tokens
+    result = main.classify_batch([text])
+    assert len(result) == 1
+    assert len(backend.rows) > 1 and max(backend.rows) <= 50
@@ -0,0 +1,73 @@
+import json
+import os
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.api.clean_text import ENGINES, clean_html
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+CASES = [
+    "plain text without markup",
+    "if a<b then",
+    "Look<here",
+    "if a<b then c>d",
+    "a < b and c > d",
+    "I <3 NY",
+    "5<6",
+    "<p>Fish &amp; chips</p>",
+    "<p>a &notanentity; b</p>",
+    "<p>&nbsp;x</p>",
+    "&pound5 fee",
+    "&lt3",
+    "&copyright 2024",
+    "&#65",
+    "&#65;",
+    "&#x41;",
+    "&#0;",
+    "P&G",
+    "<p>P&G</p>",
+    "AT&T;",
+    "a && b",
+    "<a href='?a=1&b=2'>x</a>",
+    "x <b>bold</b> y",
+    "<p>unclosed <b>bold",
+    "a</b>c",
+    "x</p",
+    "<!-- c -->x",
+    "<div>a<!--x<y-->b</div>",
+    "<![CDATA[x]]>",
+    "<p title='a<b'>t</p>",
+    "<textarea><b>x</b> y</textarea>z",
+    "<xmp><b>x</b></xmp>",
+    "<plaintext><b>x</b>",
+    "<p>a\x00b</p>",
+    "<script>if(a<b){}</script>y",
+    "<style>p{}</style>x",
+    "<title>T</title><p>b</p>",
+    "<table><tr><td>c</td></tr></table>",
+]
+
+
+def reference(raw_html):
+    # clean_html before the fast path and engines
+    return re.sub(r"\s+", " ", BeautifulSoup(raw_html, "html.parser").get_text()).strip()
+
+
+def feed_html():
+    with open(os.path.join(FIXTURES, "feed_html.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("raw", CASES)
+def test_engines_match_reference(engine, raw):
+    assert clean_html(raw, engine=engine) == reference(raw)
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_engines_match_reference_on_feed_fixtures(engine):
+    for raw in feed_html():
+        assert clean_html(raw, engine=engine) == reference(raw)
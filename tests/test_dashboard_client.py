@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from src.dashboard import client as dashboard
+
+FULL = {"prediction": {"label": "World", "probs": [1.0]}, "entities": [], "summary": "A summary."}
+
+
+class FakeResponse:
+    def __init__(self, body=None, events=None, status_code=200):
+        self.body, self.events, self.status_code = body, events, status_code
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        return (json.dumps(e) for e in self.events)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = dashboard.APIClient("http://api.test")
+    api.replies = {}
+    monkeypatch.setattr(api, "_post", lambda path, body, **kw: api.replies[path](body))
+    return api
+
+
+@pytest.mark.parametrize("result", [
+    FULL,
+    dict(FULL, prediction=None),
+    dict(FULL, timed_out=["summary"]),
+    dict(FULL, degraded=["summary"]),
+    dict(FULL, errors={"prediction": "boom"}),
+    {"error": "boom"},
+])
+def test_analyze_caches_only_complete_results(api, result):
+    api.replies["/analyze"] = lambda body: FakeResponse(result)
+    assert api.analyze("text") == result
+    assert (api.cached("text") is not None) == (result is FULL)
+
+
+def stream(*events):
+    return lambda body: FakeResponse(events=list(events))
+
+
+@pytest.mark.parametrize("events, cached", [
+    ([{"stage": "prediction", "data": FULL["prediction"]}, {"stage": "entities", "data": []},
+      {"stage": "summary", "data": "A summary."}, {"stage": "done"}], True),
+    ([{"stage": "prediction", "data": FULL["prediction"]}, {"stage": "entities", "data": []},
+      {"stage": "summary", "data": "⚠️ Summarization failed", "status": "error", "error": "boom"},
+      {"stage": "done"}], False),
+    ([{"stage": "prediction", "data": FULL["prediction"]}, {"stage": "entities", "data": []},
+      {"stage": "summary", "data": "Lead sentences."}, {"stage": "done", "degraded": ["summary"]}], False),
+])
+def test_analyze_stream_caches_only_complete_results(api, events, cached):
+    api.replies["/analyze_stream"] = stream(*events)
+    stages = dict(api.analyze_stream("text"))
+    assert set(stages) == set(dashboard.STAGES)
+    assert (api.cached("text") is not None) == cached
+
+
+def test_analyze_many_skips_degraded_items(api):
+    api.replies["/analyze_batch"] = lambda body: FakeResponse([FULL, dict(FULL, degraded=["summary"])])
+    results = dict(api.analyze_many(["one", "two"]))
+    assert results[1]["degraded"] == ["summary"]
+    assert api.cached("one") == FULL
+    assert api.cached("two") is None
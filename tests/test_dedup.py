@@ -0,0 +1,26 @@
+from src.data.dedup import Deduplicator
+
+TEXT = "The central bank held interest rates steady on Monday, citing cooling inflation and a weaker labour market."
+
+
+def test_removed_article_is_no_longer_matched():
+    dedup = Deduplicator()
+    fingerprint = dedup.fingerprint(TEXT)
+    dedup.add(1, fingerprint)
+    assert dedup.find(fingerprint) == ("exact", 1)
+
+    dedup.remove(1)
+    assert dedup.find(fingerprint) == ("new", None)
+    assert dedup.stats()["canonical_articles"] == 0
+    dedup.remove(1)  # unknown ids are ignored
+
+
+def test_remove_keeps_other_articles_sharing_a_band():
+    dedup = Deduplicator()
+    fingerprint = dedup.fingerprint(TEXT)
+    dedup.add(1, fingerprint)
+    dedup.add(2, fingerprint)  # same text added twice: 1 stays the exact match
+    dedup.remove(2)
+    assert dedup.find(fingerprint) == ("exact", 1)
+    dedup.remove(1)
+    assert dedup.find(fingerprint) == ("new", None)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.api.entities import EntityCounter, normalize_entities
+
+
+def test_adjacent_wordpieces_merge_into_one_entity():
+    raw = [
+        {"entity_group": "LOC", "word": "Wash", "start": 0, "end": 4, "score": np.float32(0.9)},
+        {"entity_group": "LOC", "word": "##ington", "start": 4, "end": 10, "score": np.float32(0.6)},
+    ]
+    [ent] = normalize_entities(raw)
+    assert (ent["word"], ent["start"], ent["end"], ent["mentions"]) == ("Washington", 0, 10, 1)
+    assert type(ent["score"]) is float and abs(ent["score"] - 0.6) < 1e-6
+
+
+def test_detached_wordpiece_is_not_merged():
+    raw = [
+        {"entity_group": "PER", "word": "Ann", "start": 0, "end": 3, "score": 0.9},
+        {"entity_group": "PER", "word": "##a", "start": 8, "end": 9, "score": 0.5},
+    ]
+    assert [e["word"] for e in normalize_entities(raw)] == ["Ann", "a"]
+
+
+def test_repeated_entities_are_deduplicated_case_insensitively():
+    raw = [
+        {"entity_group": "ORG", "word": "Wash ##ington Post,", "start": 0, "end": 15, "score": 0.7},
+        {"entity_group": "ORG", "word": "washington post", "start": 40, "end": 55, "score": 0.95},
+        {"entity_group": "LOC", "word": "Washington", "start": 60, "end": 70, "score": 0.8},
+        {"entity_group": "Error", "word": ""},
+    ]
+    ents = normalize_entities(raw)
+    assert [(e["entity_group"], e["word"]) for e in ents] == [("ORG", "Washington Post"), ("LOC", "Washington"), ("Error", "")]
+    assert (ents[0]["start"], ents[0]["mentions"], ents[0]["score"]) == (0, 2, 0.95)
+
+
+def test_counter_counts_an_article_key_once():
+    counter = EntityCounter()
+    entities = [{"entity_group": "ORG", "word": "Reuters", "mentions": 2}]
+    counter.add(entities, key="a")
+    counter.add(entities, key="a")
+    counter.add(entities, key="b")
+    assert counter.stats()["articles"] == 2
+    assert counter.top() == [{"entity_group": "ORG", "word": "Reuters", "mentions": 4, "articles": 2}]
+
+
+def test_reanalyzed_text_is_counted_once(client, main, monkeypatch):
+    monkeypatch.setattr(main, "entity_counter", EntityCounter())
+    text = "Angela Merkel met Emmanuel Macron in Paris on Friday."
+    for quality in (None, "fast", None):
+        main.result_cache.invalidate(None)  # as if the cached result had expired
+        assert client.post("/analyze", json={"text": text, "quality": quality}).status_code == 200
+    client.post("/analyze_batch", json={"texts": [text]})
+    assert main.entity_counter.stats()["articles"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from src.api.extractive import extractive_summary, route
+
+ARTICLE = (
+    "The city council approved a new budget for public transport on Tuesday. "
+    "The budget adds bus routes and extends tram service into the northern districts. "
+    "Council members debated for three hours before the vote. "
+    "The weather was mild and several residents watched from the gallery. "
+    "Transport officials said the new bus routes and tram service start in spring."
+)
+
+
+def test_summary_keeps_the_best_sentences_in_order():
+    summary = extractive_summary(ARTICLE, max_sentences=2)
+    assert summary.startswith("The city council approved")
+    assert "weather" not in summary
+    sentences = [s for s in ARTICLE.split(". ") if s.rstrip(".") in summary]
+    assert len(sentences) == 2
+    assert summary.index(sentences[0]) < summary.index(sentences[1])
+
+
+def test_short_text_is_returned_whole():
+    text = "Markets rallied. Bonds fell."
+    assert extractive_summary(text, max_sentences=2) == text
+    assert extractive_summary("", max_sentences=2) == ""
+
+
+def words(n):
+    return " ".join(["word"] * n)
+
+
+@pytest.mark.parametrize("quality", ["auto", "fast", "best"])
+def test_short_input_passes_through_whatever_the_quality(quality):
+    assert route(words(60), quality, passthrough_words=60, abstractive_min_words=250) == "passthrough"
+
+
+@pytest.mark.parametrize("quality,n,expected", [
+    ("auto", 61, "extractive"),
+    ("auto", 249, "extractive"),
+    ("auto", 250, "abstractive"),
+    ("fast", 1000, "extractive"),
+    ("best", 61, "abstractive"),
+])
+def test_route_by_quality_and_length(quality, n, expected):
+    assert route(words(n), quality, passthrough_words=60, abstractive_min_words=250) == expected
@@ -0,0 +1,28 @@
+import importlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("gunicorn")
+
+
+def load_conf(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    sys.modules.pop("src.api.gunicorn_conf", None)
+    return importlib.import_module("src.api.gunicorn_conf")
+
+
+def test_defaults_to_one_worker_without_preloading(monkeypatch):
+    monkeypatch.delenv("WEB_WORKERS", raising=False)
+    monkeypatch.delenv("PRELOAD_MODELS", raising=False)
+    conf = load_conf(monkeypatch)
+    assert conf.workers == 1
+    assert conf._models_to_preload(SimpleNamespace(CLASSIFIER_BACKEND="torch")) == []
+
+
+def test_ingestion_is_refused_with_several_workers(monkeypatch):
+    with pytest.raises(RuntimeError, match="INGEST_ENABLED needs WEB_WORKERS=1"):
+        load_conf(monkeypatch, INGEST_ENABLED="1", WEB_WORKERS="2")
+    assert load_conf(monkeypatch, INGEST_ENABLED="1", WEB_WORKERS="1").workers == 1
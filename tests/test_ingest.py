@@ -0,0 +1,185 @@
+import asyncio
+from types import SimpleNamespace
+
+import feedparser
+import pytest
+
+from src.data.ingest import IngestScheduler
+from src.data.store import ArticleStore
+
+
+class FakeFetcher:
+    """Serves one feed whose entries and article pages the test edits."""
+
+    def __init__(self):
+        self.entries = {}
+        self.pages = {}
+        self.downloads = []
+
+    async def fetch_feed(self, url):
+        return feedparser.FeedParserDict(entries=[
+            feedparser.FeedParserDict(link=link, id=link, title=title, summary="", updated=updated)
+            for link, (title, updated) in self.entries.items()
+        ])
+
+    async def fetch_articles(self, urls, nlp=True):
+        self.downloads.extend(urls)
+        return [SimpleNamespace(title=self.entries[u][0], text=self.pages[u], meta_description="") for u in urls]
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def ingest(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    fetcher = FakeFetcher()
+    analyzed = []
+
+    def analyzer(texts):
+        analyzed.extend(texts)
+        return [{"prediction": {"label": "World", "probs": [1.0]}, "entities": []} for _ in texts]
+
+    scheduler = IngestScheduler(store, feeds={"T": "http://feed"}, fetcher=fetcher, analyzer=analyzer)
+    scheduler.feed_cache = None
+    yield scheduler, store, fetcher, analyzed
+    store.close()
+
+
+def poll(scheduler):
+    return asyncio.run(scheduler.poll_feed("T"))
+
+
+def test_unchanged_entries_are_not_downloaded_again(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "The central bank held rates on Monday."
+    assert poll(scheduler) == 1
+    assert poll(scheduler) == 0
+    assert fetcher.downloads == ["http://a"]
+    assert len(analyzed) == 1
+
+
+def test_changed_article_at_same_url_is_reanalyzed(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "The central bank held rates on Monday."
+    poll(scheduler)
+    article_id = store.find("http://a")["id"]
+
+    fetcher.entries["http://a"] = ("Rates held, markets rally", "Tue")
+    fetcher.pages["http://a"] = "Stocks surged after the central bank surprised traders with a cut on Tuesday."
+    assert poll(scheduler) == 0  # not a new article
+    assert analyzed[-1].startswith("Stocks surged")
+    assert store.get(article_id)["text"].startswith("Stocks surged")
+    assert store.count() == 1
+    assert scheduler.stats()["feeds"]["T"]["updated_articles"] == 1
+
+
+def test_entry_edit_without_text_change_is_not_reanalyzed(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "The central bank held rates on Monday."
+    poll(scheduler)
+    fetcher.entries["http://a"] = ("Rates held", "Mon 10:05")
+    poll(scheduler)
+    assert fetcher.downloads == ["http://a", "http://a"]
+    assert len(analyzed) == 1
+    poll(scheduler)
+    assert len(fetcher.downloads) == 2  # the new entry hash was recorded
+
+
+def test_failed_analysis_is_not_stored_and_is_retried(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    analyzer = scheduler.analyzer
+    scheduler.analyzer = lambda texts: [
+        {"prediction": None, "entities": [], "errors": {"prediction": "model crashed"}} for _ in texts
+    ]
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "The central bank held rates on Monday."
+    assert poll(scheduler) == 1
+    article_id = store.find("http://a")["id"]
+    assert store.get(article_id)["analysis"] is None
+    assert scheduler.stats()["feeds"]["T"]["failed_analyses"] == 1
+
+    scheduler.analyzer = analyzer
+    assert poll(scheduler) == 0
+    assert fetcher.downloads == ["http://a"]  # retried from the store, not downloaded again
+    assert store.get(article_id)["analysis"]["prediction"]["label"] == "World"
+    assert store.unanalyzed() == []
+
+
+def test_analyzer_crash_is_retried_on_next_poll(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    analyzer = scheduler.analyzer
+
+    def crash(texts):
+        raise RuntimeError("out of memory")
+
+    scheduler.analyzer = crash
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "The central bank held rates on Monday."
+    with pytest.raises(RuntimeError):
+        poll(scheduler)
+    assert [a["url"] for a in store.unanalyzed()] == ["http://a"]
+
+    scheduler.analyzer = analyzer
+    poll(scheduler)
+    assert analyzed == ["The central bank held rates on Monday."]
+    assert store.unanalyzed() == []
+
+
+def labelled(texts):
+    # "World" for rates stories, "Sports" otherwise; the first word is the entity
+    return [
+        {
+            "prediction": {"label": "World" if "rates" in t else "Sports", "probs": [0.9]},
+            "entities": [{"entity_group": "ORG", "word": t.split()[0]}],
+        }
+        for t in texts
+    ]
+
+
+def test_reanalysis_replaces_counts_trends_and_fingerprint(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    scheduler.analyzer = labelled
+    old_text = "Fed held rates on Monday as inflation cooled across the region."
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = old_text
+    poll(scheduler)
+    article_id = store.find("http://a")["id"]
+
+    fetcher.entries["http://a"] = ("Derby won", "Tue")
+    fetcher.pages["http://a"] = "United won the derby after a late goal in front of a record crowd."
+    poll(scheduler)
+    assert [(e["word"], e["articles"]) for e in store.top_entities()] == [("United", 1)]
+    trends = store.trends(0)
+    assert trends["totals"]["categories"] == {"Sports": {"articles": 1, "mean_confidence": 0.9}}
+    assert [e["word"] for e in trends["totals"]["entities"]] == ["United"]
+
+    # the old text showing up elsewhere is a new article, not a copy of the changed one
+    fetcher.entries["http://b"] = ("Rates held", "Wed")
+    fetcher.pages["http://b"] = old_text
+    assert poll(scheduler) == 1
+    b = store.get(store.find("http://b")["id"])
+    assert b["canonical_id"] is None and b["id"] != article_id
+    assert b["analysis"]["prediction"]["label"] == "World"
+
+
+def test_article_rewritten_into_a_copy_drops_its_own_analysis(ingest):
+    scheduler, store, fetcher, analyzed = ingest
+    scheduler.analyzer = labelled
+    fetcher.entries["http://a"] = ("Rates held", "Mon")
+    fetcher.pages["http://a"] = "Fed held rates on Monday as inflation cooled across the region."
+    fetcher.entries["http://b"] = ("Derby won", "Mon")
+    fetcher.pages["http://b"] = "United won the derby after a late goal in front of a record crowd."
+    poll(scheduler)
+    b_id = store.find("http://b")["id"]
+
+    fetcher.entries["http://b"] = ("Rates held", "Tue")
+    fetcher.pages["http://b"] = fetcher.pages["http://a"]
+    poll(scheduler)
+    b = store.get(b_id)
+    assert b["canonical_id"] == store.find("http://a")["id"]
+    assert b["analysis"]["prediction"]["label"] == "World"  # its canonical article's
+    assert [e["word"] for e in store.top_entities()] == ["Fed"]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.data.jobs import DONE, ERROR, JobRunner, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def analyze(texts):
+    return [{"summary": t.upper()} for t in texts]
+
+
+def test_claim_takes_higher_priority_jobs_first(store):
+    low = store.create([("text", "low")], priority=0)
+    high = store.create([("text", "high a"), ("text", "high b")], priority=5)
+    claimed = store.claim(2)
+    assert [(c["job_id"], c["index"]) for c in claimed] == [(high, 0), (high, 1)]
+    assert store.claim(2)[0]["job_id"] == low
+    assert store.claim(2) == []
+
+
+def test_expired_lease_is_retried_then_failed(store):
+    job_id = store.create([("text", "t")])
+    assert len(store.claim(1, lease=-1, max_attempts=2)) == 1
+    assert len(store.claim(1, lease=-1, max_attempts=2)) == 1  # lease ran out: claimed again
+    assert store.claim(1, lease=-1, max_attempts=2) == []  # out of attempts
+    job = store.get(job_id)
+    assert job["status"] == "done"
+    assert job["items"][0]["status"] == ERROR
+    assert "gave up after 2 attempts" in job["items"][0]["error"]
+
+
+def test_live_lease_is_not_claimed_twice(store):
+    store.create([("text", "t")])
+    assert len(store.claim(1, lease=60)) == 1
+    assert store.claim(1, lease=60) == []
+
+
+def test_runner_finishes_jobs_off_the_event_loop(store):
+    threads = set()
+    claim = store.claim
+
+    def tracked_claim(*args):
+        threads.add(threading.current_thread())
+        return claim(*args)
+
+    store.claim = tracked_claim
+
+    async def run():
+        runner = JobRunner(store, analyze, fetcher=None, workers=1, poll_interval=0.05)
+        runner.start()
+        job_id = store.create([("text", "a"), ("text", " ")])
+        runner.notify()
+        try:
+            for _ in range(100):
+                job = store.get(job_id)
+                if job["status"] == "done":
+                    return job, runner.stats()
+                await asyncio.sleep(0.02)
+            raise AssertionError("job did not finish")
+        finally:
+            await runner.stop()
+
+    job, stats = asyncio.run(run())
+    assert [i["status"] for i in job["items"]] == [DONE, ERROR]
+    assert job["items"][0]["result"] == {"summary": "A"}
+    assert job["items"][1]["error"] == "no article text"
+    assert stats["items"] == 2 and stats["failed"] == 1
+    assert threads and threading.main_thread() not in threads
+
+
+def test_jobs_routes_404_when_disabled(client, main, monkeypatch):
+    monkeypatch.setattr(main, "job_store", None)
+    monkeypatch.setattr(main, "job_runner", None)
+    assert client.post("/jobs", json={"texts": ["x"]}).status_code == 404
+    assert client.get("/jobs/stats").status_code == 404
+    assert client.get("/jobs/abc").status_code == 404
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,30 @@
+import numpy as np
+
+from src.data.store import ArticleStore
+from src.data.vector_index import VectorIndex
+
+
+def fake_embed(texts):
+    # one axis per leading word, so a changed text gets a different vector
+    vectors = np.zeros((len(texts), 4), dtype=np.float32)
+    for row, text in enumerate(texts):
+        vectors[row, sum(map(ord, text.split()[0])) % 4] = 1.0
+    return vectors
+
+
+def test_changed_article_is_reembedded(main, tmp_path, monkeypatch):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    index = VectorIndex(str(tmp_path / "index"), 4)
+    monkeypatch.setattr(main, "article_store", store)
+    monkeypatch.setattr(main, "get_search_index", lambda: index)
+    monkeypatch.setattr(main, "embed", fake_embed)
+
+    article_id = store.add({"url": "http://a", "title": "Aa", "text": "rates"})
+    assert main.sync_search_index() == 1
+    before = index.vector(article_id)
+
+    store.update(article_id, {"title": "Bb"})
+    assert main.reindex_articles([article_id, 999]) == 1
+    assert not np.allclose(index.vector(article_id), before)
+    assert len(index) == 1
+    store.close()
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def timeouts(main, monkeypatch):
+    monkeypatch.setattr(main, "STAGE_TIMEOUTS", dict(main.STAGE_TIMEOUTS, slow=0.2, fast=5.0))
+
+
+def test_stage_pool_fits_every_admitted_analysis(main):
+    assert main.stage_pool._max_workers >= len(main.ANALYZE_STAGES) * main.analyze_limiter.concurrency
+
+
+def test_timed_out_stage_stops_at_next_pass(main, timeouts):
+    passes, stopped = [], threading.Event()
+
+    def slow(text):
+        try:
+            while True:
+                main.check_cancelled()
+                passes.append(1)
+                time.sleep(0.05)
+        except main.StageCancelled:
+            stopped.set()
+            raise
+
+    outcomes = main.run_stages("text", mode="concurrent", stages={"slow": slow, "fast": lambda t: t.upper()})
+    assert outcomes["fast"][:2] == ("ok", "TEXT")
+    assert outcomes["slow"][0] == "timeout"
+    assert stopped.wait(1.0)
+    count = len(passes)
+    time.sleep(0.15)
+    assert len(passes) == count
+
+
+def test_closed_stream_abandons_pending_stages(main, timeouts):
+    stopped = threading.Event()
+
+    def slow(text):
+        try:
+            while True:
+                main.check_cancelled()
+                time.sleep(0.02)
+        except main.StageCancelled:
+            stopped.set()
+            raise
+
+    events = main.iter_stages("text", mode="concurrent", stages={"fast": lambda t: t, "slow": slow})
+    assert next(events)[0] == "fast"
+    events.close()  # what happens when a streaming client disconnects
+    assert stopped.wait(1.0)
+
+
+def test_analyze_reports_timeouts(client, main, monkeypatch):
+    monkeypatch.setattr(main, "STAGE_TIMEOUTS", dict(main.STAGE_TIMEOUTS, summary=0.0))
+    r = client.post("/analyze", json={"text": "Markets rallied in London on Monday. " * 20, "quality": "best"})
+    assert r.status_code == 200
+    assert r.json()["timed_out"] == ["summary"]
+    assert r.json()["prediction"]["label"] in main.labels
+
+
+def test_model_loading_does_not_count_against_the_timeout(main, timeouts):
+    from src.api.models import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.register("cold", lambda: time.sleep(0.5) or "model")
+
+    def slow(text):
+        # a cold model: loading takes longer than the stage's 0.2s timeout
+        return registry.get("cold") + ":" + text
+
+    outcomes = main.run_stages("text", mode="concurrent", stages={"slow": slow, "fast": lambda t: t})
+    assert outcomes["slow"][:2] == ("ok", "model:text")
+    assert outcomes["slow"][2] >= 0.5
+
+
+def test_timeout_still_applies_after_the_model_loaded(main, timeouts):
+    from src.api.models import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.register("cold", lambda: time.sleep(0.3) or "model")
+
+    def slow(text):
+        registry.get("cold")
+        time.sleep(1.0)
+
+    outcomes = main.run_stages("text", mode="concurrent", stages={"slow": slow})
+    assert outcomes["slow"][0] == "timeout"
+    assert 0.45 <= outcomes["slow"][2] < 0.9
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.data import store as store_module
+from src.data.store import TREND_BUCKET_SECONDS, ArticleStore
+
+HOUR = TREND_BUCKET_SECONDS
+T0 = 100 * HOUR
+
+
+class Clock:
+    def __init__(self, now=T0 + 60.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(store_module, "time", SimpleNamespace(time=clock))
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    store.clock = clock
+    yield store
+    store.close()
+
+
+def analysis(label, confidence, *entities):
+    return {
+        "prediction": {"label": label, "probs": [1.0 - confidence, confidence]},
+        "entities": [{"entity_group": g, "word": w, "mentions": m} for g, w, m in entities],
+    }
+
+
+def add(store, source, result):
+    article_id = store.add({"url": f"http://{source}/{store.count()}", "source": source, "text": "t"})
+    store.set_analysis(article_id, result)
+    return article_id
+
+
+def populate(store):
+    add(store, "a", analysis("World", 0.8, ("ORG", "Reuters", 2), ("LOC", "Paris", 1)))
+    add(store, "b", analysis("World", 0.6, ("ORG", "Reuters", 1)))
+    store.clock.now += HOUR
+    add(store, "a", analysis("Sports", 0.9, ("LOC", "Paris", 3)))
+
+
+def test_trends_buckets_categories_and_entities(store):
+    populate(store)
+    trends = store.trends(since=T0 + 30, until=T0 + 2 * HOUR)
+
+    assert (trends["since"], trends["bucket_seconds"]) == (T0, HOUR)
+    first, second = trends["series"]
+    assert (first["start"], first["articles"], second["start"], second["articles"]) == (T0, 2, T0 + HOUR, 1)
+    assert first["categories"] == {"World": {"articles": 2, "mean_confidence": 0.7}}
+    assert first["entities"][0] == {"entity_group": "ORG", "word": "Reuters", "mentions": 3, "articles": 2}
+    assert second["categories"] == {"Sports": {"articles": 1, "mean_confidence": 0.9}}
+
+    assert trends["totals"]["articles"] == 3
+    assert trends["totals"]["entities"][:2] == [
+        {"entity_group": "LOC", "word": "Paris", "mentions": 4, "articles": 2},
+        {"entity_group": "ORG", "word": "Reuters", "mentions": 3, "articles": 2},
+    ]
+    assert trends["sources"] == [{"source": "a", "articles": 2}, {"source": "b", "articles": 1}]
+
+
+def test_trends_merge_hours_and_split_by_source(store):
+    populate(store)
+    trends = store.trends(since=T0, until=T0 + 2 * HOUR, bucket=2 * HOUR, by_source=True, entities=1)
+
+    series = {point["source"]: point for point in trends["series"]}
+    assert set(series) == {"a", "b"}
+    assert all(point["start"] == T0 for point in series.values())
+    assert series["a"]["categories"] == {
+        "World": {"articles": 1, "mean_confidence": 0.8},
+        "Sports": {"articles": 1, "mean_confidence": 0.9},
+    }
+    assert series["a"]["entities"] == [{"entity_group": "LOC", "word": "Paris", "mentions": 4, "articles": 2}]
+    assert series["b"]["entities"] == [{"entity_group": "ORG", "word": "Reuters", "mentions": 1, "articles": 1}]
+
+
+def test_trends_filter_by_source_and_window(store):
+    populate(store)
+    only_b = store.trends(since=T0, until=T0 + 2 * HOUR, source="b")
+    assert [p["articles"] for p in only_b["series"]] == [1]
+    assert only_b["totals"]["categories"] == {"World": {"articles": 1, "mean_confidence": 0.6}}
+
+    later = store.trends(since=T0 + HOUR, until=T0 + 2 * HOUR, entities=0)
+    assert [p["start"] for p in later["series"]] == [T0 + HOUR]
+    assert later["series"][0]["entities"] == [] and later["totals"]["entities"] == []
@@ -0,0 +1,27 @@
+from src.api.tokens import MIN_PAD_TOKENS, length_buckets
+
+
+def test_every_index_lands_in_exactly_one_bucket():
+    lengths = [5, 300, 12, 40, 290, 7, 1000]
+    buckets = length_buckets(lengths, max_padding=0.25)
+    assert sorted(i for b in buckets for i in b) == list(range(len(lengths)))
+    # shortest first, both across and within buckets
+    flat = [lengths[i] for b in buckets for i in b]
+    assert flat == sorted(lengths)
+
+
+def test_short_inputs_share_a_bucket_when_padding_is_cheap():
+    # under MIN_PAD_TOKENS wasted cells another forward pass costs more than the padding
+    lengths = [1, MIN_PAD_TOKENS // 2, MIN_PAD_TOKENS // 2 + 1]
+    assert length_buckets(lengths, max_padding=0.0) == [[0, 1, 2]]
+
+
+def test_long_and_short_inputs_are_split():
+    lengths = [100, 110, 120, 1000, 1010]
+    assert length_buckets(lengths, max_padding=0.25) == [[0, 1, 2], [3, 4]]
+    # with unlimited padding everything pads to the longest
+    assert length_buckets(lengths, max_padding=1.0) == [[0, 1, 2, 3, 4]]
+
+
+def test_empty_input_has_no_buckets():
+    assert length_buckets([]) == []
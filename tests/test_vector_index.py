@@ -0,0 +1,88 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src.data import vector_index
+from src.data.vector_index import VectorIndex
+
+BACKENDS = ["brute"] + (["hnsw"] if vector_index.hnswlib is not None else [])
+
+
+def vectors(n, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_search_finds_the_query_vector_first(tmp_path, backend):
+    index = VectorIndex(str(tmp_path), 8, backend)
+    data = vectors(50)
+    index.add(list(range(100, 150)), data, cursor=149)
+    hits = index.search(data[7], k=3)
+    assert hits[0][0] == 107
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-4)
+    assert 107 not in [i for i, _ in index.search(data[7], k=3, exclude=[107])]
+
+
+def test_skip_to_unchanged_cursor_does_not_rewrite_meta(tmp_path, monkeypatch):
+    index = VectorIndex(str(tmp_path), 8)
+    index.skip_to(10)
+    writes = []
+    monkeypatch.setattr(index, "_save_meta", lambda: writes.append(1))
+    index.skip_to(10)
+    index.skip_to(3)
+    assert writes == []
+    index.skip_to(11)
+    assert writes == [1]
+
+
+def test_reopened_index_sees_cursor_and_rows(tmp_path):
+    index = VectorIndex(str(tmp_path), 8)
+    index.add([1, 2], vectors(2), cursor=5)
+    other = VectorIndex(str(tmp_path), 8)
+    assert other.cursor == 5
+    assert 2 in other and len(other) == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_search_while_adding(tmp_path, backend):
+    index = VectorIndex(str(tmp_path), 8, backend)
+    index.add([0], vectors(1))
+    errors, done = [], threading.Event()
+
+    def query():
+        rng = np.random.default_rng(1)
+        while not done.is_set():
+            try:
+                assert index.search(rng.normal(size=8), k=5)
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=query) for _ in range(4)]
+    for t in readers:
+        t.start()
+    # grows past MIN_CAPACITY, so the hnsw graph is resized while being queried
+    for start in range(1, 3000, 250):
+        index.add(list(range(start, start + 250)), vectors(250, seed=start))
+    done.set()
+    for t in readers:
+        t.join()
+    assert errors == []
+    assert len(index) == 3001
+
+
+def test_search_schedules_sync_only_when_store_advanced(main, monkeypatch):
+    class Store:
+        def max_id(self):
+            return self.top
+
+    class Index:
+        cursor = 10
+
+    store = Store()
+    monkeypatch.setattr(main, "article_store", store)
+    store.top = 10
+    assert not main.index_behind(Index())
+    store.top = 11
+    assert main.index_behind(Index())